@@ -23,14 +23,26 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import asyncio
+import builtins
+import copy
 import datetime
 import decimal
 import json
 import math
+import operator
 import uuid
+import io
+import queue
+import re
+import threading
+import time
 import sqlparse
 import select
+import sys
 from collections import OrderedDict
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
 from abc import ABC, abstractmethod
 from tabulate import tabulate
 from urllib.parse import urlparse
@@ -94,38 +106,120 @@ class Exception(Exception):
     pass
 
 
+class DataRow(object):
+    __slots__ = ("v_values", "v_index")
+
+    def __init__(self, p_values, p_index):
+        self.v_values = p_values
+        self.v_index = p_index
+
+    def __getitem__(self, p_key):
+        if isinstance(p_key, str):
+            return self.v_values[self.v_index[p_key]]
+        else:
+            return self.v_values[p_key]
+
+    def __setitem__(self, p_key, p_value):
+        if isinstance(p_key, str):
+            v_pos = self.v_index[p_key]
+        else:
+            v_pos = range(0, len(self.v_values))[p_key]
+        self.v_values = self.v_values[:v_pos] + (p_value,) + self.v_values[v_pos + 1 :]
+
+    def __len__(self):
+        return len(self.v_values)
+
+    def __iter__(self):
+        return iter(self.v_values)
+
+    def __eq__(self, p_other):
+        if isinstance(p_other, DataRow):
+            return self.v_values == p_other.v_values
+        elif isinstance(p_other, (list, tuple)):
+            return list(self.v_values) == list(p_other)
+        else:
+            return NotImplemented
+
+    def __repr__(self):
+        return "DataRow({0})".format(repr(OrderedDict(self.items())))
+
+    def keys(self):
+        return list(self.v_index.keys())
+
+    def values(self):
+        return list(self.v_values)
+
+    def items(self):
+        return [(k, self.v_values[v]) for k, v in self.v_index.items()]
+
+    def get(self, p_key, p_default=None):
+        try:
+            return self[p_key]
+        except (KeyError, IndexError):
+            return p_default
+
+
 class DataTable(object):
-    def __init__(self, p_name=None, p_alltypesstr=False, p_simple=False):
+    def __init__(
+        self, p_name=None, p_alltypesstr=False, p_simple=False, p_compact=False
+    ):
         self.Name = p_name
         self.Columns = []
         self.Rows = []
         self.AllTypesStr = p_alltypesstr
         self.Simple = p_simple
+        self.Compact = p_compact
+        self.v_columnindex = None
+        self.v_columnindexcolumns = None
+        self.v_columnindexcount = 0
+        self.v_indexes = OrderedDict()
+        self.v_indexrows = None
+        self.v_indexrowcount = 0
+        self.v_indexcolumns = None
+        self.v_indexcolumncount = 0
 
     def AddColumn(self, p_columnname):
         self.Columns.append(p_columnname)
+        self.v_columnindex = None
+        self.DropIndex()
+
+    def ColumnIndex(self):
+        if (
+            self.v_columnindex is None
+            or self.v_columnindexcolumns is not self.Columns
+            or self.v_columnindexcount != len(self.Columns)
+        ):
+            self.v_columnindex = OrderedDict()
+            for k in range(0, len(self.Columns)):
+                if self.Columns[k] not in self.v_columnindex:
+                    self.v_columnindex[self.Columns[k]] = k
+            self.v_columnindexcolumns = self.Columns
+            self.v_columnindexcount = len(self.Columns)
+        return self.v_columnindex
 
     def AddRow(self, p_row):
         if len(self.Columns) > 0 and len(p_row) > 0:
             if len(self.Columns) == len(p_row):
-                if not isinstance(p_row, OrderedDict):
+                if not isinstance(p_row, (OrderedDict, DataRow)):
                     v_rowtmp2 = p_row
                     if self.AllTypesStr:
-                        for j in range(0, len(v_rowtmp2)):
-                            if v_rowtmp2[j] != None:
-                                v_rowtmp2[j] = str(v_rowtmp2[j])
-                            else:
-                                v_rowtmp2[j] = ""
-                    v_rowtmp = OrderedDict(zip(self.Columns, tuple(v_rowtmp2)))
-                    if self.Simple:
-                        v_row = []
-                        for c in self.Columns:
-                            v_row.append(v_rowtmp[c])
+                        v_rowtmp2 = [str(v) if v is not None else "" for v in p_row]
+                    if self.Compact:
+                        v_row = DataRow(tuple(v_rowtmp2), self.ColumnIndex())
                     else:
-                        v_row = v_rowtmp
+                        v_rowtmp = OrderedDict(zip(self.Columns, tuple(v_rowtmp2)))
+                        if self.Simple:
+                            v_row = []
+                            for c in self.Columns:
+                                v_row.append(v_rowtmp[c])
+                        else:
+                            v_row = v_rowtmp
                 else:
                     v_row = p_row
+                v_indexed = self.CheckIndexes()
                 self.Rows.append(v_row)
+                if v_indexed:
+                    self.IndexRow(v_row)
             else:
                 raise Spartacus.Database.Exception(
                     "Can not add row to a table with different columns."
@@ -135,6 +229,40 @@ class DataTable(object):
                 "Can not add row to a table with no columns."
             )
 
+    def AddRows(self, p_rows):
+        if len(self.Columns) == 0:
+            raise Spartacus.Database.Exception(
+                "Can not add row to a table with no columns."
+            )
+        v_rows = p_rows if isinstance(p_rows, list) else list(p_rows)
+        if len(v_rows) == 0:
+            return
+        if isinstance(v_rows[0], (OrderedDict, DataRow)):
+            for r in v_rows:
+                self.AddRow(r)
+            return
+        v_count = len(self.Columns)
+        for r in v_rows:
+            if len(r) != v_count:
+                raise Spartacus.Database.Exception(
+                    "Can not add row to a table with different columns."
+                )
+        if self.AllTypesStr:
+            v_rows = [[str(v) if v is not None else "" for v in r] for r in v_rows]
+        if self.Compact:
+            v_index = self.ColumnIndex()
+            v_new = [DataRow(tuple(r), v_index) for r in v_rows]
+        elif self.Simple:
+            v_new = [list(r) for r in v_rows]
+        else:
+            v_columns = self.Columns
+            v_new = [OrderedDict(zip(v_columns, r)) for r in v_rows]
+        v_indexed = self.CheckIndexes()
+        self.Rows.extend(v_new)
+        if v_indexed:
+            for r in v_new:
+                self.IndexRow(r)
+
     def Select(self, p_key, p_value):
         if isinstance(p_key, list):
             v_key = p_key
@@ -147,22 +275,26 @@ class DataTable(object):
         if len(v_key) == len(v_value):
             try:
                 v_table = Spartacus.Database.DataTable(
-                    None, p_alltypesstr=self.AllTypesStr, p_simple=self.Simple
+                    None,
+                    p_alltypesstr=self.AllTypesStr,
+                    p_simple=self.Simple,
+                    p_compact=self.Compact,
                 )
                 for c in self.Columns:
                     v_table.AddColumn(c)
+                if self.CheckIndexes() and tuple(v_key) in self.v_indexes:
+                    try:
+                        v_rows = self.v_indexes[tuple(v_key)][1].get(
+                            tuple([self.Normalize(v) for v in v_value]), []
+                        )
+                        for r in v_rows:
+                            v_table.Rows.append(r)
+                        return v_table
+                    except TypeError:
+                        pass
                 if self.Simple:
-                    v_keytmp = v_key
-                    v_key = []
-                    for x in v_keytmp:
-                        k = 0
-                        found = False
-                        while not found and k < len(self.Columns):
-                            if self.Columns[k] == x:
-                                found = True
-                                v_key.append(k)
-                            else:
-                                k = k + 1
+                    v_columnindex = self.ColumnIndex()
+                    v_key = [v_columnindex[x] for x in v_key if x in v_columnindex]
                 for r in self.Rows:
                     v_match = True
                     for k in range(len(v_key)):
@@ -178,11 +310,92 @@ class DataTable(object):
                 "Can not select with different key-value dimension."
             )
 
+    def CreateIndex(self, p_columns):
+        """Method used to build a hash index over the current rows, used by Select when its key matches the index columns.
+
+            Args:
+                p_columns (str or list): column name, or list of column names, to be indexed.
+
+            Notes:
+                The index is a snapshot of Rows at the time it is created. AddRow, AddRows and Merge keep it up to date, and replacing Rows or Columns, or changing their length, drops it.
+                Changing a row in place (e.g. Rows[0]['k'] = 9 or Rows[0] = other_row) is not tracked: call DropIndex, or CreateIndex again, after such changes, otherwise Select will return stale results.
+
+            Raises:
+                Spartacus.Database.Exception.
+        """
+
+        if isinstance(p_columns, list):
+            v_columns = tuple(p_columns)
+        else:
+            v_columns = (p_columns,)
+        if len(v_columns) == 0:
+            raise Spartacus.Database.Exception("Can not create index with no columns.")
+        for c in v_columns:
+            if c not in self.Columns:
+                raise Spartacus.Database.Exception(
+                    "Can not create index on unknown column {0}.".format(c)
+                )
+        try:
+            self.CheckIndexes()
+            if self.Simple and not self.Compact:
+                v_columnindex = self.ColumnIndex()
+                v_positions = [v_columnindex[c] for c in v_columns]
+            else:
+                v_positions = list(v_columns)
+            v_map = {}
+            for r in self.Rows:
+                v_pk = tuple([self.Normalize(r[k]) for k in v_positions])
+                if v_pk in v_map:
+                    v_map[v_pk].append(r)
+                else:
+                    v_map[v_pk] = [r]
+            self.v_indexes[v_columns] = (v_positions, v_map)
+            self.v_indexrows = self.Rows
+            self.v_indexrowcount = len(self.Rows)
+            self.v_indexcolumns = self.Columns
+            self.v_indexcolumncount = len(self.Columns)
+        except builtins.Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+
+    def DropIndex(self, p_columns=None):
+        if p_columns is None:
+            self.v_indexes = OrderedDict()
+        elif isinstance(p_columns, list):
+            self.v_indexes.pop(tuple(p_columns), None)
+        else:
+            self.v_indexes.pop((p_columns,), None)
+
+    def CheckIndexes(self):
+        if len(self.v_indexes) > 0:
+            if (
+                self.v_indexrows is not self.Rows
+                or self.v_indexrowcount != len(self.Rows)
+                or self.v_indexcolumns is not self.Columns
+                or self.v_indexcolumncount != len(self.Columns)
+            ):
+                self.DropIndex()
+        return len(self.v_indexes) > 0
+
+    def IndexRow(self, p_row):
+        try:
+            for v_positions, v_map in self.v_indexes.values():
+                v_pk = tuple([self.Normalize(p_row[k]) for k in v_positions])
+                if v_pk in v_map:
+                    v_map[v_pk].append(p_row)
+                else:
+                    v_map[v_pk] = [p_row]
+        except TypeError:
+            self.DropIndex()
+        self.v_indexrowcount = len(self.Rows)
+
     def Merge(self, p_datatable):
         if len(self.Columns) > 0 and len(p_datatable.Columns) > 0:
             if self.Columns == p_datatable.Columns:
+                v_indexed = self.CheckIndexes()
                 for r in p_datatable.Rows:
                     self.Rows.append(r)
+                    if v_indexed:
+                        self.IndexRow(r)
             else:
                 raise Spartacus.Database.Exception(
                     "Can not merge tables with different columns."
@@ -205,6 +418,106 @@ class DataTable(object):
             v_val2 = ""
         return v_val1 == v_val2
 
+    def Normalize(self, p_value):
+        if type(p_value) is float:
+            return decimal.Decimal(repr(p_value))
+        elif p_value is None:
+            return ""
+        elif isinstance(p_value, list):
+            return tuple([self.Normalize(v) for v in p_value])
+        else:
+            return p_value
+
+    def OrderKey(self, p_value):
+        if p_value is None:
+            return (True, None)
+        else:
+            return (False, self.Normalize(p_value))
+
+    def CompareKeys(self, p_key1, p_key2):
+        try:
+            if p_key1 == p_key2:
+                return 0
+            elif p_key1 < p_key2:
+                return -1
+            else:
+                return 1
+        except TypeError:
+            raise Spartacus.Database.Exception(
+                "Can not compare keys {0} and {1}.".format(repr(p_key1), repr(p_key2))
+            )
+
+    def CompareRows(
+        self, p_rows1, p_rows2, p_pkcols, p_keepequal=False, p_debugupdates=False
+    ):
+        v_rows1 = iter(p_rows1)
+        v_rows2 = iter(p_rows2)
+        r1 = next(v_rows1, None)
+        r2 = next(v_rows2, None)
+        if r1 is not None:
+            pk1 = tuple([self.OrderKey(r1[pkcol]) for pkcol in p_pkcols])
+        if r2 is not None:
+            pk2 = tuple([self.OrderKey(r2[pkcol]) for pkcol in p_pkcols])
+        while r1 is not None and r2 is not None:
+            v_cmp = self.CompareKeys(pk1, pk2)
+            if v_cmp == 0:
+                v_allmatch = True
+                v_row = []
+                v_diff = []
+                for c in self.Columns:
+                    if not self.Equal(r1[c], r2[c]):
+                        if p_debugupdates:
+                            v_row.append(
+                                "[{0}]({1}) --> [{2}]({3})".format(
+                                    repr(r1[c]), type(r1[c]), repr(r2[c]), type(r2[c])
+                                )
+                            )
+                        else:
+                            v_row.append("{0} --> {1}".format(repr(r1[c]), repr(r2[c])))
+                        v_diff.append(c)
+                        v_allmatch = False
+                    else:
+                        v_row.append(r1[c])
+                if v_allmatch:
+                    v_row.append("E")
+                    v_row.append("")
+                    if p_keepequal:
+                        yield v_row
+                else:
+                    v_row.append("U")
+                    v_row.append(",".join(v_diff))
+                    yield v_row
+            elif v_cmp < 0:
+                v_row = [r1[c] for c in self.Columns]
+                v_row.append("D")
+                v_row.append("")
+                yield v_row
+            else:
+                v_row = [r2[c] for c in self.Columns]
+                v_row.append("I")
+                v_row.append("")
+                yield v_row
+            if v_cmp <= 0:
+                r1 = next(v_rows1, None)
+                if r1 is not None:
+                    pk1 = tuple([self.OrderKey(r1[pkcol]) for pkcol in p_pkcols])
+            if v_cmp >= 0:
+                r2 = next(v_rows2, None)
+                if r2 is not None:
+                    pk2 = tuple([self.OrderKey(r2[pkcol]) for pkcol in p_pkcols])
+        while r1 is not None:
+            v_row = [r1[c] for c in self.Columns]
+            v_row.append("D")
+            v_row.append("")
+            yield v_row
+            r1 = next(v_rows1, None)
+        while r2 is not None:
+            v_row = [r2[c] for c in self.Columns]
+            v_row.append("I")
+            v_row.append("")
+            yield v_row
+            r2 = next(v_rows2, None)
+
     def Compare(
         self,
         p_datatable,
@@ -230,100 +543,26 @@ class DataTable(object):
                     for c in self.Columns:
                         v_pkcols.append(c)
                 if p_ordered:
-                    k1 = 0
-                    k2 = 0
-                    while k1 < len(self.Rows) and k2 < len(p_datatable.Rows):
-                        r1 = self.Rows[k1]
-                        r2 = p_datatable.Rows[k2]
-                        pklist1 = []
-                        pklist2 = []
-                        for pkcol in v_pkcols:
-                            pklist1.append(str(r1[pkcol]))
-                            pklist2.append(str(r2[pkcol]))
-                        pk1 = "_".join(pklist1)
-                        pk2 = "_".join(pklist2)
-                        if pk1 == pk2:
-                            v_allmatch = True
-                            v_row = []
-                            v_diff = []
-                            for c in self.Columns:
-                                if not self.Equal(r1[c], r2[c]):
-                                    if p_debugupdates:
-                                        v_row.append(
-                                            "[{0}]({1}) --> [{2}]({3})".format(
-                                                repr(r1[c]),
-                                                type(r1[c]),
-                                                repr(r2[c]),
-                                                type(r2[c]),
-                                            )
-                                        )
-                                    else:
-                                        v_row.append(
-                                            "{0} --> {1}".format(
-                                                repr(r1[c]), repr(r2[c])
-                                            )
-                                        )
-                                    v_diff.append(c)
-                                    v_allmatch = False
-                                else:
-                                    v_row.append(r1[c])
-                            if v_allmatch:
-                                v_row.append("E")
-                                v_row.append("")
-                                if p_keepequal:
-                                    v_table.AddRow(v_row)
-                            else:
-                                v_row.append("U")
-                                v_row.append(",".join(v_diff))
-                                v_table.AddRow(v_row)
-                            k1 = k1 + 1
-                            k2 = k2 + 1
-                        elif pk1 < pk2:
-                            v_row = []
-                            for c in self.Columns:
-                                v_row.append(r1[c])
-                            v_row.append("D")
-                            v_row.append("")
-                            v_table.AddRow(v_row)
-                            k1 = k1 + 1
-                        else:
-                            v_row = []
-                            for c in p_datatable.Columns:
-                                v_row.append(r2[c])
-                            v_row.append("I")
-                            v_row.append("")
-                            v_table.AddRow(v_row)
-                            k2 = k2 + 1
-                    while k1 < len(self.Rows):
-                        r1 = self.Rows[k1]
-                        v_row = []
-                        for c in self.Columns:
-                            v_row.append(r1[c])
-                        v_row.append("D")
-                        v_row.append("")
+                    for v_row in self.CompareRows(
+                        self.Rows,
+                        p_datatable.Rows,
+                        v_pkcols,
+                        p_keepequal,
+                        p_debugupdates,
+                    ):
                         v_table.AddRow(v_row)
-                        k1 = k1 + 1
-                    while k2 < len(p_datatable.Rows):
-                        r2 = p_datatable.Rows[k2]
-                        v_row = []
-                        for c in p_datatable.Columns:
-                            v_row.append(r2[c])
-                        v_row.append("I")
-                        v_row.append("")
-                        v_table.AddRow(v_row)
-                        k2 = k2 + 1
                 else:
+                    v_pkindex = {}
+                    for r2 in p_datatable.Rows:
+                        v_pk = tuple([self.Normalize(r2[pkcol]) for pkcol in v_pkcols])
+                        if v_pk not in v_pkindex:
+                            v_pkindex[v_pk] = r2
+                    v_pkfound = set()
                     for r1 in self.Rows:
-                        v_pkmatch = False
-                        for r2 in p_datatable.Rows:
-                            v_pkmatch = True
-                            for pkcol in v_pkcols:
-                                if not self.Equal(r1[pkcol], r2[pkcol]):
-                                    v_pkmatch = False
-                                    break
-                            if v_pkmatch:
-                                break
-                        if v_pkmatch:
+                        v_pk = tuple([self.Normalize(r1[pkcol]) for pkcol in v_pkcols])
+                        v_pkfound.add(v_pk)
+                        r2 = v_pkindex.get(v_pk)
+                        if r2 is not None:
                             v_allmatch = True
                             v_row = []
                             v_diff = []
@@ -351,16 +590,8 @@ class DataTable(object):
                             v_row.append("")
                             v_table.AddRow(v_row)
                     for r2 in p_datatable.Rows:
-                        v_pkmatch = False
-                        for r1 in self.Rows:
-                            v_pkmatch = True
-                            for pkcol in v_pkcols:
-                                if not self.Equal(r1[pkcol], r2[pkcol]):
-                                    v_pkmatch = False
-                                    break
-                            if v_pkmatch:
-                                break
-                        if not v_pkmatch:
+                        v_pk = tuple([self.Normalize(r2[pkcol]) for pkcol in v_pkcols])
+                        if v_pk not in v_pkfound:
                             v_row = []
                             for c in p_datatable.Columns:
                                 v_row.append(r2[c])
@@ -547,33 +778,55 @@ class DataTable(object):
                 "Can only transpose a table with a single row."
             )
 
-    def Distinct(self, p_pkcols):
-        v_table = Spartacus.Database.DataTable(
-            None, p_alltypesstr=self.AllTypesStr, p_simple=self.Simple
-        )
-        for c in self.Columns:
-            v_table.AddColumn(c)
-        a = 0
-        for r in self.Rows:
-            v_value = []
-            if self.Simple:
-                for x in p_pkcols:
-                    k = 0
-                    found = False
-                    while not found and k < len(self.Columns):
-                        if self.Columns[k] == x:
-                            found = True
-                            v_value.append(r[k])
-                        else:
-                            k = k + 1
-            else:
-                for x in p_pkcols:
-                    v_value.append(r[x])
-            v_tmp = v_table.Select(p_pkcols, v_value)
-            if len(v_tmp.Rows) == 0:
-                v_table.AddRow(r)
-            a = a + 1
-        return v_table
+    def Distinct(self, p_pkcols, p_keep="first", p_countcolname=None):
+        if p_keep not in ["first", "last"]:
+            raise Spartacus.Database.Exception(
+                'Parameter p_keep must be "first" or "last".'
+            )
+        try:
+            v_table = Spartacus.Database.DataTable(
+                None,
+                p_alltypesstr=self.AllTypesStr,
+                p_simple=self.Simple,
+                p_compact=self.Compact,
+            )
+            for c in self.Columns:
+                v_table.AddColumn(c)
+            if p_countcolname is not None:
+                v_table.AddColumn(p_countcolname)
+            if self.Simple and not self.Compact:
+                v_pkcols = [self.Columns.index(x) for x in p_pkcols]
+                v_columns = range(0, len(self.Columns))
+            else:
+                v_pkcols = p_pkcols
+                v_columns = self.Columns
+            if p_keep == "first":
+                v_rows = self.Rows
+            else:
+                v_rows = reversed(self.Rows)
+            v_distinct = OrderedDict()
+            for r in v_rows:
+                v_key = tuple([self.Normalize(r[x]) for x in v_pkcols])
+                v_entry = v_distinct.get(v_key)
+                if v_entry is None:
+                    v_distinct[v_key] = [r, 1]
+                else:
+                    v_entry[1] = v_entry[1] + 1
+            v_entries = list(v_distinct.values())
+            if p_keep == "last":
+                v_entries.reverse()
+            for v_entry in v_entries:
+                if p_countcolname is not None:
+                    v_row = [v_entry[0][c] for c in v_columns]
+                    v_row.append(v_entry[1])
+                    v_table.AddRow(v_row)
+                else:
+                    v_table.Rows.append(v_entry[0])
+            return v_table
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except builtins.Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
 
 
 class DataField(object):
@@ -590,6 +843,9 @@ class DataTransferReturn(object):
         self.v_numrecords = 0
         self.v_log = None
         self.v_hasmorerecords = True
+        self.v_elapsed = 0
+        self.v_rowspersecond = 0
+        self.v_partitions = []
 
 
 class DataList(object):
@@ -600,6 +856,63 @@ class DataList(object):
         self.v_list.append(p_item)
 
 
+class AdaptiveBlockSize(object):
+    def __init__(
+        self,
+        p_initial=1000,
+        p_minimum=10,
+        p_maximum=100000,
+        p_targetbytes=16777216,
+        p_targetseconds=1.0,
+        p_samplesize=50,
+    ):
+        if p_minimum < 1 or p_minimum > p_maximum:
+            raise Spartacus.Database.Exception(
+                "Block size limits must satisfy 1 <= p_minimum <= p_maximum."
+            )
+        self.v_size = min(max(p_initial, p_minimum), p_maximum)
+        self.v_minimum = p_minimum
+        self.v_maximum = p_maximum
+        self.v_targetbytes = p_targetbytes
+        self.v_targetseconds = p_targetseconds
+        self.v_samplesize = p_samplesize
+        self.v_rowbytes = None
+        self.v_rowseconds = None
+
+    def Size(self):
+        return self.v_size
+
+    def RowBytes(self, p_row):
+        if isinstance(p_row, (OrderedDict, DataRow)):
+            v_values = p_row.values()
+        else:
+            v_values = p_row
+        return sys.getsizeof(p_row) + sum([sys.getsizeof(v) for v in v_values])
+
+    def Observe(self, p_table, p_seconds):
+        v_count = len(p_table.Rows)
+        if v_count == 0:
+            return self.v_size
+        v_step = max(1, v_count // self.v_samplesize)
+        v_sample = p_table.Rows[::v_step][: self.v_samplesize]
+        v_rowbytes = sum([self.RowBytes(r) for r in v_sample]) / len(v_sample)
+        v_rowseconds = p_seconds / v_count
+        if self.v_rowbytes is None:
+            self.v_rowbytes = v_rowbytes
+            self.v_rowseconds = v_rowseconds
+        else:
+            self.v_rowbytes = (self.v_rowbytes + v_rowbytes) / 2
+            self.v_rowseconds = (self.v_rowseconds + v_rowseconds) / 2
+        v_target = self.v_maximum
+        if self.v_targetbytes is not None and self.v_rowbytes > 0:
+            v_target = min(v_target, self.v_targetbytes / self.v_rowbytes)
+        if self.v_targetseconds is not None and self.v_rowseconds > 0:
+            v_target = min(v_target, self.v_targetseconds / self.v_rowseconds)
+        v_target = min(max(int(v_target), self.v_size // 2), self.v_size * 2)
+        self.v_size = min(max(v_target, self.v_minimum), self.v_maximum)
+        return self.v_size
+
+
 """
 ------------------------------------------------------------------------
 Generic
@@ -617,7 +930,7 @@ class Generic(ABC):
         pass
 
     @abstractmethod
-    def Query(self, p_sql, p_alltypesstr=False, p_simple=False):
+    def Query(self, p_sql, p_alltypesstr=False, p_simple=False, p_compact=False):
         pass
 
     @abstractmethod
@@ -673,7 +986,9 @@ class Generic(ABC):
         pass
 
     @abstractmethod
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(
+        self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_compact=False
+    ):
         pass
 
     @abstractmethod
@@ -698,7 +1013,7 @@ class Generic(ABC):
             ret = "null"
         elif type(p_value) == type(str()):
             ret = "'{0}'".format(p_value.replace("'", "''"))
-        elif type(p_value) == datetime.datetime:
+        elif isinstance(p_value, (datetime.date, datetime.time)):
             ret = "'{0}'".format(p_value)
         else:
             ret = "{0}".format(p_value)
@@ -741,6 +1056,120 @@ class Generic(ABC):
                 "Can not mogrify with different number of parameters."
             )
 
+    def MogrifyTemplate(self, p_fields, p_block=None):
+        v_converters = {
+            str: lambda v: "'" + v.replace("'", "''") + "'",
+            int: str,
+            float: str,
+            bool: str,
+            decimal.Decimal: str,
+            datetime.date: lambda v: "'" + str(v) + "'",
+            datetime.datetime: lambda v: "'" + str(v) + "'",
+            datetime.time: lambda v: "'" + str(v) + "'",
+            list: self.MogrifyArray,
+        }
+        if p_block is not None and p_block.Simple and not p_block.Compact:
+            v_columnindex = p_block.ColumnIndex()
+        else:
+            v_columnindex = None
+
+        def Field(p_key, p_type, p_mask):
+            v_convert = v_converters.get(p_type)
+            v_parts = p_mask.split("#")
+
+            def Value(p_row):
+                v_value = p_row[p_key]
+                if v_convert is not None and type(v_value) is p_type:
+                    return v_convert(v_value).join(v_parts)
+                else:
+                    return self.MogrifyValue(v_value).join(v_parts)
+
+            return Value
+
+        v_values = []
+        for f in p_fields:
+            if v_columnindex is None:
+                v_key = f.v_name
+            else:
+                v_key = v_columnindex[f.v_name]
+            v_type = f.v_type
+            if (v_type is None or v_type is type(None)) and p_block is not None:
+                for r in p_block.Rows:
+                    if r[v_key] is not None:
+                        v_type = type(r[v_key])
+                        break
+            v_values.append(Field(v_key, v_type, f.v_mask))
+        v_count = len(p_fields)
+
+        def Render(p_row):
+            if len(p_row) != v_count:
+                raise Spartacus.Database.Exception(
+                    "Can not mogrify with different number of parameters."
+                )
+            return "(" + ",".join([v(p_row) for v in v_values]) + ")"
+
+        return Render
+
+    def PrepareInsert(
+        self,
+        p_block,
+        p_tablename,
+        p_fields=None,
+        p_paramstyle="qmark",
+        p_converters=None,
+    ):
+        if p_fields is None:
+            v_fields = [DataField(c) for c in p_block.Columns]
+        else:
+            v_fields = p_fields
+        if p_block.Simple and not p_block.Compact:
+            v_columnindex = p_block.ColumnIndex()
+        else:
+            v_columnindex = None
+        v_columnames = []
+        v_values = []
+        v_keys = []
+        for f in v_fields:
+            v_columnames.append(f.v_name)
+            v_parts = f.v_mask.split("#")
+            if p_paramstyle == "format":
+                v_parts = [x.replace("%", "%%") for x in v_parts]
+            v_value = v_parts[0]
+            for k in range(1, len(v_parts)):
+                if v_columnindex is None:
+                    v_keys.append(f.v_name)
+                else:
+                    v_keys.append(v_columnindex[f.v_name])
+                if p_paramstyle == "format":
+                    v_value = v_value + "%s"
+                elif p_paramstyle == "numeric":
+                    v_value = v_value + ":{0}".format(len(v_keys))
+                else:
+                    v_value = v_value + "?"
+                v_value = v_value + v_parts[k]
+            v_values.append(v_value)
+        v_sql = "insert into {0}({1}) values ({2})".format(
+            p_tablename, ",".join(v_columnames), ",".join(v_values)
+        )
+        v_converters = {list: self.MogrifyArray}
+        if p_converters is not None:
+            v_converters.update(p_converters)
+        if len(v_keys) == 1:
+            v_getter = lambda r: (r[v_keys[0]],)
+        else:
+            v_getter = operator.itemgetter(*v_keys)
+        v_rows = []
+        for r in p_block.Rows:
+            v_rows.append(
+                tuple(
+                    [
+                        v_converters[type(v)](v) if type(v) in v_converters else v
+                        for v in v_getter(r)
+                    ]
+                )
+            )
+        return (v_sql, v_rows)
+
     def Transfer(
         self,
         p_sql=None,
@@ -758,7 +1187,7 @@ class Generic(ABC):
                 p_table (Spartacus.Database.DataTable): the data table containing data to be inserted into target database. Defaults to None.
                 p_targetdatabase (Spartacus.Database.Generic): any object that inherits from Spartacus.Database.Generic. It is the target database connection. Defaults to None.
                 p_tablename (str): the target table name. Defaults to None.
-                p_blocksize (int): number of rows to be read at a time from source database. Defaults to 1000.
+                p_blocksize (int or Spartacus.Database.AdaptiveBlockSize): number of rows to be read at a time from source database, or a controller that adjusts it after every block. Defaults to 1000.
                 p_fields (list): list of fields to be considered while inserting into target database table. Defaults to None.
                 p_alltypesstr (bool): if all fields should be queried as str instances.
 
@@ -780,12 +1209,16 @@ class Generic(ABC):
                 "Either p_sql or p_table parameter must be provided."
             )
         v_return = DataTransferReturn()
+        v_begin = time.time()
         try:
-            v_table = (
-                self.QueryBlock(p_sql, p_blocksize, p_alltypesstr)
-                if p_sql is not None
-                else p_table
-            )
+            if p_sql is not None:
+                v_table = self.QueryBlock(
+                    p_sql, self.BlockSize(p_blocksize), p_alltypesstr
+                )
+                if isinstance(p_blocksize, AdaptiveBlockSize):
+                    p_blocksize.Observe(v_table, time.time() - v_begin)
+            else:
+                v_table = p_table
             if len(v_table.Rows) > 0:
                 p_targetdatabase.InsertBlock(v_table, p_tablename, p_fields)
             v_return.v_numrecords = len(v_table.Rows)
@@ -794,8 +1227,505 @@ class Generic(ABC):
             v_return.v_log = str(exc)
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
+        v_return.v_elapsed = time.time() - v_begin
+        if v_return.v_elapsed > 0:
+            v_return.v_rowspersecond = v_return.v_numrecords / v_return.v_elapsed
+        return v_return
+
+    def BlockSize(self, p_blocksize):
+        if isinstance(p_blocksize, AdaptiveBlockSize):
+            return p_blocksize.Size()
+        else:
+            return p_blocksize
+
+    def StringConverter(self, p_typecode):
+        return str
+
+    def StringConverters(self, p_description):
+        return [self.StringConverter(c[1]) for c in p_description]
+
+    def StringRows(self, p_rows, p_converters):
+        v_rows = []
+        for r in p_rows:
+            v_row = [f(v) if v is not None else "" for f, v in zip(p_converters, r)]
+            if isinstance(r, list):
+                r[:] = v_row
+                v_rows.append(r)
+            else:
+                v_rows.append(v_row)
+        return v_rows
+
+    def CompactRows(self, p_table):
+        v_index = p_table.ColumnIndex()
+        p_table.Rows = [DataRow(tuple(r), v_index) for r in p_table.Rows]
+        p_table.Compact = True
+
+    def Stream(
+        self,
+        p_sql,
+        p_blocksize=1000,
+        p_alltypesstr=False,
+        p_simple=False,
+        p_compact=False,
+    ):
+        v_keep = None
+        v_cur = None
+        try:
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
+            else:
+                v_keep = True
+            v_cur = self.NewCursor()
+            v_cur.execute(p_sql)
+            if v_cur.description:
+                v_columns = [c[0] for c in v_cur.description]
+                if p_alltypesstr:
+                    v_converters = self.StringConverters(v_cur.description)
+                v_first = True
+                v_hasmorerecords = True
+                while v_hasmorerecords:
+                    v_fetch = time.time()
+                    v_blocksize = self.BlockSize(p_blocksize)
+                    if v_blocksize > 0:
+                        if hasattr(v_cur, "arraysize"):
+                            v_cur.arraysize = v_blocksize
+                        v_rows = v_cur.fetchmany(v_blocksize)
+                    else:
+                        v_rows = v_cur.fetchall()
+                    v_hasmorerecords = v_blocksize > 0 and len(v_rows) == v_blocksize
+                    v_table = DataTable(None, False, p_simple, p_compact)
+                    for c in v_columns:
+                        v_table.AddColumn(c)
+                    if p_alltypesstr:
+                        v_rows = self.StringRows(v_rows, v_converters)
+                    v_table.AddRows(v_rows)
+                    v_table.AllTypesStr = p_alltypesstr
+                    if isinstance(p_blocksize, AdaptiveBlockSize):
+                        p_blocksize.Observe(v_table, time.time() - v_fetch)
+                    if v_first or len(v_table.Rows) > 0:
+                        yield v_table
+                    v_first = False
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except builtins.Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        finally:
+            if v_cur is not None:
+                self.CloseCursor(v_cur)
+            if not v_keep:
+                self.Close()
+
+    def NewCursor(self):
+        return self.v_con.cursor()
+
+    def CloseCursor(self, p_cur):
+        try:
+            p_cur.close()
+        except builtins.Exception:
+            pass
+
+    def Clone(self):
+        v_clone = copy.copy(self)
+        v_clone.v_con = None
+        v_clone.v_cur = None
+        v_clone.v_start = True
+        if hasattr(v_clone, "v_cursor"):
+            v_clone.v_cursor = None
+        if hasattr(v_clone, "v_sscur"):
+            v_clone.v_sscur = None
+        if hasattr(v_clone, "v_asynclock"):
+            v_clone.v_asynclock = None
+        return v_clone
+
+    def TransferPipeline(
+        self,
+        p_sql,
+        p_targetdatabase,
+        p_tablename,
+        p_blocksize=1000,
+        p_fields=None,
+        p_alltypesstr=False,
+        p_writers=1,
+        p_queuesize=4,
+    ):
+        """Method used to transfer all data returned by a query from one database to another one, reading and writing at the same time.
+
+            Args:
+                p_sql (str): the sql query to be executed in the current database, in order to provide data to be inserted into target database.
+                p_targetdatabase (Spartacus.Database.Generic): any object that inherits from Spartacus.Database.Generic. It is the target database connection.
+                p_tablename (str): the target table name.
+                p_blocksize (int or Spartacus.Database.AdaptiveBlockSize): number of rows to be read at a time from source database, or a controller that adjusts it after every block. Defaults to 1000.
+                p_fields (list): list of fields to be considered while inserting into target database table. Defaults to None.
+                p_alltypesstr (bool): if all fields should be queried as str instances. Defaults to False.
+                p_writers (int): number of threads inserting blocks into target database. Defaults to 1.
+                p_queuesize (int): maximum number of blocks read but not yet inserted. Defaults to 4.
+
+            Notes:
+                Blocks are read in the current thread while writer threads insert previous blocks, each one through its own connection, obtained with p_targetdatabase.Clone() and opened in autocommit mode.
+                Reading is single-threaded by design: p_sql is read through one QueryBlock cursor, so only the insert side is parallel. To also split the reads, use TransferParallel, which reads each range of a column through its own source connection.
+                Each block is committed as soon as it is inserted, so a failed transfer may leave the blocks inserted before the error in the target table.
+                With more than one writer, rows may be inserted in a different order than they were read.
+                The first error stops the transfer and is reported in v_log.
+
+            Returns:
+                Spartacus.Database.DataTransferReturn.
+
+            Raises:
+                Spartacus.Database.Exception.
+        """
+
+        v_return = DataTransferReturn()
+        v_queue = queue.Queue(p_queuesize)
+        v_error = threading.Event()
+        v_errors = []
+        v_lock = threading.Lock()
+
+        def Put(p_item):
+            while True:
+                try:
+                    v_queue.put(p_item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    if not any([t.is_alive() for t in v_threads]):
+                        return False
+                    elif p_item is not None and v_error.is_set():
+                        return False
+
+        def Write():
+            v_target = None
+            try:
+                v_target = p_targetdatabase.Clone()
+                v_target.Open()
+                while True:
+                    v_table = v_queue.get()
+                    if v_table is None:
+                        break
+                    if not v_error.is_set():
+                        v_target.InsertBlock(v_table, p_tablename, p_fields)
+                        with v_lock:
+                            v_return.v_numrecords = v_return.v_numrecords + len(
+                                v_table.Rows
+                            )
+            except builtins.Exception as exc:
+                with v_lock:
+                    v_errors.append(str(exc))
+                v_error.set()
+            finally:
+                if v_target is not None:
+                    try:
+                        v_target.Close(not v_error.is_set())
+                    except builtins.Exception:
+                        pass
+
+        v_begin = time.time()
+        v_threads = []
+        for k in range(0, max(p_writers, 1)):
+            v_threads.append(threading.Thread(target=Write, daemon=True))
+        for t in v_threads:
+            t.start()
+        v_keep = None
+        try:
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
+            else:
+                v_keep = True
+            v_hasmorerecords = True
+            while v_hasmorerecords and not v_error.is_set():
+                v_fetch = time.time()
+                v_table = self.QueryBlock(
+                    p_sql, self.BlockSize(p_blocksize), p_alltypesstr
+                )
+                if isinstance(p_blocksize, AdaptiveBlockSize):
+                    p_blocksize.Observe(v_table, time.time() - v_fetch)
+                v_hasmorerecords = not self.v_start
+                if len(v_table.Rows) > 0:
+                    if not Put(v_table):
+                        break
+        except builtins.Exception as exc:
+            with v_lock:
+                v_errors.append(str(exc))
+            v_error.set()
+        finally:
+            for t in v_threads:
+                Put(None)
+            for t in v_threads:
+                t.join()
+            if not v_keep:
+                self.Close()
+        v_return.v_hasmorerecords = False
+        if len(v_errors) > 0:
+            v_return.v_log = "\n".join(v_errors)
+        v_return.v_elapsed = time.time() - v_begin
+        if v_return.v_elapsed > 0:
+            v_return.v_rowspersecond = v_return.v_numrecords / v_return.v_elapsed
         return v_return
 
+    def TransferParallel(
+        self,
+        p_sql,
+        p_targetdatabase,
+        p_tablename,
+        p_column=None,
+        p_ranges=None,
+        p_partitions=4,
+        p_blocksize=1000,
+        p_fields=None,
+        p_alltypesstr=False,
+    ):
+        """Method used to transfer all data returned by a query from one database to another one, splitting it in partitions transferred concurrently.
+
+            Args:
+                p_sql (str): the sql query to be executed in the current database, in order to provide data to be inserted into target database.
+                p_targetdatabase (Spartacus.Database.Generic): any object that inherits from Spartacus.Database.Generic. It is the target database connection.
+                p_tablename (str): the target table name.
+                p_column (str): column of p_sql used to split data into partitions.
+                p_ranges (list): list of (low, high) tuples, each one restricting a partition to low <= p_column < high. Defaults to None.
+                p_partitions (int): number of partitions, if p_ranges is not provided. Defaults to 4.
+                p_blocksize (int): number of rows to be read at a time from source database. Defaults to 1000.
+                p_fields (list): list of fields to be considered while inserting into target database table. Defaults to None.
+                p_alltypesstr (bool): if all fields should be queried as str instances. Defaults to False.
+
+            Notes:
+                In a range, low or high can be None, meaning no bound. (None, None) selects rows where p_column is null.
+                If p_ranges is not provided, min and max of p_column are split into p_partitions ranges, plus one partition for nulls. p_column must be numeric or a date/time.
+                Each partition is transferred in its own thread, through its own source and target connections, obtained with Clone(). Target connections are opened in autocommit mode, so each block is committed as soon as it is inserted and a failed partition may leave the blocks inserted before the error in the target table.
+
+            Returns:
+                Spartacus.Database.DataTransferReturn, with one Spartacus.Database.DataTransferReturn per partition in v_partitions.
+
+            Raises:
+                Spartacus.Database.Exception.
+        """
+
+        if p_column is None:
+            raise Spartacus.Database.Exception("Parameter p_column must be provided.")
+        v_begin = time.time()
+        if p_ranges is None:
+            v_ranges = self.GetRanges(p_sql, p_column, p_partitions)
+        else:
+            v_ranges = p_ranges
+        v_sqls = []
+        for v_low, v_high in v_ranges:
+            if v_low is None and v_high is None:
+                v_filter = "{0} is null".format(p_column)
+            elif v_low is None:
+                v_filter = "{0} < {1}".format(p_column, self.MogrifyValue(v_high))
+            elif v_high is None:
+                v_filter = "{0} >= {1}".format(p_column, self.MogrifyValue(v_low))
+            else:
+                v_filter = "{0} >= {1} and {0} < {2}".format(
+                    p_column, self.MogrifyValue(v_low), self.MogrifyValue(v_high)
+                )
+            v_sqls.append(
+                "select * from ({0}) t where {1}".format(
+                    p_sql.strip().rstrip(";"), v_filter
+                )
+            )
+
+        def Run(p_partitionsql):
+            v_partition = DataTransferReturn()
+            v_partitionbegin = time.time()
+            v_source = None
+            v_target = None
+            try:
+                v_source = self.Clone()
+                v_target = p_targetdatabase.Clone()
+                v_source.Open()
+                v_target.Open()
+                while v_partition.v_hasmorerecords:
+                    v_transfer = v_source.Transfer(
+                        p_partitionsql,
+                        None,
+                        v_target,
+                        p_tablename,
+                        p_blocksize,
+                        p_fields,
+                        p_alltypesstr,
+                    )
+                    v_partition.v_numrecords = (
+                        v_partition.v_numrecords + v_transfer.v_numrecords
+                    )
+                    v_partition.v_hasmorerecords = v_transfer.v_hasmorerecords
+                    if v_transfer.v_log is not None:
+                        v_partition.v_log = v_transfer.v_log
+                        break
+            except builtins.Exception as exc:
+                v_partition.v_log = str(exc)
+            finally:
+                if v_source is not None:
+                    try:
+                        v_source.Close()
+                    except builtins.Exception:
+                        pass
+                if v_target is not None:
+                    try:
+                        v_target.Close(v_partition.v_log is None)
+                    except builtins.Exception:
+                        pass
+            v_partition.v_elapsed = time.time() - v_partitionbegin
+            if v_partition.v_elapsed > 0:
+                v_partition.v_rowspersecond = (
+                    v_partition.v_numrecords / v_partition.v_elapsed
+                )
+            return v_partition
+
+        v_return = DataTransferReturn()
+        with ThreadPoolExecutor(max_workers=max(len(v_sqls), 1)) as v_executor:
+            v_return.v_partitions = list(v_executor.map(Run, v_sqls))
+        v_logs = []
+        for k in range(0, len(v_return.v_partitions)):
+            v_partition = v_return.v_partitions[k]
+            v_return.v_numrecords = v_return.v_numrecords + v_partition.v_numrecords
+            if v_partition.v_log is not None:
+                v_logs.append(
+                    "Partition {0} {1}: {2}".format(
+                        k, repr(v_ranges[k]), v_partition.v_log
+                    )
+                )
+        if len(v_logs) > 0:
+            v_return.v_log = "\n".join(v_logs)
+        v_return.v_hasmorerecords = False
+        v_return.v_elapsed = time.time() - v_begin
+        if v_return.v_elapsed > 0:
+            v_return.v_rowspersecond = v_return.v_numrecords / v_return.v_elapsed
+        return v_return
+
+    def GetRanges(self, p_sql, p_column, p_partitions):
+        v_source = self.Clone()
+        try:
+            v_source.Open()
+            v_table = v_source.Query(
+                "select min({0}) as low, max({0}) as high from ({1}) t".format(
+                    p_column, p_sql.strip().rstrip(";")
+                )
+            )
+        finally:
+            v_source.Close()
+        v_low = v_table.Rows[0]["low"]
+        v_high = v_table.Rows[0]["high"]
+        v_ranges = []
+        if v_low is not None:
+            if not isinstance(
+                v_low, (int, float, decimal.Decimal, datetime.date)
+            ) or isinstance(v_low, bool):
+                raise Spartacus.Database.Exception(
+                    "Can not split column {0} of type {1}, please provide p_ranges.".format(
+                        p_column, type(v_low).__name__
+                    )
+                )
+            v_bounds = []
+            for k in range(1, max(p_partitions, 1)):
+                if isinstance(v_low, int):
+                    v_bound = v_low + (v_high - v_low) * k // p_partitions
+                else:
+                    v_bound = v_low + (v_high - v_low) * k / p_partitions
+                if v_bound > v_low and v_bound not in v_bounds:
+                    v_bounds.append(v_bound)
+            v_bounds = [None] + v_bounds + [None]
+            for k in range(0, len(v_bounds) - 1):
+                v_ranges.append((v_bounds[k], v_bounds[k + 1]))
+        v_ranges.append((None, None))
+        return v_ranges
+
+    def Compare(
+        self,
+        p_sql,
+        p_database,
+        p_sql2,
+        p_pkcols,
+        p_statuscolname,
+        p_diffcolname,
+        p_blocksize=1000,
+        p_keepequal=False,
+        p_debugupdates=False,
+        p_alltypesstr=False,
+        p_targetdatabase=None,
+        p_tablename=None,
+        p_fields=None,
+    ):
+        """Method used to compare the results of two queries, block by block, without holding them in memory.
+
+            Args:
+                p_sql (str): the sql query to be executed in the current database.
+                p_database (Spartacus.Database.Generic): any object that inherits from Spartacus.Database.Generic. It is the database where p_sql2 will be executed.
+                p_sql2 (str): the sql query to be executed in p_database.
+                p_pkcols (list): list of columns that identify a row. If empty, all columns are considered.
+                p_statuscolname (str): name of the column that will hold the row status: E (equal), U (updated), D (deleted) or I (inserted).
+                p_diffcolname (str): name of the column that will hold the comma separated list of updated columns.
+                p_blocksize (int): number of rows to be read at a time from each database, and number of rows of each yielded block. Defaults to 1000.
+                p_keepequal (bool): if equal rows should also be returned. Defaults to False.
+                p_debugupdates (bool): if updated values should also show their types. Defaults to False.
+                p_alltypesstr (bool): if all fields should be queried as str instances. Defaults to False.
+                p_targetdatabase (Spartacus.Database.Generic): if provided, each block is also inserted into p_tablename in this database. Defaults to None.
+                p_tablename (str): the target table name. Defaults to None.
+                p_fields (list): list of fields to be considered while inserting into target database table. Defaults to None.
+
+            Notes:
+                Both connections must be open, and both queries must return the same columns, sorted by p_pkcols.
+                Null key values are compared as greater than any other value, so they must be sorted last, e.g. with NULLS LAST.
+                This is a generator, rows are compared as they are fetched, so memory usage depends only on p_blocksize.
+
+            Yields:
+                Spartacus.Database.DataTable.
+
+            Raises:
+                Spartacus.Database.Exception.
+        """
+
+        def FetchRows(p_source, p_table, p_query):
+            v_hasmorerecords = not p_source.v_start
+            for r in p_table.Rows:
+                yield r
+            while v_hasmorerecords:
+                v_table = p_source.QueryBlock(p_query, p_blocksize, p_alltypesstr)
+                v_hasmorerecords = not p_source.v_start
+                for r in v_table.Rows:
+                    yield r
+
+        try:
+            v_table1 = self.QueryBlock(p_sql, p_blocksize, p_alltypesstr)
+            v_table2 = p_database.QueryBlock(p_sql2, p_blocksize, p_alltypesstr)
+            if v_table1.Columns != v_table2.Columns:
+                raise Spartacus.Database.Exception(
+                    "Can not compare tables with different columns."
+                )
+            if len(p_pkcols) > 0:
+                v_pkcols = list(p_pkcols)
+            else:
+                v_pkcols = list(v_table1.Columns)
+            v_table = DataTable()
+            for c in v_table1.Columns:
+                v_table.AddColumn(c)
+            v_table.AddColumn(p_statuscolname)
+            v_table.AddColumn(p_diffcolname)
+            for v_row in v_table1.CompareRows(
+                FetchRows(self, v_table1, p_sql),
+                FetchRows(p_database, v_table2, p_sql2),
+                v_pkcols,
+                p_keepequal,
+                p_debugupdates,
+            ):
+                v_table.AddRow(v_row)
+                if len(v_table.Rows) >= p_blocksize:
+                    if p_targetdatabase is not None:
+                        p_targetdatabase.InsertBlock(v_table, p_tablename, p_fields)
+                    yield v_table
+                    v_table = DataTable()
+                    for c in v_table1.Columns:
+                        v_table.AddColumn(c)
+                    v_table.AddColumn(p_statuscolname)
+                    v_table.AddColumn(p_diffcolname)
+            if len(v_table.Rows) > 0:
+                if p_targetdatabase is not None:
+                    p_targetdatabase.InsertBlock(v_table, p_tablename, p_fields)
+                yield v_table
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except builtins.Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+
     def GetIdentifiersDML(p_sql):
         try:
             v_dict = {"all": [], "readonly": [], "writeonly": [], "readwrite": []}
@@ -933,6 +1863,326 @@ class Generic(ABC):
             raise Spartacus.Database.Exception(str(exc))
 
 
+"""
+------------------------------------------------------------------------
+ConnectionPool
+------------------------------------------------------------------------
+"""
+
+
+class ConnectionPool(object):
+    def __init__(
+        self,
+        p_database,
+        p_minsize=1,
+        p_maxsize=10,
+        p_idletimeout=300,
+        p_timeout=None,
+        p_autocommit=True,
+    ):
+        if p_minsize < 0 or p_maxsize < 1 or p_minsize > p_maxsize:
+            raise Spartacus.Database.Exception(
+                "Pool size must satisfy 0 <= p_minsize <= p_maxsize and p_maxsize >= 1."
+            )
+        self.v_database = p_database
+        self.v_minsize = p_minsize
+        self.v_maxsize = p_maxsize
+        self.v_idletimeout = p_idletimeout
+        self.v_timeout = p_timeout
+        self.v_autocommit = p_autocommit
+        self.v_idle = []
+        self.v_size = 0
+        self.v_closed = False
+        self.v_condition = threading.Condition()
+        for k in range(0, p_minsize):
+            self.v_idle.append((self.NewConnection(), time.time()))
+            self.v_size = self.v_size + 1
+
+    def NewConnection(self):
+        v_connection = self.v_database.Clone()
+        v_connection.Open(self.v_autocommit)
+        return v_connection
+
+    def Discard(self, p_connection):
+        try:
+            p_connection.Close(False)
+        except builtins.Exception:
+            pass
+
+    def Prune(self):
+        v_now = time.time()
+        v_idle = []
+        v_discarded = []
+        for v_connection, v_lastused in self.v_idle:
+            if (
+                self.v_idletimeout is not None
+                and v_now - v_lastused > self.v_idletimeout
+                and self.v_size > self.v_minsize
+            ):
+                v_discarded.append(v_connection)
+                self.v_size = self.v_size - 1
+            else:
+                v_idle.append((v_connection, v_lastused))
+        self.v_idle = v_idle
+        return v_discarded
+
+    def Checkout(self, p_timeout=None):
+        v_timeout = p_timeout if p_timeout is not None else self.v_timeout
+        v_deadline = None if v_timeout is None else time.time() + v_timeout
+        v_connection = None
+        v_discarded = []
+        with self.v_condition:
+            while v_connection is None:
+                if self.v_closed:
+                    raise Spartacus.Database.Exception("Connection pool is closed.")
+                v_discarded.extend(self.Prune())
+                if len(self.v_idle) > 0:
+                    v_candidate = self.v_idle.pop()[0]
+                    if v_candidate.GetConStatus() == 0:
+                        v_discarded.append(v_candidate)
+                        self.v_size = self.v_size - 1
+                    else:
+                        v_connection = v_candidate
+                elif self.v_size < self.v_maxsize:
+                    self.v_size = self.v_size + 1
+                    break
+                else:
+                    if v_deadline is None:
+                        self.v_condition.wait()
+                    else:
+                        v_remaining = v_deadline - time.time()
+                        if v_remaining <= 0:
+                            raise Spartacus.Database.Exception(
+                                "Timeout waiting for a connection from the pool."
+                            )
+                        self.v_condition.wait(v_remaining)
+        for v_candidate in v_discarded:
+            self.Discard(v_candidate)
+        if v_connection is None:
+            try:
+                v_connection = self.NewConnection()
+            except builtins.Exception as exc:
+                with self.v_condition:
+                    self.v_size = self.v_size - 1
+                    self.v_condition.notify()
+                raise Spartacus.Database.Exception(str(exc))
+        return v_connection
+
+    def Checkin(self, p_connection, p_discard=False):
+        v_discard = p_discard
+        if not v_discard:
+            try:
+                v_status = p_connection.GetConStatus()
+                if v_status == 3 or v_status == 4:
+                    p_connection.Rollback()
+                    v_status = p_connection.GetConStatus()
+                v_discard = v_status != 1
+                p_connection.v_start = True
+            except builtins.Exception:
+                v_discard = True
+        with self.v_condition:
+            if v_discard or self.v_closed:
+                self.v_size = self.v_size - 1
+            else:
+                self.v_idle.append((p_connection, time.time()))
+            self.v_condition.notify()
+        if v_discard or self.v_closed:
+            self.Discard(p_connection)
+
+    def Invalidate(self):
+        with self.v_condition:
+            v_idle = self.v_idle
+            self.v_idle = []
+            self.v_size = self.v_size - len(v_idle)
+            self.v_condition.notify_all()
+        for v_connection, v_lastused in v_idle:
+            self.Discard(v_connection)
+
+    def Close(self):
+        with self.v_condition:
+            self.v_closed = True
+        self.Invalidate()
+
+    def Run(self, p_function, p_retry=True):
+        v_connection = self.Checkout()
+        try:
+            return p_function(v_connection)
+        except builtins.Exception as exc:
+            try:
+                v_lost = v_connection.GetConStatus() == 0
+            except builtins.Exception:
+                v_lost = True
+            self.Checkin(v_connection, v_lost)
+            v_connection = None
+            if v_lost:
+                self.Invalidate()
+            if not (p_retry and v_lost):
+                raise exc
+        finally:
+            if v_connection is not None:
+                self.Checkin(v_connection)
+        return self.Run(p_function, False)
+
+    def Query(self, p_sql, p_alltypesstr=False, p_simple=False, p_compact=False):
+        return self.Run(
+            lambda v_connection: v_connection.Query(
+                p_sql, p_alltypesstr, p_simple, p_compact=p_compact
+            )
+        )
+
+    def Transaction(self, p_connection, p_function):
+        try:
+            v_result = p_function(p_connection)
+            if not self.v_autocommit:
+                p_connection.Commit()
+            return v_result
+        except builtins.Exception:
+            if not self.v_autocommit:
+                try:
+                    p_connection.Rollback()
+                except builtins.Exception:
+                    pass
+            raise
+
+    def Execute(self, p_sql):
+        v_connection = self.Checkout()
+        try:
+            self.Transaction(
+                v_connection, lambda v_connection: v_connection.Execute(p_sql)
+            )
+        finally:
+            self.Checkin(v_connection)
+
+    def ExecuteScalar(self, p_sql):
+        return self.Run(
+            lambda v_connection: self.Transaction(
+                v_connection, lambda v_connection: v_connection.ExecuteScalar(p_sql)
+            )
+        )
+
+
+"""
+------------------------------------------------------------------------
+FanOut
+------------------------------------------------------------------------
+"""
+
+
+class FanOut(object):
+    def __init__(self, p_databases, p_workers=None):
+        if isinstance(p_databases, dict):
+            self.v_databases = OrderedDict(p_databases.items())
+        else:
+            self.v_databases = OrderedDict(enumerate(p_databases))
+        self.v_workers = p_workers
+
+    async def AsyncRun(self, p_databases, p_sql, p_timeout, p_alltypesstr, p_simple):
+        async def Run(p_database):
+            try:
+                return await asyncio.wait_for(
+                    p_database.AsyncQuery(p_sql, p_alltypesstr, p_simple), p_timeout
+                )
+            except asyncio.TimeoutError:
+                return Spartacus.Database.Exception(
+                    "Timeout after {0} seconds.".format(p_timeout)
+                )
+            except Spartacus.Database.Exception as exc:
+                return exc
+            except builtins.Exception as exc:
+                return Spartacus.Database.Exception(str(exc))
+
+        return await asyncio.gather(*[Run(v_database) for v_database in p_databases])
+
+    def Query(
+        self, p_sql, p_merge=False, p_timeout=None, p_alltypesstr=False, p_simple=False
+    ):
+        v_results = OrderedDict()
+        v_async = OrderedDict()
+        v_threads = OrderedDict()
+        for v_key, v_database in self.v_databases.items():
+            v_results[v_key] = None
+            try:
+                v_clone = v_database.Clone()
+                if isinstance(v_clone, PostgreSQL):
+                    v_async[v_key] = v_clone
+                else:
+                    v_threads[v_key] = v_clone
+            except Spartacus.Database.Exception as exc:
+                v_results[v_key] = exc
+            except builtins.Exception as exc:
+                v_results[v_key] = Spartacus.Database.Exception(str(exc))
+        if self.v_workers is not None:
+            v_workers = self.v_workers
+        else:
+            v_workers = min(32, len(v_threads))
+        if len(v_async) > 0:
+            v_workers = v_workers + 1
+        if p_timeout is not None:
+            v_deadline = time.time() + p_timeout
+        else:
+            v_deadline = None
+        v_executor = ThreadPoolExecutor(max_workers=max(1, v_workers))
+        try:
+            if len(v_async) > 0:
+                v_loop = v_executor.submit(
+                    asyncio.run,
+                    self.AsyncRun(
+                        list(v_async.values()),
+                        p_sql,
+                        p_timeout,
+                        p_alltypesstr,
+                        p_simple,
+                    ),
+                )
+            v_futures = OrderedDict()
+            for v_key, v_clone in v_threads.items():
+                v_futures[v_key] = v_executor.submit(
+                    v_clone.Query, p_sql, p_alltypesstr, p_simple
+                )
+            for v_key, v_future in v_futures.items():
+                try:
+                    if v_deadline is not None:
+                        v_results[v_key] = v_future.result(
+                            max(0, v_deadline - time.time())
+                        )
+                    else:
+                        v_results[v_key] = v_future.result()
+                except concurrent.futures.TimeoutError:
+                    if not v_future.cancel():
+                        try:
+                            v_threads[v_key].Cancel()
+                        except builtins.Exception:
+                            pass
+                    v_results[v_key] = Spartacus.Database.Exception(
+                        "Timeout after {0} seconds.".format(p_timeout)
+                    )
+                except Spartacus.Database.Exception as exc:
+                    v_results[v_key] = exc
+                except builtins.Exception as exc:
+                    v_results[v_key] = Spartacus.Database.Exception(str(exc))
+            if len(v_async) > 0:
+                for v_key, v_result in zip(v_async.keys(), v_loop.result()):
+                    v_results[v_key] = v_result
+        finally:
+            v_executor.shutdown(wait=False)
+        if p_merge:
+            v_errors = [
+                "Source {0}: {1}".format(v_key, str(v_result))
+                for v_key, v_result in v_results.items()
+                if isinstance(v_result, Exception)
+            ]
+            if len(v_errors) > 0:
+                raise Spartacus.Database.Exception("\n".join(v_errors))
+            v_table = DataTable(None, p_alltypesstr, p_simple)
+            for v_result in v_results.values():
+                if len(v_table.Columns) == 0:
+                    v_table.Columns = list(v_result.Columns)
+                v_table.Merge(v_result)
+            return v_table
+        else:
+            return v_results
+
+
 """
 ------------------------------------------------------------------------
 SQLite
@@ -986,7 +2236,7 @@ class SQLite(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
-    def Query(self, p_sql, p_alltypesstr=False, p_simple=False):
+    def Query(self, p_sql, p_alltypesstr=False, p_simple=False, p_compact=False):
         try:
             v_keep = None
             if self.v_con is None:
@@ -995,14 +2245,11 @@ class SQLite(Generic):
             else:
                 v_keep = True
             self.v_cur.execute(p_sql)
-            v_table = DataTable(None, p_alltypesstr, p_simple)
+            v_table = DataTable(None, p_alltypesstr, p_simple, p_compact)
             if self.v_cur.description:
                 for c in self.v_cur.description:
                     v_table.AddColumn(c[0])
-                v_row = self.v_cur.fetchone()
-                while v_row is not None:
-                    v_table.AddRow(list(v_row))
-                    v_row = self.v_cur.fetchone()
+                v_table.AddRows(self.v_cur.fetchall())
             return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -1105,6 +2352,7 @@ class SQLite(Generic):
     def Cancel(self, p_usesameconn=True):
         try:
             if self.v_con:
+                self.v_con.interrupt()
                 self.v_con.rollback()
                 if self.v_cur:
                     self.v_cur.close()
@@ -1181,7 +2429,9 @@ class SQLite(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(
+        self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_compact=False
+    ):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception(
@@ -1190,22 +2440,14 @@ class SQLite(Generic):
             else:
                 if self.v_start:
                     self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
+                v_table = DataTable(None, p_alltypesstr, p_simple, p_compact)
                 if self.v_cur.description:
                     for c in self.v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
                     if p_blocksize > 0:
-                        k = 0
-                        while v_row is not None and k < p_blocksize:
-                            v_table.AddRow(list(v_row))
-                            k = k + 1
-                            if k < p_blocksize:
-                                v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchmany(p_blocksize))
                     else:
-                        while v_row is not None:
-                            v_table.AddRow(list(v_row))
-                            v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchall())
                 if self.v_start:
                     self.v_start = False
                 if len(v_table.Rows) < p_blocksize:
@@ -1226,30 +2468,31 @@ class SQLite(Generic):
                 v_keep = False
             else:
                 v_keep = True
-            v_columnames = []
-            if p_fields is None:
-                v_fields = []
-                for c in p_block.Columns:
-                    v_columnames.append(c)
-                    v_fields.append(DataField(c))
-            else:
-                v_fields = p_fields
-                for p in v_fields:
-                    v_columnames.append(p.v_name)
-            v_insert = "begin; "
-            for r in p_block.Rows:
-                v_insert = (
-                    v_insert
-                    + "insert into "
-                    + p_tablename
-                    + "("
-                    + ",".join(v_columnames)
-                    + ") values "
-                    + self.Mogrify(r, v_fields)
-                    + "; "
-                )
-            v_insert = v_insert + "commit;"
-            self.v_cur.executescript(v_insert)
+            v_sql, v_rows = self.PrepareInsert(
+                p_block,
+                p_tablename,
+                p_fields,
+                "qmark",
+                {
+                    decimal.Decimal: float,
+                    uuid.UUID: str,
+                    datetime.datetime: str,
+                    datetime.date: str,
+                    dict: json.dumps,
+                },
+            )
+            if len(v_rows) > 0:
+                v_begin = not self.v_con.in_transaction
+                if v_begin:
+                    self.v_cur.execute("begin")
+                try:
+                    self.v_cur.executemany(v_sql, v_rows)
+                except sqlite3.Error:
+                    if v_begin:
+                        self.v_cur.execute("rollback")
+                    raise
+                if v_begin:
+                    self.v_cur.execute("commit")
         except Spartacus.Database.Exception as exc:
             raise exc
         except sqlite3.Error as exc:
@@ -1292,6 +2535,9 @@ class Memory(Generic):
     def GetConnectionString(self):
         return None
 
+    def Clone(self):
+        raise Spartacus.Database.Exception("Can not clone an in-memory database.")
+
     def Open(self, p_autocommit=True):
         try:
             if p_autocommit:
@@ -1317,7 +2563,7 @@ class Memory(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
-    def Query(self, p_sql, p_alltypesstr=False, p_simple=False):
+    def Query(self, p_sql, p_alltypesstr=False, p_simple=False, p_compact=False):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception(
@@ -1325,14 +2571,11 @@ class Memory(Generic):
                 )
             else:
                 self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
+                v_table = DataTable(None, p_alltypesstr, p_simple, p_compact)
                 if self.v_cur.description:
                     for c in self.v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
-                    while v_row is not None:
-                        v_table.AddRow(list(v_row))
-                        v_row = self.v_cur.fetchone()
+                    v_table.AddRows(self.v_cur.fetchall())
                 return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -1476,7 +2719,9 @@ class Memory(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(
+        self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_compact=False
+    ):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception(
@@ -1485,22 +2730,14 @@ class Memory(Generic):
             else:
                 if self.v_start:
                     self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
+                v_table = DataTable(None, p_alltypesstr, p_simple, p_compact)
                 if self.v_cur.description:
                     for c in self.v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
                     if p_blocksize > 0:
-                        k = 0
-                        while v_row is not None and k < p_blocksize:
-                            v_table.AddRow(list(v_row))
-                            k = k + 1
-                            if k < p_blocksize:
-                                v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchmany(p_blocksize))
                     else:
-                        while v_row is not None:
-                            v_table.AddRow(list(v_row))
-                            v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchall())
                 if self.v_start:
                     self.v_start = False
                 if len(v_table.Rows) < p_blocksize:
@@ -1515,30 +2752,31 @@ class Memory(Generic):
 
     def InsertBlock(self, p_block, p_tablename, p_fields=None):
         try:
-            v_columnames = []
-            if p_fields is None:
-                v_fields = []
-                for c in p_block.Columns:
-                    v_columnames.append(c)
-                    v_fields.append(DataField(c))
-            else:
-                v_fields = p_fields
-                for p in v_fields:
-                    v_columnames.append(p.v_name)
-            v_insert = "begin; "
-            for r in p_block.Rows:
-                v_insert = (
-                    v_insert
-                    + "insert into "
-                    + p_tablename
-                    + "("
-                    + ",".join(v_columnames)
-                    + ") values "
-                    + self.Mogrify(r, v_fields)
-                    + "; "
-                )
-            v_insert = v_insert + "commit;"
-            self.v_cur.executescript(v_insert)
+            v_sql, v_rows = self.PrepareInsert(
+                p_block,
+                p_tablename,
+                p_fields,
+                "qmark",
+                {
+                    decimal.Decimal: float,
+                    uuid.UUID: str,
+                    datetime.datetime: str,
+                    datetime.date: str,
+                    dict: json.dumps,
+                },
+            )
+            if len(v_rows) > 0:
+                v_begin = not self.v_con.in_transaction
+                if v_begin:
+                    self.v_cur.execute("begin")
+                try:
+                    self.v_cur.executemany(v_sql, v_rows)
+                except sqlite3.Error:
+                    if v_begin:
+                        self.v_cur.execute("rollback")
+                    raise
+                if v_begin:
+                    self.v_cur.execute("commit")
         except Spartacus.Database.Exception as exc:
             raise exc
         except sqlite3.Error as exc:
@@ -1550,11 +2788,201 @@ class Memory(Generic):
         return self.Query(p_sql).Pretty()
 
 
-"""
-------------------------------------------------------------------------
-PostgreSQL
-------------------------------------------------------------------------
-"""
+"""
+------------------------------------------------------------------------
+PostgreSQL
+------------------------------------------------------------------------
+"""
+
+
+class TypeCache(object):
+    def __init__(self, p_ttl=3600):
+        self.v_ttl = p_ttl
+        self.v_entries = {}
+        self.v_lock = threading.Lock()
+
+    def Lookup(self, p_key):
+        with self.v_lock:
+            v_entry = self.v_entries.get(p_key)
+        if v_entry is not None and (
+            self.v_ttl is None or time.time() - v_entry[1] <= self.v_ttl
+        ):
+            return v_entry[0]
+        else:
+            return None
+
+    def Set(self, p_key, p_types):
+        with self.v_lock:
+            self.v_entries[p_key] = (p_types, time.time())
+        return p_types
+
+    def Get(self, p_key, p_loader):
+        v_types = self.Lookup(p_key)
+        if v_types is None:
+            v_types = self.Set(p_key, p_loader())
+        return v_types
+
+    def Invalidate(self, p_key=None):
+        with self.v_lock:
+            if p_key is None:
+                self.v_entries = {}
+            else:
+                self.v_entries.pop(p_key, None)
+
+
+v_pg_types = TypeCache()
+
+
+class CopyReader(object):
+    def __init__(self, p_rows, p_fields):
+        self.v_rows = iter(p_rows)
+        self.v_names = [f.v_name for f in p_fields]
+        self.v_pending = ""
+
+    def read(self, p_size=-1):
+        v_chunks = [self.v_pending]
+        v_length = len(self.v_pending)
+        while p_size < 0 or v_length < p_size:
+            r = next(self.v_rows, None)
+            if r is None:
+                break
+            v_line = "\t".join([self.Value(r[c]) for c in self.v_names]) + "\n"
+            v_chunks.append(v_line)
+            v_length = v_length + len(v_line)
+        v_data = "".join(v_chunks)
+        if p_size < 0 or len(v_data) <= p_size:
+            self.v_pending = ""
+            return v_data
+        else:
+            self.v_pending = v_data[p_size:]
+            return v_data[:p_size]
+
+    def Escape(self, p_text):
+        return (
+            p_text.replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+        )
+
+    def Value(self, p_value):
+        if p_value is None:
+            return "\\N"
+        elif type(p_value) == type(str()):
+            return self.Escape(p_value)
+        elif type(p_value) == bool:
+            return "t" if p_value else "f"
+        elif isinstance(p_value, (bytes, bytearray, memoryview)):
+            return "\\\\x" + bytes(p_value).hex()
+        elif type(p_value) == type(list()):
+            return self.Escape(self.Array(p_value))
+        elif type(p_value) == type(dict()):
+            return self.Escape(json.dumps(p_value))
+        else:
+            return self.Escape(str(p_value))
+
+    def Array(self, p_array):
+        v_items = []
+        for v_value in p_array:
+            if v_value is None:
+                v_items.append("NULL")
+            elif type(v_value) == type(list()):
+                v_items.append(self.Array(v_value))
+            else:
+                if type(v_value) == bool:
+                    v_text = "t" if v_value else "f"
+                elif type(v_value) == type(dict()):
+                    v_text = json.dumps(v_value)
+                else:
+                    v_text = str(v_value)
+                v_items.append(
+                    '"{0}"'.format(v_text.replace("\\", "\\\\").replace('"', '\\"'))
+                )
+        return "{" + ",".join(v_items) + "}"
+
+
+class CopyWriter(io.TextIOBase):
+    def __init__(self, p_maxsize=16, p_chunksize=65536):
+        self.v_queue = queue.Queue(p_maxsize)
+        self.v_stop = threading.Event()
+        self.v_chunks = []
+        self.v_length = 0
+        self.v_chunksize = p_chunksize
+        self.v_error = None
+        self.v_escape = re.compile(r"\\(?:([0-7]{1,3})|x([0-9a-fA-F]{1,2})|(.))")
+        self.v_escapes = {
+            "b": "\b",
+            "f": "\f",
+            "n": "\n",
+            "r": "\r",
+            "t": "\t",
+            "v": "\v",
+        }
+
+    def writable(self):
+        return True
+
+    def write(self, p_data):
+        self.v_chunks.append(p_data)
+        self.v_length = self.v_length + len(p_data)
+        if self.v_length >= self.v_chunksize:
+            self.Put("".join(self.v_chunks))
+            self.v_chunks = []
+            self.v_length = 0
+        return len(p_data)
+
+    def Put(self, p_data):
+        while True:
+            if self.v_stop.is_set():
+                raise Spartacus.Database.Exception("COPY was stopped.")
+            try:
+                self.v_queue.put(p_data, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def Run(self, p_cursor, p_sql):
+        try:
+            p_cursor.copy_expert(p_sql, self)
+            if len(self.v_chunks) > 0:
+                self.Put("".join(self.v_chunks))
+        except builtins.Exception as exc:
+            if not self.v_stop.is_set():
+                self.v_error = exc
+        finally:
+            try:
+                self.Put(None)
+            except Spartacus.Database.Exception:
+                pass
+
+    def Lines(self):
+        v_pending = ""
+        while True:
+            v_data = self.v_queue.get()
+            if v_data is None:
+                break
+            v_lines = (v_pending + v_data).split("\n")
+            v_pending = v_lines.pop()
+            for v_line in v_lines:
+                yield v_line
+        if self.v_error is not None:
+            raise Spartacus.Database.Exception(str(self.v_error))
+
+    def Unescape(self, p_match):
+        if p_match.group(1) is not None:
+            return chr(int(p_match.group(1), 8))
+        elif p_match.group(2) is not None:
+            return chr(int(p_match.group(2), 16))
+        else:
+            return self.v_escapes.get(p_match.group(3), p_match.group(3))
+
+    def Value(self, p_text):
+        if p_text == "\\N":
+            return None
+        elif "\\" in p_text:
+            return self.v_escape.sub(self.Unescape, p_text)
+        else:
+            return p_text
 
 
 class PostgreSQL(Generic):
@@ -1645,6 +3073,7 @@ class PostgreSQL(Generic):
             self.v_expanded = False
             self.v_timing = False
             self.v_types = None
+            self.v_asynclock = None
             psycopg2.extensions.register_type(
                 psycopg2.extensions.new_type(
                     psycopg2.extensions.INTERVAL.values, "INTERVAL_STR", psycopg2.STRING
@@ -1715,6 +3144,75 @@ class PostgreSQL(Generic):
     def DateHandler(self, value, cursor):
         return value
 
+    def GetTypesKey(self):
+        return (
+            self.v_host,
+            self.v_port,
+            self.v_service,
+            self.v_dsn,
+            self.v_conn_string,
+        )
+
+    def LoadTypes(self, p_refresh=False):
+        def Load():
+            v_cur = self.v_con.cursor()
+            try:
+                v_cur.execute("select oid, typname from pg_type")
+                if self.v_con.async_:
+                    self.Wait()
+                return dict([(r[0], r[1]) for r in v_cur.fetchall()])
+            finally:
+                v_cur.close()
+
+        if p_refresh:
+            v_pg_types.Invalidate(self.GetTypesKey())
+        self.v_types = v_pg_types.Get(self.GetTypesKey(), Load)
+        return self.v_types
+
+    def RegisterTypes(self, p_datetime_as_string=False, p_json_as_string=False):
+        if p_datetime_as_string:
+            tmp = []
+            for oid, name in self.v_types.items():
+                if name == "date" or name == "timestamp" or name == "timestamptz":
+                    tmp.append(oid)
+            oids = tuple(tmp)
+            psycopg2.extensions.register_type(
+                psycopg2.extensions.new_type(oids, "DATE", self.DateHandler),
+                self.v_cur,
+            )
+        if p_json_as_string:
+            psycopg2.extras.register_default_json(self.v_cur, loads=lambda x: x)
+            psycopg2.extras.register_default_jsonb(self.v_cur, loads=lambda x: x)
+
+    def InvalidateTypes(self):
+        v_pg_types.Invalidate(self.GetTypesKey())
+        self.v_types = None
+
+    def StringConverter(self, p_typecode):
+        v_typename = self.GetTypeName(p_typecode)
+        if (
+            v_typename is None
+            or v_typename.startswith("_")
+            or v_typename in ("json", "jsonb")
+        ):
+            return self.String
+        else:
+            return str
+
+    def GetTypeName(self, p_oid):
+        try:
+            if self.v_types is not None and p_oid in self.v_types:
+                return self.v_types[p_oid]
+            if self.v_con is None or (self.v_con.async_ and not self.v_start):
+                return None
+            return self.LoadTypes(self.v_types is not None).get(p_oid)
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except psycopg2.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except builtins.Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+
     def Open(
         self,
         p_autocommit=True,
@@ -1740,34 +3238,10 @@ class PostgreSQL(Generic):
             self.v_start = True
             self.v_cursor = None
             # PostgreSQL types
-            if self.v_types is None:
-                self.v_cur.execute("select oid, typname from pg_type")
-                if p_async:
-                    self.Wait()
-                self.v_types = dict(
-                    [(r["oid"], r["typname"]) for r in self.v_cur.fetchall()]
-                )
-                if p_datetime_as_string:
-                    tmp = []
-                    for oid, name in self.v_types.items():
-                        if (
-                            name == "date"
-                            or name == "timestamp"
-                            or name == "timestamptz"
-                        ):
-                            tmp.append(oid)
-                    oids = tuple(tmp)
-                    psycopg2.extensions.register_type(
-                        psycopg2.extensions.new_type(oids, "DATE", self.DateHandler),
-                        self.v_cur,
-                    )
-                if p_json_as_string:
-                    psycopg2.extras.register_default_json(self.v_cur, loads=lambda x: x)
-                    psycopg2.extras.register_default_jsonb(
-                        self.v_cur, loads=lambda x: x
-                    )
-                if not p_autocommit and not p_async:
-                    self.v_con.commit()
+            self.LoadTypes()
+            self.RegisterTypes(p_datetime_as_string, p_json_as_string)
+            if not p_autocommit and not p_async:
+                self.v_con.commit()
             self.v_con.notices = DataList()
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -1783,6 +3257,7 @@ class PostgreSQL(Generic):
         p_simple=False,
         p_datetime_as_string=False,
         p_json_as_string=True,
+        p_compact=False,
     ):
         try:
             v_keep = None
@@ -1803,12 +3278,11 @@ class PostgreSQL(Generic):
                     v_table.AddColumn(c[0])
                 v_table.Rows = self.v_cur.fetchall()
                 if p_alltypesstr:
-                    for i in range(0, len(v_table.Rows)):
-                        for j in range(0, len(v_table.Columns)):
-                            if v_table.Rows[i][j] != None:
-                                v_table.Rows[i][j] = self.String(v_table.Rows[i][j])
-                            else:
-                                v_table.Rows[i][j] = ""
+                    self.StringRows(
+                        v_table.Rows, self.StringConverters(self.v_cur.description)
+                    )
+                if p_compact:
+                    self.CompactRows(v_table)
             return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -1982,7 +3456,9 @@ class PostgreSQL(Generic):
                 k = 0
                 for c in self.v_cur.description:
                     v_fields.append(
-                        DataField(c[0], p_type=type(r[k]), p_dbtype=self.v_types[c[1]])
+                        DataField(
+                            c[0], p_type=type(r[k]), p_dbtype=self.GetTypeName(c[1])
+                        )
                     )
                     if v_first:
                         v_sql = v_sql + "quote_ident('{0}')".format(c[0])
@@ -1994,7 +3470,9 @@ class PostgreSQL(Generic):
                 k = 0
                 for c in self.v_cur.description:
                     v_fields.append(
-                        DataField(c[0], p_type=type(None), p_dbtype=self.v_types[c[1]])
+                        DataField(
+                            c[0], p_type=type(None), p_dbtype=self.GetTypeName(c[1])
+                        )
                     )
                     if v_first:
                         v_sql = v_sql + "quote_ident('{0}')".format(c[0])
@@ -2146,7 +3624,9 @@ class PostgreSQL(Generic):
             self.v_cursor = None
             return p_sql
 
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(
+        self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_compact=False
+    ):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception(
@@ -2188,14 +3668,12 @@ class PostgreSQL(Generic):
                         else:
                             v_table.Rows = self.v_cur.fetchall()
                         if p_alltypesstr:
-                            for i in range(0, len(v_table.Rows)):
-                                for j in range(0, len(v_table.Columns)):
-                                    if v_table.Rows[i][j] != None:
-                                        v_table.Rows[i][j] = self.String(
-                                            v_table.Rows[i][j]
-                                        )
-                                    else:
-                                        v_table.Rows[i][j] = ""
+                            self.StringRows(
+                                v_table.Rows,
+                                self.StringConverters(self.v_cur.description),
+                            )
+                        if p_compact:
+                            self.CompactRows(v_table)
                     if self.v_start:
                         self.v_start = False
                     if len(v_table.Rows) < p_blocksize:
@@ -2217,7 +3695,81 @@ class PostgreSQL(Generic):
             self.v_cursor = None
             raise Spartacus.Database.Exception(str(exc))
 
-    def InsertBlock(self, p_block, p_tablename, p_fields=None):
+    def Stream(
+        self,
+        p_sql,
+        p_blocksize=1000,
+        p_alltypesstr=False,
+        p_simple=False,
+        p_compact=False,
+    ):
+        v_keep = None
+        v_cur = None
+        try:
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
+            else:
+                v_keep = True
+            if self.v_con.async_ == 1:
+                raise Spartacus.Database.Exception(
+                    "This method is not allowed in asynchronous mode."
+                )
+            v_statements = sqlparse.parse(p_sql)
+            v_named = len(v_statements) == 1 and v_statements[0].get_type() == "SELECT"
+            if v_named:
+                v_cur = self.v_con.cursor(
+                    "{0}_{1}".format(self.v_application_name, uuid.uuid4().hex),
+                    withhold=self.v_con.autocommit,
+                )
+            else:
+                v_cur = self.v_con.cursor()
+            v_cur.execute(p_sql)
+            v_columns = None
+            v_first = True
+            v_hasmorerecords = v_named or v_cur.description is not None
+            while v_hasmorerecords:
+                v_fetch = time.time()
+                v_blocksize = self.BlockSize(p_blocksize)
+                if v_blocksize > 0:
+                    v_rows = v_cur.fetchmany(v_blocksize)
+                else:
+                    v_rows = v_cur.fetchall()
+                if v_columns is None:
+                    if not v_cur.description:
+                        break
+                    v_columns = [c[0] for c in v_cur.description]
+                    if p_alltypesstr:
+                        v_converters = self.StringConverters(v_cur.description)
+                v_hasmorerecords = v_blocksize > 0 and len(v_rows) == v_blocksize
+                v_table = DataTable(None, False, p_simple, p_compact)
+                for c in v_columns:
+                    v_table.AddColumn(c)
+                if p_alltypesstr:
+                    v_rows = self.StringRows(v_rows, v_converters)
+                v_table.AddRows(v_rows)
+                v_table.AllTypesStr = p_alltypesstr
+                if isinstance(p_blocksize, AdaptiveBlockSize):
+                    p_blocksize.Observe(v_table, time.time() - v_fetch)
+                if v_first or len(v_table.Rows) > 0:
+                    yield v_table
+                v_first = False
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except psycopg2.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except builtins.Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        finally:
+            if v_cur is not None:
+                try:
+                    v_cur.close()
+                except builtins.Exception:
+                    pass
+            if not v_keep:
+                self.Close()
+
+    def InsertBlock(self, p_block, p_tablename, p_fields=None, p_copy=True):
         try:
             v_columnames = []
             if p_fields is None:
@@ -2229,18 +3781,41 @@ class PostgreSQL(Generic):
                 v_fields = p_fields
                 for p in v_fields:
                     v_columnames.append(p.v_name)
-            v_values = []
-            for r in p_block.Rows:
-                v_values.append(self.Mogrify(r, v_fields))
-            self.Execute(
-                "insert into "
-                + p_tablename
-                + "("
-                + ",".join(v_columnames)
-                + ") values "
-                + ",".join(v_values)
-                + ""
-            )
+            if (
+                p_copy
+                and (self.v_con is None or self.v_con.async_ == 0)
+                and all([f.v_mask == "#" for f in v_fields])
+            ):
+                v_keep = None
+                try:
+                    if self.v_con is None:
+                        self.Open()
+                        v_keep = False
+                    else:
+                        v_keep = True
+                    self.v_cur.copy_expert(
+                        "copy "
+                        + p_tablename
+                        + "("
+                        + ",".join(v_columnames)
+                        + ") from stdin",
+                        CopyReader(p_block.Rows, v_fields),
+                    )
+                finally:
+                    if not v_keep:
+                        self.Close()
+            else:
+                v_render = self.MogrifyTemplate(v_fields, p_block)
+                v_values = [v_render(r) for r in p_block.Rows]
+                self.Execute(
+                    "insert into "
+                    + p_tablename
+                    + "("
+                    + ",".join(v_columnames)
+                    + ") values "
+                    + ",".join(v_values)
+                    + ""
+                )
         except Spartacus.Database.Exception as exc:
             raise exc
         except psycopg2.Error as exc:
@@ -2248,6 +3823,145 @@ class PostgreSQL(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
+    def QueryCopy(
+        self,
+        p_sql,
+        p_blocksize=1000,
+        p_alltypesstr=False,
+        p_simple=False,
+        p_compact=False,
+    ):
+        """Method used to read the results of a query in blocks through COPY TO STDOUT, which is faster than fetching them with a cursor.
+
+            Args:
+                p_sql (str): the sql query to be executed. It must be a single SELECT statement.
+                p_blocksize (int): number of rows in each yielded block. Defaults to 1000.
+                p_alltypesstr (bool): if all fields should be returned as str instances. Defaults to False.
+                p_simple (bool): if rows should be lists instead of dictionaries. Defaults to False.
+                p_compact (bool): if rows should be stored as Spartacus.Database.DataRow instances. Defaults to False.
+
+            Notes:
+                COPY sends every value as text, so each column is parsed by the same psycopg2 typecaster used for fetched rows: blocks hold the same values as QueryBlock would return, with p_alltypesstr applied the same way.
+                COPY does not report column names or types, so the query is first run with LIMIT 0 on the same connection to get them; it is planned but returns no rows.
+
+            Yields:
+                Spartacus.Database.DataTable.
+
+            Raises:
+                Spartacus.Database.Exception.
+        """
+
+        v_keep = None
+        v_cur = None
+        v_writer = None
+        v_thread = None
+        v_done = False
+        try:
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
+            else:
+                v_keep = True
+            if self.v_con.async_ == 1:
+                raise Spartacus.Database.Exception(
+                    "This method is not allowed in asynchronous mode."
+                )
+            v_sql = p_sql.strip().rstrip(";")
+            v_cur = self.v_con.cursor()
+            v_cur.execute("select * from ({0}) t limit 0".format(v_sql))
+            v_columns = [c[0] for c in v_cur.description]
+            v_casters = [self.TypeCaster(c[1]) for c in v_cur.description]
+            v_converters = None
+            if p_alltypesstr:
+                v_converters = self.StringConverters(v_cur.description)
+            v_writer = CopyWriter()
+            v_thread = threading.Thread(
+                target=v_writer.Run,
+                args=(v_cur, "copy ({0}) to stdout".format(v_sql)),
+                daemon=True,
+            )
+            v_thread.start()
+            v_rows = []
+            for v_line in v_writer.Lines():
+                if "\\" in v_line:
+                    v_values = [v_writer.Value(v) for v in v_line.split("\t")]
+                else:
+                    v_values = v_line.split("\t")
+                v_rows.append([f(v, v_cur) for f, v in zip(v_casters, v_values)])
+                if len(v_rows) >= p_blocksize:
+                    yield self.CopyTable(
+                        v_columns, v_rows, v_converters, p_simple, p_compact
+                    )
+                    v_rows = []
+            v_done = True
+            if len(v_rows) > 0:
+                yield self.CopyTable(
+                    v_columns, v_rows, v_converters, p_simple, p_compact
+                )
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except psycopg2.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except builtins.Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        finally:
+            if v_thread is not None:
+                if not v_done and v_thread.is_alive():
+                    v_writer.v_stop.set()
+                    self.v_con.cancel()
+                v_thread.join()
+            if v_cur is not None:
+                try:
+                    v_cur.close()
+                except builtins.Exception:
+                    pass
+            if not v_keep:
+                self.Close()
+
+    def TypeCaster(self, p_oid):
+        for v_types in [
+            self.v_cur.string_types if self.v_cur is not None else None,
+            self.v_con.string_types,
+            psycopg2.extensions.string_types,
+        ]:
+            if v_types and p_oid in v_types:
+                return v_types[p_oid]
+        return psycopg2.extensions.string_types[psycopg2.STRING.values[0]]
+
+    def CopyTable(self, p_columns, p_rows, p_converters, p_simple, p_compact):
+        v_table = DataTable(None, p_converters is not None, p_simple, p_compact)
+        v_table.Columns = list(p_columns)
+        if p_converters is not None:
+            p_rows = self.StringRows(p_rows, p_converters)
+        v_table.AddRows(p_rows)
+        return v_table
+
+    def CopyOut(self, p_sql, p_file, p_delimiter=",", p_header=True):
+        try:
+            v_keep = None
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
+            else:
+                v_keep = True
+            self.v_cur.copy_expert(
+                "copy ({0}) to stdout with (format csv, header {1}, delimiter '{2}')".format(
+                    p_sql.strip().rstrip(";"),
+                    "true" if p_header else "false",
+                    p_delimiter.replace("'", "''"),
+                ),
+                p_file,
+            )
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except psycopg2.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except builtins.Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        finally:
+            if not v_keep:
+                self.Close()
+
     def Special(self, p_sql):
         try:
             v_keep = None
@@ -2419,65 +4133,321 @@ class PostgreSQL(Generic):
                         "This method should be called in the context of an asynchronous connection."
                     )
                 else:
-                    if self.v_start:
-                        raise Spartacus.Database.Exception("No statement was started.")
-                    else:
-                        if self.Poll() != 0:
-                            raise Spartacus.Database.Exception(
-                                "A statement has not finished yet."
-                            )
-                        else:
-                            self.v_start = True
-        except Spartacus.Database.Exception as exc:
-            raise exc
-        except psycopg2.Error as exc:
-            raise Spartacus.Database.Exception(str(exc))
-        except Exception as exc:
-            raise Spartacus.Database.Exception(str(exc))
+                    if self.v_start:
+                        raise Spartacus.Database.Exception("No statement was started.")
+                    else:
+                        if self.Poll() != 0:
+                            raise Spartacus.Database.Exception(
+                                "A statement has not finished yet."
+                            )
+                        else:
+                            self.v_start = True
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except psycopg2.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+
+    def AsyncFetchTable(self, p_alltypesstr=False):
+        try:
+            v_table = None
+            if self.v_con is None:
+                raise Spartacus.Database.Exception(
+                    "This method should be called in the middle of Open() and Close() calls."
+                )
+            else:
+                if self.v_con.async_ == 0:
+                    raise Spartacus.Database.Exception(
+                        "This method should be called in the context of an asynchronous connection."
+                    )
+                else:
+                    if self.v_start:
+                        raise Spartacus.Database.Exception("No statement was started.")
+                    else:
+                        if self.Poll() != 0:
+                            raise Spartacus.Database.Exception(
+                                "A statement has not finished yet."
+                            )
+                        else:
+                            v_table = DataTable()
+                            if self.v_cur.description:
+                                for c in self.v_cur.description:
+                                    v_table.AddColumn(c[0])
+                                v_table.Rows = self.v_cur.fetchall()
+                                if p_alltypesstr:
+                                    self.StringRows(
+                                        v_table.Rows,
+                                        self.StringConverters(self.v_cur.description),
+                                    )
+                            self.v_start = True
+            return v_table
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except psycopg2.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+
+    def AsyncLock(self):
+        if self.v_asynclock is None:
+            self.v_asynclock = asyncio.Lock()
+        return self.v_asynclock
+
+    async def AsyncPoll(self):
+        def Ready(p_future):
+            if not p_future.done():
+                p_future.set_result(None)
+
+        v_loop = asyncio.get_running_loop()
+        v_fileno = self.v_con.fileno()
+        while True:
+            v_state = self.v_con.poll()
+            if v_state == psycopg2.extensions.POLL_OK:
+                return
+            v_future = v_loop.create_future()
+            if v_state == psycopg2.extensions.POLL_READ:
+                v_loop.add_reader(v_fileno, Ready, v_future)
+                try:
+                    await v_future
+                finally:
+                    v_loop.remove_reader(v_fileno)
+            elif v_state == psycopg2.extensions.POLL_WRITE:
+                v_loop.add_writer(v_fileno, Ready, v_future)
+                try:
+                    await v_future
+                finally:
+                    v_loop.remove_writer(v_fileno)
+            else:
+                raise Spartacus.Database.Exception(
+                    "Unknown poll state {0}.".format(v_state)
+                )
+
+    async def AsyncWait(self):
+        try:
+            await self.AsyncPoll()
+        except asyncio.CancelledError:
+            try:
+                self.v_con.cancel()
+                await self.AsyncPoll()
+            except (builtins.Exception, asyncio.CancelledError):
+                pass
+            raise
+
+    async def AsyncOpen(self, p_datetime_as_string=False, p_json_as_string=False):
+        try:
+            self.v_con = psycopg2.connect(
+                self.GetConnectionString(),
+                cursor_factory=psycopg2.extras.DictCursor,
+                async_=1,
+            )
+            await self.AsyncWait()
+            self.v_cur = self.v_con.cursor()
+            self.v_start = True
+            self.v_cursor = None
+            # PostgreSQL types
+            self.v_types = v_pg_types.Lookup(self.GetTypesKey())
+            if self.v_types is None:
+                self.v_cur.execute("select oid, typname from pg_type")
+                await self.AsyncWait()
+                self.v_types = v_pg_types.Set(
+                    self.GetTypesKey(),
+                    dict([(r[0], r[1]) for r in self.v_cur.fetchall()]),
+                )
+            self.RegisterTypes(p_datetime_as_string, p_json_as_string)
+            self.v_con.notices = DataList()
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except psycopg2.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except builtins.Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+
+    async def AsyncStatement(self, p_sql):
+        if self.v_con.async_ == 0:
+            raise Spartacus.Database.Exception(
+                "This method should be called in the context of an asynchronous connection."
+            )
+        self.v_cur.execute(p_sql)
+        await self.AsyncWait()
+
+    async def AsyncQuery(
+        self,
+        p_sql,
+        p_alltypesstr=False,
+        p_simple=False,
+        p_datetime_as_string=False,
+        p_json_as_string=True,
+        p_compact=False,
+    ):
+        async with self.AsyncLock():
+            try:
+                v_keep = None
+                if self.v_con is None:
+                    await self.AsyncOpen(
+                        p_datetime_as_string=p_datetime_as_string,
+                        p_json_as_string=p_json_as_string,
+                    )
+                    v_keep = False
+                else:
+                    v_keep = True
+                await self.AsyncStatement(p_sql)
+                v_table = DataTable(None, p_alltypesstr, p_simple)
+                if self.v_cur.description:
+                    for c in self.v_cur.description:
+                        v_table.AddColumn(c[0])
+                    v_table.Rows = self.v_cur.fetchall()
+                    if p_alltypesstr:
+                        self.StringRows(
+                            v_table.Rows, self.StringConverters(self.v_cur.description)
+                        )
+                    if p_compact:
+                        self.CompactRows(v_table)
+                return v_table
+            except Spartacus.Database.Exception as exc:
+                raise exc
+            except psycopg2.Error as exc:
+                raise Spartacus.Database.Exception(str(exc))
+            except builtins.Exception as exc:
+                raise Spartacus.Database.Exception(str(exc))
+            finally:
+                if not v_keep:
+                    self.Close()
+
+    async def AsyncExecute(self, p_sql):
+        async with self.AsyncLock():
+            try:
+                v_keep = None
+                if self.v_con is None:
+                    await self.AsyncOpen()
+                    v_keep = False
+                else:
+                    v_keep = True
+                await self.AsyncStatement(p_sql)
+            except Spartacus.Database.Exception as exc:
+                raise exc
+            except psycopg2.Error as exc:
+                raise Spartacus.Database.Exception(str(exc))
+            except builtins.Exception as exc:
+                raise Spartacus.Database.Exception(str(exc))
+            finally:
+                if not v_keep:
+                    self.Close()
+
+    async def AsyncExecuteScalar(
+        self, p_sql, p_datetime_as_string=False, p_json_as_string=True
+    ):
+        async with self.AsyncLock():
+            try:
+                v_keep = None
+                if self.v_con is None:
+                    await self.AsyncOpen(
+                        p_datetime_as_string=p_datetime_as_string,
+                        p_json_as_string=p_json_as_string,
+                    )
+                    v_keep = False
+                else:
+                    v_keep = True
+                await self.AsyncStatement(p_sql)
+                r = self.v_cur.fetchone()
+                if r != None:
+                    s = r[0]
+                else:
+                    s = None
+                return s
+            except Spartacus.Database.Exception as exc:
+                raise exc
+            except psycopg2.Error as exc:
+                raise Spartacus.Database.Exception(str(exc))
+            except builtins.Exception as exc:
+                raise Spartacus.Database.Exception(str(exc))
+            finally:
+                if not v_keep:
+                    self.Close()
 
-    def AsyncFetchTable(self, p_alltypesstr=False):
-        try:
-            v_table = None
-            if self.v_con is None:
-                raise Spartacus.Database.Exception(
-                    "This method should be called in the middle of Open() and Close() calls."
-                )
-            else:
-                if self.v_con.async_ == 0:
-                    raise Spartacus.Database.Exception(
-                        "This method should be called in the context of an asynchronous connection."
+    async def AsyncQueryBlocks(
+        self,
+        p_sql,
+        p_blocksize=1000,
+        p_alltypesstr=False,
+        p_simple=False,
+        p_datetime_as_string=False,
+        p_json_as_string=True,
+        p_compact=False,
+    ):
+        v_keep = None
+        v_cursor = None
+        v_begin = False
+        try:
+            async with self.AsyncLock():
+                if self.v_con is None:
+                    await self.AsyncOpen(
+                        p_datetime_as_string=p_datetime_as_string,
+                        p_json_as_string=p_json_as_string,
                     )
+                    v_keep = False
                 else:
-                    if self.v_start:
-                        raise Spartacus.Database.Exception("No statement was started.")
+                    v_keep = True
+                v_begin = (
+                    self.v_con.get_transaction_status()
+                    == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+                )
+                if v_begin:
+                    await self.AsyncStatement("BEGIN")
+                v_cursor = "{0}_{1}".format(self.v_application_name, uuid.uuid4().hex)
+                await self.AsyncStatement(
+                    "DECLARE {0} NO SCROLL CURSOR FOR {1}".format(
+                        v_cursor, p_sql.strip().rstrip(";")
+                    )
+                )
+            v_first = True
+            v_hasmorerecords = True
+            while v_hasmorerecords:
+                async with self.AsyncLock():
+                    if p_blocksize > 0:
+                        await self.AsyncStatement(
+                            "FETCH {0} FROM {1}".format(p_blocksize, v_cursor)
+                        )
                     else:
-                        if self.Poll() != 0:
-                            raise Spartacus.Database.Exception(
-                                "A statement has not finished yet."
-                            )
-                        else:
-                            v_table = DataTable()
-                            if self.v_cur.description:
-                                for c in self.v_cur.description:
-                                    v_table.AddColumn(c[0])
-                                v_table.Rows = self.v_cur.fetchall()
-                                if p_alltypesstr:
-                                    for i in range(0, len(v_table.Rows)):
-                                        for j in range(0, len(v_table.Columns)):
-                                            if v_table.Rows[i][j] != None:
-                                                v_table.Rows[i][j] = self.String(
-                                                    v_table.Rows[i][j]
-                                                )
-                                            else:
-                                                v_table.Rows[i][j] = ""
-                            self.v_start = True
-            return v_table
+                        await self.AsyncStatement("FETCH ALL FROM {0}".format(v_cursor))
+                    v_table = DataTable(None, p_alltypesstr, p_simple)
+                    for c in self.v_cur.description:
+                        v_table.AddColumn(c[0])
+                    v_table.Rows = self.v_cur.fetchall()
+                    if p_alltypesstr:
+                        self.StringRows(
+                            v_table.Rows, self.StringConverters(self.v_cur.description)
+                        )
+                if p_compact:
+                    self.CompactRows(v_table)
+                v_hasmorerecords = p_blocksize > 0 and len(v_table.Rows) == p_blocksize
+                if v_first or len(v_table.Rows) > 0:
+                    yield v_table
+                v_first = False
+            async with self.AsyncLock():
+                await self.AsyncStatement("CLOSE {0}".format(v_cursor))
+                v_cursor = None
+                if v_begin:
+                    await self.AsyncStatement("COMMIT")
+                    v_begin = False
         except Spartacus.Database.Exception as exc:
             raise exc
         except psycopg2.Error as exc:
             raise Spartacus.Database.Exception(str(exc))
-        except Exception as exc:
+        except builtins.Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
+        finally:
+            if self.v_con is not None and (v_cursor is not None or v_begin):
+                try:
+                    async with self.AsyncLock():
+                        if v_begin:
+                            await self.AsyncStatement("ROLLBACK")
+                        else:
+                            await self.AsyncStatement("CLOSE {0}".format(v_cursor))
+                except builtins.Exception:
+                    pass
+            if not v_keep:
+                self.Close()
 
 
 """
@@ -2497,6 +4467,7 @@ class MySQL(Generic):
         p_password,
         p_conn_string="",
         p_encoding=None,
+        p_unbuffered=False,
     ):
         if "MySQL" in v_supported_rdbms:
             self.v_host = p_host
@@ -2511,6 +4482,8 @@ class MySQL(Generic):
             self.v_password = p_password
             self.v_con = None
             self.v_cur = None
+            self.v_sscur = None
+            self.v_unbuffered = p_unbuffered
             self.v_help = Spartacus.Database.DataTable()
             self.v_help.Columns = ["Command", "Syntax", "Description"]
             self.v_help.AddRow(["\\?", "\\?", "Show Commands."])
@@ -2579,7 +4552,7 @@ class MySQL(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
-    def Query(self, p_sql, p_alltypesstr=False, p_simple=False):
+    def Query(self, p_sql, p_alltypesstr=False, p_simple=False, p_compact=False):
         try:
             v_keep = None
             if self.v_con is None:
@@ -2587,15 +4560,13 @@ class MySQL(Generic):
                 v_keep = False
             else:
                 v_keep = True
+            self.CloseStream()
             self.v_status = self.v_cur.execute(p_sql)
-            v_table = DataTable(None, p_alltypesstr, p_simple)
+            v_table = DataTable(None, p_alltypesstr, p_simple, p_compact)
             if self.v_cur.description:
                 for c in self.v_cur.description:
                     v_table.AddColumn(c[0])
-                v_row = self.v_cur.fetchone()
-                while v_row is not None:
-                    v_table.AddRow(list(v_row))
-                    v_row = self.v_cur.fetchone()
+                v_table.AddRows(self.v_cur.fetchall())
             return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -2615,6 +4586,7 @@ class MySQL(Generic):
                 v_keep = False
             else:
                 v_keep = True
+            self.CloseStream()
             self.v_status = self.v_cur.execute(p_sql)
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -2634,6 +4606,7 @@ class MySQL(Generic):
                 v_keep = False
             else:
                 v_keep = True
+            self.CloseStream()
             self.v_status = self.v_cur.execute(p_sql)
             r = self.v_cur.fetchone()
             if r != None:
@@ -2654,6 +4627,7 @@ class MySQL(Generic):
     def Close(self, p_commit=True):
         try:
             if self.v_con:
+                self.CloseStream()
                 if p_commit:
                     self.v_con.commit()
                 else:
@@ -2709,6 +4683,7 @@ class MySQL(Generic):
                 self.v_status = v_cur2.execute("kill {0}".format(self.v_con_id))
                 v_cur2.close()
                 v_con2.close()
+                self.v_sscur = None
                 if self.v_cur:
                     self.v_cur.close()
                     self.v_cur = None
@@ -2805,7 +4780,53 @@ class MySQL(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def NewCursor(self):
+        if self.v_unbuffered:
+            return self.v_con.cursor(pymysql.cursors.SSCursor)
+        else:
+            return self.v_con.cursor()
+
+    def CloseCursor(self, p_cur):
+        try:
+            v_result = getattr(p_cur, "_result", None)
+            if (
+                v_result is not None
+                and v_result.unbuffered_active
+                and self.GetConStatus() == 1
+            ):
+                v_con2 = pymysql.connect(
+                    host=self.v_host,
+                    port=int(self.v_port),
+                    db=self.v_service,
+                    user=self.v_user,
+                    password=self.v_password,
+                )
+                try:
+                    v_cur2 = v_con2.cursor()
+                    v_cur2.execute("kill query {0}".format(self.v_con_id))
+                    v_cur2.close()
+                finally:
+                    v_con2.close()
+            try:
+                p_cur.close()
+            except pymysql.OperationalError as exc:
+                if exc.args[0] != pymysql.constants.ER.QUERY_INTERRUPTED:
+                    raise exc
+        except pymysql.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except builtins.Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+
+    def CloseStream(self):
+        if self.v_sscur:
+            v_sscur = self.v_sscur
+            self.v_sscur = None
+            self.v_start = True
+            self.CloseCursor(v_sscur)
+
+    def QueryBlock(
+        self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_compact=False
+    ):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception(
@@ -2813,27 +4834,31 @@ class MySQL(Generic):
                 )
             else:
                 if self.v_start:
-                    self.v_status = self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
-                if self.v_cur.description:
-                    for c in self.v_cur.description:
+                    self.CloseStream()
+                    if self.v_unbuffered:
+                        self.v_sscur = self.NewCursor()
+                        self.v_status = self.v_sscur.execute(p_sql)
+                    else:
+                        self.v_status = self.v_cur.execute(p_sql)
+                if self.v_sscur:
+                    v_cur = self.v_sscur
+                else:
+                    v_cur = self.v_cur
+                v_table = DataTable(None, p_alltypesstr, p_simple, p_compact)
+                if v_cur.description:
+                    for c in v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
                     if p_blocksize > 0:
-                        k = 0
-                        while v_row is not None and k < p_blocksize:
-                            v_table.AddRow(list(v_row))
-                            k = k + 1
-                            if k < p_blocksize:
-                                v_row = self.v_cur.fetchone()
+                        v_table.AddRows(v_cur.fetchmany(p_blocksize))
                     else:
-                        while v_row is not None:
-                            v_table.AddRow(list(v_row))
-                            v_row = self.v_cur.fetchone()
+                        v_table.AddRows(v_cur.fetchall())
                 if self.v_start:
                     self.v_start = False
                 if len(v_table.Rows) < p_blocksize:
                     self.v_start = True
+                if self.v_sscur and (p_blocksize <= 0 or self.v_start):
+                    self.v_sscur = None
+                    self.CloseCursor(v_cur)
                 return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -2844,34 +4869,24 @@ class MySQL(Generic):
 
     def InsertBlock(self, p_block, p_tablename, p_fields=None):
         try:
-            v_columnames = []
-            if p_fields is None:
-                v_fields = []
-                for c in p_block.Columns:
-                    v_columnames.append(c)
-                    v_fields.append(DataField(c))
+            v_keep = None
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
             else:
-                v_fields = p_fields
-                for p in v_fields:
-                    v_columnames.append(p.v_name)
-            v_values = []
-            for r in p_block.Rows:
-                v_values.append(self.Mogrify(r, v_fields))
-            self.Execute(
-                "insert into "
-                + p_tablename
-                + "("
-                + ",".join(v_columnames)
-                + ") values "
-                + ",".join(v_values)
-                + ""
-            )
+                v_keep = True
+            v_sql, v_rows = self.PrepareInsert(p_block, p_tablename, p_fields, "format")
+            if len(v_rows) > 0:
+                self.v_cur.executemany(v_sql, v_rows)
         except Spartacus.Database.Exception as exc:
             raise exc
         except pymysql.Error as exc:
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
+        finally:
+            if not v_keep:
+                self.Close()
 
     def Special(self, p_sql):
         try:
@@ -2963,6 +4978,7 @@ class MariaDB(Generic):
         p_password,
         p_conn_string="",
         p_encoding=None,
+        p_unbuffered=False,
     ):
         if "MariaDB" in v_supported_rdbms:
             self.v_host = p_host
@@ -2977,6 +4993,8 @@ class MariaDB(Generic):
             self.v_password = p_password
             self.v_con = None
             self.v_cur = None
+            self.v_sscur = None
+            self.v_unbuffered = p_unbuffered
             self.v_help = Spartacus.Database.DataTable()
             self.v_help.Columns = ["Command", "Syntax", "Description"]
             self.v_help.AddRow(["\\?", "\\?", "Show Commands."])
@@ -3045,7 +5063,7 @@ class MariaDB(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
-    def Query(self, p_sql, p_alltypesstr=False, p_simple=False):
+    def Query(self, p_sql, p_alltypesstr=False, p_simple=False, p_compact=False):
         try:
             v_keep = None
             if self.v_con is None:
@@ -3053,15 +5071,13 @@ class MariaDB(Generic):
                 v_keep = False
             else:
                 v_keep = True
+            self.CloseStream()
             self.v_status = self.v_cur.execute(p_sql)
-            v_table = DataTable(None, p_alltypesstr, p_simple)
+            v_table = DataTable(None, p_alltypesstr, p_simple, p_compact)
             if self.v_cur.description:
                 for c in self.v_cur.description:
                     v_table.AddColumn(c[0])
-                v_row = self.v_cur.fetchone()
-                while v_row is not None:
-                    v_table.AddRow(list(v_row))
-                    v_row = self.v_cur.fetchone()
+                v_table.AddRows(self.v_cur.fetchall())
             return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -3081,6 +5097,7 @@ class MariaDB(Generic):
                 v_keep = False
             else:
                 v_keep = True
+            self.CloseStream()
             self.v_status = self.v_cur.execute(p_sql)
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -3100,6 +5117,7 @@ class MariaDB(Generic):
                 v_keep = False
             else:
                 v_keep = True
+            self.CloseStream()
             self.v_status = self.v_cur.execute(p_sql)
             r = self.v_cur.fetchone()
             if r != None:
@@ -3120,6 +5138,7 @@ class MariaDB(Generic):
     def Close(self, p_commit=True):
         try:
             if self.v_con:
+                self.CloseStream()
                 if p_commit:
                     self.v_con.commit()
                 else:
@@ -3175,6 +5194,7 @@ class MariaDB(Generic):
                 self.v_status = v_cur2.execute("kill {0}".format(self.v_con_id))
                 v_cur2.close()
                 v_con2.close()
+                self.v_sscur = None
                 if self.v_cur:
                     self.v_cur.close()
                     self.v_cur = None
@@ -3271,7 +5291,53 @@ class MariaDB(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def NewCursor(self):
+        if self.v_unbuffered:
+            return self.v_con.cursor(pymysql.cursors.SSCursor)
+        else:
+            return self.v_con.cursor()
+
+    def CloseCursor(self, p_cur):
+        try:
+            v_result = getattr(p_cur, "_result", None)
+            if (
+                v_result is not None
+                and v_result.unbuffered_active
+                and self.GetConStatus() == 1
+            ):
+                v_con2 = pymysql.connect(
+                    host=self.v_host,
+                    port=int(self.v_port),
+                    db=self.v_service,
+                    user=self.v_user,
+                    password=self.v_password,
+                )
+                try:
+                    v_cur2 = v_con2.cursor()
+                    v_cur2.execute("kill query {0}".format(self.v_con_id))
+                    v_cur2.close()
+                finally:
+                    v_con2.close()
+            try:
+                p_cur.close()
+            except pymysql.OperationalError as exc:
+                if exc.args[0] != pymysql.constants.ER.QUERY_INTERRUPTED:
+                    raise exc
+        except pymysql.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except builtins.Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+
+    def CloseStream(self):
+        if self.v_sscur:
+            v_sscur = self.v_sscur
+            self.v_sscur = None
+            self.v_start = True
+            self.CloseCursor(v_sscur)
+
+    def QueryBlock(
+        self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_compact=False
+    ):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception(
@@ -3279,27 +5345,31 @@ class MariaDB(Generic):
                 )
             else:
                 if self.v_start:
-                    self.v_status = self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
-                if self.v_cur.description:
-                    for c in self.v_cur.description:
+                    self.CloseStream()
+                    if self.v_unbuffered:
+                        self.v_sscur = self.NewCursor()
+                        self.v_status = self.v_sscur.execute(p_sql)
+                    else:
+                        self.v_status = self.v_cur.execute(p_sql)
+                if self.v_sscur:
+                    v_cur = self.v_sscur
+                else:
+                    v_cur = self.v_cur
+                v_table = DataTable(None, p_alltypesstr, p_simple, p_compact)
+                if v_cur.description:
+                    for c in v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
                     if p_blocksize > 0:
-                        k = 0
-                        while v_row is not None and k < p_blocksize:
-                            v_table.AddRow(list(v_row))
-                            k = k + 1
-                            if k < p_blocksize:
-                                v_row = self.v_cur.fetchone()
+                        v_table.AddRows(v_cur.fetchmany(p_blocksize))
                     else:
-                        while v_row is not None:
-                            v_table.AddRow(list(v_row))
-                            v_row = self.v_cur.fetchone()
+                        v_table.AddRows(v_cur.fetchall())
                 if self.v_start:
                     self.v_start = False
                 if len(v_table.Rows) < p_blocksize:
                     self.v_start = True
+                if self.v_sscur and (p_blocksize <= 0 or self.v_start):
+                    self.v_sscur = None
+                    self.CloseCursor(v_cur)
                 return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -3310,34 +5380,24 @@ class MariaDB(Generic):
 
     def InsertBlock(self, p_block, p_tablename, p_fields=None):
         try:
-            v_columnames = []
-            if p_fields is None:
-                v_fields = []
-                for c in p_block.Columns:
-                    v_columnames.append(c)
-                    v_fields.append(DataField(c))
+            v_keep = None
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
             else:
-                v_fields = p_fields
-                for p in v_fields:
-                    v_columnames.append(p.v_name)
-            v_values = []
-            for r in p_block.Rows:
-                v_values.append(self.Mogrify(r, v_fields))
-            self.Execute(
-                "insert into "
-                + p_tablename
-                + "("
-                + ",".join(v_columnames)
-                + ") values "
-                + ",".join(v_values)
-                + ""
-            )
+                v_keep = True
+            v_sql, v_rows = self.PrepareInsert(p_block, p_tablename, p_fields, "format")
+            if len(v_rows) > 0:
+                self.v_cur.executemany(v_sql, v_rows)
         except Spartacus.Database.Exception as exc:
             raise exc
         except pymysql.Error as exc:
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
+        finally:
+            if not v_keep:
+                self.Close()
 
     def Special(self, p_sql):
         try:
@@ -3461,7 +5521,7 @@ class Firebird(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
-    def Query(self, p_sql, p_alltypesstr=False, p_simple=False):
+    def Query(self, p_sql, p_alltypesstr=False, p_simple=False, p_compact=False):
         try:
             v_keep = None
             if self.v_con is None:
@@ -3470,14 +5530,11 @@ class Firebird(Generic):
             else:
                 v_keep = True
             self.v_cur.execute(p_sql)
-            v_table = DataTable(None, p_alltypesstr, p_simple)
+            v_table = DataTable(None, p_alltypesstr, p_simple, p_compact)
             if self.v_cur.description:
                 for c in self.v_cur.description:
                     v_table.AddColumn(c[0])
-                v_row = self.v_cur.fetchone()
-                while v_row is not None:
-                    v_table.AddRow(list(v_row))
-                    v_row = self.v_cur.fetchone()
+                v_table.AddRows(self.v_cur.fetchall())
             return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -3656,7 +5713,9 @@ class Firebird(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(
+        self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_compact=False
+    ):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception(
@@ -3665,22 +5724,14 @@ class Firebird(Generic):
             else:
                 if self.v_start:
                     self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
+                v_table = DataTable(None, p_alltypesstr, p_simple, p_compact)
                 if self.v_cur.description:
                     for c in self.v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
                     if p_blocksize > 0:
-                        k = 0
-                        while v_row is not None and k < p_blocksize:
-                            v_table.AddRow(list(v_row))
-                            k = k + 1
-                            if k < p_blocksize:
-                                v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchmany(p_blocksize))
                     else:
-                        while v_row is not None:
-                            v_table.AddRow(list(v_row))
-                            v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchall())
                 if self.v_start:
                     self.v_start = False
                 if len(v_table.Rows) < p_blocksize:
@@ -3695,34 +5746,24 @@ class Firebird(Generic):
 
     def InsertBlock(self, p_block, p_tablename, p_fields=None):
         try:
-            v_columnames = []
-            if p_fields is None:
-                v_fields = []
-                for c in p_block.Columns:
-                    v_columnames.append(c)
-                    v_fields.append(DataField(c))
+            v_keep = None
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
             else:
-                v_fields = p_fields
-                for p in v_fields:
-                    v_columnames.append(p.v_name)
-            v_values = []
-            for r in p_block.Rows:
-                v_values.append(self.Mogrify(r, v_fields))
-            self.Execute(
-                "insert into "
-                + p_tablename
-                + "("
-                + ",".join(v_columnames)
-                + ") values "
-                + ",".join(v_values)
-                + ""
-            )
+                v_keep = True
+            v_sql, v_rows = self.PrepareInsert(p_block, p_tablename, p_fields, "qmark")
+            if len(v_rows) > 0:
+                self.v_cur.executemany(v_sql, v_rows)
         except Spartacus.Database.Exception as exc:
             raise exc
         except fdb.Error as exc:
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
+        finally:
+            if not v_keep:
+                self.Close()
 
     def Special(self, p_sql):
         return self.Query(p_sql).Pretty()
@@ -3828,7 +5869,7 @@ class Oracle(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
-    def Query(self, p_sql, p_alltypesstr=False, p_simple=False):
+    def Query(self, p_sql, p_alltypesstr=False, p_simple=False, p_compact=False):
         try:
             v_keep = None
             if self.v_con is None:
@@ -3837,14 +5878,11 @@ class Oracle(Generic):
             else:
                 v_keep = True
             self.v_cur.execute(p_sql)
-            v_table = DataTable(None, p_alltypesstr, p_simple)
+            v_table = DataTable(None, p_alltypesstr, p_simple, p_compact)
             if self.v_cur.description:
                 for c in self.v_cur.description:
                     v_table.AddColumn(c[0])
-                v_row = self.v_cur.fetchone()
-                while v_row is not None:
-                    v_table.AddRow(list(v_row))
-                    v_row = self.v_cur.fetchone()
+                v_table.AddRows(self.v_cur.fetchall())
             return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -4046,31 +6084,27 @@ class Oracle(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(
+        self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_compact=False
+    ):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception(
                     "This method should be called in the middle of Open() and Close() calls."
                 )
             else:
+                if p_blocksize > 0:
+                    self.v_cur.arraysize = p_blocksize
                 if self.v_start:
                     self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
+                v_table = DataTable(None, p_alltypesstr, p_simple, p_compact)
                 if self.v_cur.description:
                     for c in self.v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
                     if p_blocksize > 0:
-                        k = 0
-                        while v_row is not None and k < p_blocksize:
-                            v_table.AddRow(list(v_row))
-                            k = k + 1
-                            if k < p_blocksize:
-                                v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchmany(p_blocksize))
                     else:
-                        while v_row is not None:
-                            v_table.AddRow(list(v_row))
-                            v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchall())
                 if self.v_start:
                     self.v_start = False
                 if len(v_table.Rows) < p_blocksize:
@@ -4085,34 +6119,26 @@ class Oracle(Generic):
 
     def InsertBlock(self, p_block, p_tablename, p_fields=None):
         try:
-            v_columnames = []
-            if p_fields is None:
-                v_fields = []
-                for c in p_block.Columns:
-                    v_columnames.append(c)
-                    v_fields.append(DataField(c))
+            v_keep = None
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
             else:
-                v_fields = p_fields
-                for p in v_fields:
-                    v_columnames.append(p.v_name)
-            v_values = []
-            for r in p_block.Rows:
-                v_values.append(self.Mogrify(r, v_fields))
-            self.Execute(
-                "insert into "
-                + p_tablename
-                + "("
-                + ",".join(v_columnames)
-                + ") values "
-                + ",".join(v_values)
-                + ""
+                v_keep = True
+            v_sql, v_rows = self.PrepareInsert(
+                p_block, p_tablename, p_fields, "numeric"
             )
+            if len(v_rows) > 0:
+                self.v_cur.executemany(v_sql, v_rows)
         except Spartacus.Database.Exception as exc:
             raise exc
         except cx_Oracle.Error as exc:
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
+        finally:
+            if not v_keep:
+                self.Close()
 
     def Special(self, p_sql):
         try:
@@ -4243,7 +6269,7 @@ class MSSQL(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
-    def Query(self, p_sql, p_alltypesstr=False, p_simple=False):
+    def Query(self, p_sql, p_alltypesstr=False, p_simple=False, p_compact=False):
         try:
             v_keep = None
             if self.v_con is None:
@@ -4252,14 +6278,11 @@ class MSSQL(Generic):
             else:
                 v_keep = True
             self.v_cur.execute(p_sql)
-            v_table = DataTable(None, p_alltypesstr, p_simple)
+            v_table = DataTable(None, p_alltypesstr, p_simple, p_compact)
             if self.v_cur.description:
                 for c in self.v_cur.description:
                     v_table.AddColumn(c[0])
-                v_row = self.v_cur.fetchone()
-                while v_row is not None:
-                    v_table.AddRow(list(v_row))
-                    v_row = self.v_cur.fetchone()
+                v_table.AddRows(self.v_cur.fetchall())
             return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -4440,7 +6463,9 @@ class MSSQL(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(
+        self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_compact=False
+    ):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception(
@@ -4449,22 +6474,14 @@ class MSSQL(Generic):
             else:
                 if self.v_start:
                     self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
+                v_table = DataTable(None, p_alltypesstr, p_simple, p_compact)
                 if self.v_cur.description:
                     for c in self.v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
                     if p_blocksize > 0:
-                        k = 0
-                        while v_row is not None and k < p_blocksize:
-                            v_table.AddRow(list(v_row))
-                            k = k + 1
-                            if k < p_blocksize:
-                                v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchmany(p_blocksize))
                     else:
-                        while v_row is not None:
-                            v_table.AddRow(list(v_row))
-                            v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchall())
                 if self.v_start:
                     self.v_start = False
                 if len(v_table.Rows) < p_blocksize:
@@ -4479,34 +6496,24 @@ class MSSQL(Generic):
 
     def InsertBlock(self, p_block, p_tablename, p_fields=None):
         try:
-            v_columnames = []
-            if p_fields is None:
-                v_fields = []
-                for c in p_block.Columns:
-                    v_columnames.append(c)
-                    v_fields.append(DataField(c))
+            v_keep = None
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
             else:
-                v_fields = p_fields
-                for p in v_fields:
-                    v_columnames.append(p.v_name)
-            v_values = []
-            for r in p_block.Rows:
-                v_values.append(self.Mogrify(r, v_fields))
-            self.Execute(
-                "insert into "
-                + p_tablename
-                + "("
-                + ",".join(v_columnames)
-                + ") values "
-                + ",".join(v_values)
-                + ""
-            )
+                v_keep = True
+            v_sql, v_rows = self.PrepareInsert(p_block, p_tablename, p_fields, "format")
+            if len(v_rows) > 0:
+                self.v_cur.executemany(v_sql, v_rows)
         except Spartacus.Database.Exception as exc:
             raise exc
         except pymssql.Error as exc:
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
+        finally:
+            if not v_keep:
+                self.Close()
 
     def Special(self, p_sql):
         return self.Query(p_sql).Pretty()
@@ -4560,7 +6567,7 @@ class IBMDB2(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
-    def Query(self, p_sql, p_alltypesstr=False, p_simple=False):
+    def Query(self, p_sql, p_alltypesstr=False, p_simple=False, p_compact=False):
         try:
             v_keep = None
             if self.v_con is None:
@@ -4569,14 +6576,11 @@ class IBMDB2(Generic):
             else:
                 v_keep = True
             self.v_cur.execute(p_sql)
-            v_table = DataTable(None, p_alltypesstr, p_simple)
+            v_table = DataTable(None, p_alltypesstr, p_simple, p_compact)
             if self.v_cur.description:
                 for c in self.v_cur.description:
                     v_table.AddColumn(c[0])
-                v_row = self.v_cur.fetchone()
-                while v_row is not None:
-                    v_table.AddRow(list(v_row))
-                    v_row = self.v_cur.fetchone()
+                v_table.AddRows(self.v_cur.fetchall())
             return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -4755,7 +6759,9 @@ class IBMDB2(Generic):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
 
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(
+        self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_compact=False
+    ):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception(
@@ -4764,22 +6770,14 @@ class IBMDB2(Generic):
             else:
                 if self.v_start:
                     self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
+                v_table = DataTable(None, p_alltypesstr, p_simple, p_compact)
                 if self.v_cur.description:
                     for c in self.v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
                     if p_blocksize > 0:
-                        k = 0
-                        while v_row is not None and k < p_blocksize:
-                            v_table.AddRow(list(v_row))
-                            k = k + 1
-                            if k < p_blocksize:
-                                v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchmany(p_blocksize))
                     else:
-                        while v_row is not None:
-                            v_table.AddRow(list(v_row))
-                            v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchall())
                 if self.v_start:
                     self.v_start = False
                 if len(v_table.Rows) < p_blocksize:
@@ -4794,34 +6792,24 @@ class IBMDB2(Generic):
 
     def InsertBlock(self, p_block, p_tablename, p_fields=None):
         try:
-            v_columnames = []
-            if p_fields is None:
-                v_fields = []
-                for c in p_block.Columns:
-                    v_columnames.append(c)
-                    v_fields.append(DataField(c))
+            v_keep = None
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
             else:
-                v_fields = p_fields
-                for p in v_fields:
-                    v_columnames.append(p.v_name)
-            v_values = []
-            for r in p_block.Rows:
-                v_values.append(self.Mogrify(r, v_fields))
-            self.Execute(
-                "insert into "
-                + p_tablename
-                + "("
-                + ",".join(v_columnames)
-                + ") values "
-                + ",".join(v_values)
-                + ""
-            )
+                v_keep = True
+            v_sql, v_rows = self.PrepareInsert(p_block, p_tablename, p_fields, "qmark")
+            if len(v_rows) > 0:
+                self.v_cur.executemany(v_sql, v_rows)
         except Spartacus.Database.Exception as exc:
             raise exc
         except ibm_db_dbi.Error as exc:
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
+        finally:
+            if not v_keep:
+                self.Close()
 
     def Special(self, p_sql):
         return self.Query(p_sql).Pretty()
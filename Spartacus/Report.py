@@ -23,11 +23,23 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import builtins
 import collections
+import concurrent.futures
+import copy
+import functools
 import re
+import threading
+import time
+import warnings
 
 try:
     import openpyxl
+
+    try:
+        from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+    except ImportError:
+        from openpyxl.worksheet.write_only import WriteOnlyWorksheet
 except ImportError:
     raise Exception(
         "XLSX is not supported. Please install it with 'pip install Spartacus[xlsx]'."
@@ -789,6 +801,148 @@ class RowsGrouping(object):
         self.collapsedLevel = p_collapsedLevel
 
 
+class FormulaTemplate(object):
+    """Represents a formula parsed once into literal, column and row segments, so it can be rendered many times.
+
+        Attributes:
+            segments (tuple): the formula split around #row#, #start_row# and #end_row# wildcards, which are kept in odd positions.
+                Notes:
+                    #column_columname# wildcards are already replaced by the letter of the column in literal segments.
+    """
+
+    def __init__(self, p_formula="", p_headerList=(), p_startColumn=1):
+        """Create a new Spartacus.Report.FormulaTemplate instance.
+
+            Args:
+                p_formula (str): the formula containing the wildcards. Defaults to ''.
+                p_headerList (tuple): the table columns, in the same order they appear in the worksheet. Defaults to ().
+                p_startColumn (int): the column number where the table starts. Defaults to 1.
+
+            Raises:
+                Spartacus.Report.Exception: custom exceptions occurred in this script.
+        """
+
+        if not isinstance(p_formula, str):
+            raise Spartacus.Report.Exception(
+                'Error during instantiation of class "Spartacus.Report.FormulaTemplate": Parameter "p_formula" must be of type "str".'
+            )
+
+        def Column(p_match):
+            return openpyxl.utils.get_column_letter(
+                p_startColumn + p_headerList.index(p_match.group()[8:-1])
+            )  # Discard starting #column_ and ending # in match
+
+        v_segments = re.split(r"(#row#|#start_row#|#end_row#)", p_formula)
+
+        for i in range(0, len(v_segments), 2):
+            v_segments[i] = re.sub(r"#column_[^\n\r#]*#", Column, v_segments[i])
+
+        self.segments = tuple(v_segments)
+
+    def Parts(self, p_startRow=None, p_endRow=None):
+        """Fill #start_row# and #end_row# wildcards, returning the formula parts around #row#.
+
+            Args:
+                p_startRow (int): the first data line number of the table. Defaults to None.
+                p_endRow (int): the last data line number of the table. Defaults to None.
+                    Notes:
+                        Wildcards given None are kept in the formula.
+
+            Returns:
+                list: the formula parts, to be joined by the row number.
+        """
+
+        v_values = {
+            "#start_row#": "#start_row#" if p_startRow is None else str(p_startRow),
+            "#end_row#": "#end_row#" if p_endRow is None else str(p_endRow),
+        }
+
+        v_parts = [self.segments[0]]
+
+        for i in range(1, len(self.segments), 2):
+            if self.segments[i] == "#row#":
+                v_parts.append(self.segments[i + 1])
+            else:
+                v_parts[-1] += v_values[self.segments[i]] + self.segments[i + 1]
+
+        return v_parts
+
+    def Render(self, p_row=None, p_startRow=None, p_endRow=None):
+        """Render the formula, filling its row wildcards.
+
+            Args:
+                p_row (int): the current row. Defaults to None.
+                p_startRow (int): the first data line number of the table. Defaults to None.
+                p_endRow (int): the last data line number of the table. Defaults to None.
+                    Notes:
+                        Wildcards given None are kept in the formula.
+
+            Returns:
+                str: the rendered formula.
+        """
+
+        return ("#row#" if p_row is None else str(p_row)).join(
+            self.Parts(p_startRow, p_endRow)
+        )
+
+
+class Sheet(object):
+    """Represents a worksheet to be built by Spartacus.Report.BuildWorkbook.
+
+        Attributes:
+            title (str): the worksheet title.
+            tableList (list): the tables of the worksheet, in the order they are written.
+                Notes:
+                    Each table is a dict with the keyword arguments of Spartacus.Report.AddTableWriteOnly, except p_workSheet and p_lock.
+                Examples:
+                    [
+                        {
+                            'p_headerDict': v_headerDict,
+                            'p_database': v_database,
+                            'p_query': 'SELECT field_one, field_two FROM sometable',
+                            'p_mainTable': True
+                        }
+                    ]
+    """
+
+    def __init__(self, p_title=None, p_tableList=None):
+        """Create a new Spartacus.Report.Sheet instance.
+
+            Args:
+                p_title (str): the worksheet title. Defaults to None.
+                p_tableList (list): the tables of the worksheet, in the order they are written. Defaults to None.
+                    Notes:
+                        Each table is a dict with the keyword arguments of Spartacus.Report.AddTableWriteOnly, except p_workSheet and p_lock.
+
+            Raises:
+                Spartacus.Report.Exception: custom exceptions occurred in this script.
+        """
+
+        if not isinstance(p_title, str):
+            raise Spartacus.Report.Exception(
+                'Error during instantiation of class "Spartacus.Report.Sheet": Parameter "p_title" must be of type "str".'
+            )
+
+        if not isinstance(p_tableList, list):
+            raise Spartacus.Report.Exception(
+                'Error during instantiation of class "Spartacus.Report.Sheet": Parameter "p_tableList" must be of type "list".'
+            )
+
+        for v_table in p_tableList:
+            if not isinstance(v_table, dict):
+                raise Spartacus.Report.Exception(
+                    'Error during instantiation of class "Spartacus.Report.Sheet": Parameter "p_tableList" must contain just instances of type "dict".'
+                )
+
+            if "p_workSheet" in v_table or "p_lock" in v_table:
+                raise Spartacus.Report.Exception(
+                    'Error during instantiation of class "Spartacus.Report.Sheet": Parameter "p_tableList" must not set "p_workSheet" or "p_lock", as they are provided by Spartacus.Report.BuildWorkbook.'
+                )
+
+        self.title = p_title
+        self.tableList = p_tableList
+
+
 def AddTable(
     p_workSheet=None,
     p_headerDict=None,
@@ -803,6 +957,7 @@ def AddTable(
     p_tableStyleInfo=None,
     p_withFilters=True,
     p_rowsGrouping=None,
+    p_blockSize=1000,
 ):
     """Insert a table in a given worksheet.
 
@@ -911,6 +1066,7 @@ def AddTable(
             p_rowsGrouping (RowsGrouping): rows grouping to be applied to the table. Defaults to None.
                 Notes:
                     The column in p_rowsGrouping.column attribute must be in p_data.Columns. It will be used to decide outline level of the row and when we should collapse or hide the row.
+            p_blockSize (int or Spartacus.Database.AdaptiveBlockSize): number of rows fetched at a time from p_database, or a controller that adjusts it after every block. Defaults to 1000.
 
         Yields:
             int: Every 1000 lines inserted into the table, yields actual line number.
@@ -1014,11 +1170,16 @@ def AddTable(
             'Error during execution of method "Static.AddTable": Parameter "p_rowsGrouping" must be None of of type "Spartacus.Report.RowsGrouping".'
         )
 
+    if not isinstance(p_blockSize, (int, Spartacus.Database.AdaptiveBlockSize)):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTable": Parameter "p_blockSize" must be of type "int" or "Spartacus.Database.AdaptiveBlockSize".'
+        )
+
     # Format Header
     if p_headerHeight is not None:
         p_workSheet.row_dimensions[p_startRow].height = p_headerHeight
 
-    v_headerList = list(p_headerDict.keys())
+    v_headerList = tuple(p_headerDict.keys())
 
     for i in range(len(v_headerList)):
         v_header = p_headerDict[v_headerList[i]]
@@ -1049,32 +1210,44 @@ def AddTable(
     if p_mainTable:
         p_workSheet.freeze_panes = "A{0}".format(p_startRow + 1)
 
-    # used in formula fields, if it's the case
-    v_pattern = re.compile(r"#column_[^\n\r#]*#")
-
     if p_database is not None:
-        v_rowCount = p_database.ExecuteScalar('''
-            SELECT count(*)
-            FROM (
-                {p_query}
-            ) x
-        '''.format(
-            p_query=p_query
-        ))
-
         p_database.Open()
-    else:
-        v_rowCount = len(p_data.Rows)
 
-    v_lastLine = v_rowCount + p_startRow
+    v_endRowCells = []
+
+    # One writer per column, so each cell is written by a single call
+    v_writers = [
+        CellWriter(
+            p_workSheet=p_workSheet,
+            p_data=p_headerDict[v_headerList[i]].data,
+            p_key=v_headerList[i],
+            p_column=i + p_startColumn,
+            p_converter=ValueConverter(
+                p_data=p_headerDict[v_headerList[i]].data,
+                p_headerList=v_headerList,
+                p_startRow=p_startRow,
+                p_startColumn=p_startColumn,
+            ),
+            p_endRowCells=v_endRowCells,
+        )
+        for i in range(len(v_headerList))
+    ]
 
     v_line = 0
     v_hasmorerecords = True
     while v_hasmorerecords:
+        v_fetch = time.time()
         v_data = (
-            p_database.QueryBlock(p_query, 1000) if p_database is not None else p_data
+            p_database.QueryBlock(p_query, p_database.BlockSize(p_blockSize))
+            if p_database is not None
+            else p_data
         )
 
+        if p_database is not None and isinstance(
+            p_blockSize, Spartacus.Database.AdaptiveBlockSize
+        ):
+            p_blockSize.Observe(v_data, time.time() - v_fetch)
+
         if p_database is None and p_data is not None:
             v_hasmorerecords = False
 
@@ -1083,316 +1256,8 @@ def AddTable(
             for v_row in v_data.Rows:
                 v_line += 1
 
-                for i in range(len(v_headerList)):
-                    v_headerData = p_headerDict[v_headerList[i]].data
-                    v_letter = openpyxl.utils.get_column_letter(i + p_startColumn)
-
-                    v_cell = p_workSheet[
-                        "{0}{1}".format(v_letter, v_line + p_startRow)
-                    ]  # Plus p_startRow to "jump" report header lines
-
-                    if v_headerData.border is not None:
-                        v_cell.border = v_headerData.border
-
-                    if v_headerData.font is not None:
-                        v_cell.font = v_headerData.font
-
-                    if v_headerData.fill is not None:
-                        v_cell.fill = v_headerData.fill
-
-                    if v_headerData.alignment is not None:
-                        v_cell.alignment = v_headerData.alignment
-
-                    if v_headerData.type == "int":
-                        v_key = str(v_row[v_headerList[i]])
-
-                        if v_key in v_headerData.valueMapping:
-                            v_cell.value = v_headerData.valueMapping[v_key]
-                        else:
-                            try:
-                                v_cell.value = int(v_row[v_headerList[i]])
-                            except (Exception, TypeError, ValueError):
-                                v_cell.value = (
-                                    v_row[v_headerList[i]]
-                                    if v_headerList[i] is not None
-                                    else ""
-                                )
-
-                        v_cell.number_format = "0"
-                    elif v_headerData.type == "float":
-                        v_key = str(v_row[v_headerList[i]])
-
-                        if v_key in v_headerData.valueMapping:
-                            v_cell.value = v_headerData.valueMapping[v_key]
-                        else:
-                            try:
-                                v_cell.value = float(v_row[v_headerList[i]])
-                            except (Exception, TypeError, ValueError):
-                                v_cell.value = (
-                                    v_row[v_headerList[i]]
-                                    if v_headerList[i] is not None
-                                    else ""
-                                )
-
-                        v_cell.number_format = "#,##0.00"
-                    elif v_headerData.type == "float4":
-                        v_key = str(v_row[v_headerList[i]])
-
-                        if v_key in v_headerData.valueMapping:
-                            v_cell.value = v_headerData.valueMapping[v_key]
-                        else:
-                            try:
-                                v_cell.value = float(v_row[v_headerList[i]])
-                            except (Exception, TypeError, ValueError):
-                                v_cell.value = (
-                                    v_row[v_headerList[i]]
-                                    if v_headerList[i] is not None
-                                    else ""
-                                )
-
-                        v_cell.number_format = "#,##0.0000"
-                    elif v_headerData.type == "accounting":
-                        v_key = str(v_row[v_headerList[i]])
-
-                        if v_key in v_headerData.valueMapping:
-                            v_cell.value = v_headerData.valueMapping[v_key]
-                        else:
-                            try:
-                                v_cell.value = float(v_row[v_headerList[i]])
-                            except (Exception, TypeError, ValueError):
-                                v_cell.value = (
-                                    v_row[v_headerList[i]]
-                                    if v_headerList[i] is not None
-                                    else ""
-                                )
-
-                        v_cell.number_format = r'_ * #,##0.00_ ;_ * \\-#,##0.00_ ;_ * "-"??_ ;_ @_ '
-                    elif v_headerData.type == "percent":
-                        v_key = str(v_row[v_headerList[i]])
-
-                        if v_key in v_headerData.valueMapping:
-                            v_cell.value = v_headerData.valueMapping[v_key]
-                        else:
-                            try:
-                                v_cell.value = float(v_row[v_headerList[i]])
-                            except (Exception, TypeError, ValueError):
-                                v_cell.value = (
-                                    v_row[v_headerList[i]]
-                                    if v_headerList[i] is not None
-                                    else ""
-                                )
-
-                        v_cell.number_format = "0.00%"
-                    elif v_headerData.type == "date":
-                        v_key = str(v_row[v_headerList[i]])
-
-                        if v_key in v_headerData.valueMapping:
-                            v_cell.value = v_headerData.valueMapping[v_key]
-                        else:
-                            v_cell.value = (
-                                v_row[v_headerList[i]]
-                                if v_headerList[i] is not None
-                                else ""
-                            )
-
-                        v_cell.number_format = "DD/MM/YYYY"
-                    elif v_headerData.type == "str":
-                        v_key = str(v_row[v_headerList[i]])
-
-                        if v_key in v_headerData.valueMapping:
-                            v_cell.value = v_headerData.valueMapping[v_key]
-                        else:
-                            v_cell.value = (
-                                v_row[v_headerList[i]]
-                                if v_headerList[i] is not None
-                                else ""
-                            )
-                    elif v_headerData.type == "bool":
-                        v_key = str(v_row[v_headerList[i]])
-
-                        if v_key in v_headerData.valueMapping:
-                            v_cell.value = v_headerData.valueMapping[v_key]
-                        else:
-                            try:
-                                v_cell.value = (
-                                    bool(v_row[v_headerList[i]])
-                                    if v_row[v_headerList[i]] is not None
-                                    and str(v_row[v_headerList[i]]).strip() != ""
-                                    else ""
-                                )
-                            except (Exception, TypeError, ValueError):
-                                v_cell.value = (
-                                    v_row[v_headerList[i]]
-                                    if v_headerList[i] is not None
-                                    else ""
-                                )
-                    if v_headerData.type == "int_formula":
-                        v_value = v_row[v_headerList[i]].replace(
-                            "#row#", str(p_startRow + v_line)
-                        ).replace(
-                            "#start_row#", str(p_startRow + 1)
-                        ).replace(
-                            "#end_row#", str(v_lastLine)
-                        )
-                        v_match = re.search(v_pattern, v_value)
-
-                        while v_match is not None:
-                            v_start = v_match.start()
-                            v_end = v_match.end()
-                            v_matchColumn = openpyxl.utils.get_column_letter(
-                                p_startColumn
-                                + v_headerList.index(v_value[v_start + 8 : v_end - 1])
-                            )  # Discard starting #column_ and ending # in match
-                            v_value = (
-                                v_value[:v_start] + v_matchColumn + v_value[v_end:]
-                            )
-                            v_match = re.search(v_pattern, v_value)
-
-                        v_cell.value = v_value
-                        v_cell.number_format = "0"
-                    elif v_headerData.type == "float_formula":
-                        v_value = v_row[v_headerList[i]].replace(
-                            "#row#", str(p_startRow + v_line)
-                        ).replace(
-                            "#start_row#", str(p_startRow + 1)
-                        ).replace(
-                            "#end_row#", str(v_lastLine)
-                        )
-                        v_match = re.search(v_pattern, v_value)
-
-                        while v_match is not None:
-                            v_start = v_match.start()
-                            v_end = v_match.end()
-                            v_matchColumn = openpyxl.utils.get_column_letter(
-                                p_startColumn
-                                + v_headerList.index(v_value[v_start + 8 : v_end - 1])
-                            )  # Discard starting #column_ and ending # in match
-                            v_value = (
-                                v_value[:v_start] + v_matchColumn + v_value[v_end:]
-                            )
-                            v_match = re.search(v_pattern, v_value)
-
-                        v_cell.value = v_value
-                        v_cell.number_format = "#,##0.00"
-                    elif v_headerData.type == "float4_formula":
-                        v_value = v_row[v_headerList[i]].replace(
-                            "#row#", str(p_startRow + v_line)
-                        ).replace(
-                            "#start_row#", str(p_startRow + 1)
-                        ).replace(
-                            "#end_row#", str(v_lastLine)
-                        )
-                        v_match = re.search(v_pattern, v_value)
-
-                        while v_match is not None:
-                            v_start = v_match.start()
-                            v_end = v_match.end()
-                            v_matchColumn = openpyxl.utils.get_column_letter(
-                                p_startColumn
-                                + v_headerList.index(v_value[v_start + 8 : v_end - 1])
-                            )  # Discard starting #column_ and ending # in match
-                            v_value = (
-                                v_value[:v_start] + v_matchColumn + v_value[v_end:]
-                            )
-                            v_match = re.search(v_pattern, v_value)
-
-                        v_cell.value = v_value
-                        v_cell.number_format = "#,##0.0000"
-                    elif v_headerData.type == "accounting_formula":
-                        v_value = v_row[v_headerList[i]].replace(
-                            "#row#", str(p_startRow + v_line)
-                        ).replace(
-                            "#start_row#", str(p_startRow + 1)
-                        ).replace(
-                            "#end_row#", str(v_lastLine)
-                        )
-                        v_match = re.search(v_pattern, v_value)
-
-                        while v_match is not None:
-                            v_start = v_match.start()
-                            v_end = v_match.end()
-                            v_matchColumn = openpyxl.utils.get_column_letter(
-                                p_startColumn
-                                + v_headerList.index(v_value[v_start + 8 : v_end - 1])
-                            )  # Discard starting #column_ and ending # in match
-                            v_value = (
-                                v_value[:v_start] + v_matchColumn + v_value[v_end:]
-                            )
-                            v_match = re.search(v_pattern, v_value)
-
-                        v_cell.value = v_value
-                        v_cell.number_format = r'_ * #,##0.00_ ;_ * \\-#,##0.00_ ;_ * "-"??_ ;_ @_ '
-                    elif v_headerData.type == "percent_formula":
-                        v_value = v_row[v_headerList[i]].replace(
-                            "#row#", str(p_startRow + v_line)
-                        ).replace(
-                            "#start_row#", str(p_startRow + 1)
-                        ).replace(
-                            "#end_row#", str(v_lastLine)
-                        )
-                        v_match = re.search(v_pattern, v_value)
-
-                        while v_match is not None:
-                            v_start = v_match.start()
-                            v_end = v_match.end()
-                            v_matchColumn = openpyxl.utils.get_column_letter(
-                                p_startColumn
-                                + v_headerList.index(v_value[v_start + 8 : v_end - 1])
-                            )  # Discard starting #column_ and ending # in match
-                            v_value = (
-                                v_value[:v_start] + v_matchColumn + v_value[v_end:]
-                            )
-                            v_match = re.search(v_pattern, v_value)
-
-                        v_cell.value = v_value
-                        v_cell.number_format = "0.00%"
-                    elif v_headerData.type == "date_formula":
-                        v_value = v_row[v_headerList[i]].replace(
-                            "#row#", str(p_startRow + v_line)
-                        ).replace(
-                            "#start_row#", str(p_startRow + 1)
-                        ).replace(
-                            "#end_row#", str(v_lastLine)
-                        )
-                        v_match = re.search(v_pattern, v_value)
-
-                        while v_match is not None:
-                            v_start = v_match.start()
-                            v_end = v_match.end()
-                            v_matchColumn = openpyxl.utils.get_column_letter(
-                                p_startColumn
-                                + v_headerList.index(v_value[v_start + 8 : v_end - 1])
-                            )  # Discard starting #column_ and ending # in match
-                            v_value = (
-                                v_value[:v_start] + v_matchColumn + v_value[v_end:]
-                            )
-                            v_match = re.search(v_pattern, v_value)
-
-                        v_cell.value = v_value
-                        v_cell.number_format = "DD/MM/YYYY"
-                    elif v_headerData.type == "str_formula":
-                        v_value = v_row[v_headerList[i]].replace(
-                            "#row#", str(p_startRow + v_line)
-                        ).replace(
-                            "#start_row#", str(p_startRow + 1)
-                        ).replace(
-                            "#end_row#", str(v_lastLine)
-                        )
-                        v_match = re.search(v_pattern, v_value)
-
-                        while v_match is not None:
-                            v_start = v_match.start()
-                            v_end = v_match.end()
-                            v_matchColumn = openpyxl.utils.get_column_letter(
-                                p_startColumn
-                                + v_headerList.index(v_value[v_start + 8 : v_end - 1])
-                            )  # Discard starting #column_ and ending # in match
-                            v_value = (
-                                v_value[:v_start] + v_matchColumn + v_value[v_end:]
-                            )
-                            v_match = re.search(v_pattern, v_value)
-
-                        v_cell.value = v_value
+                for v_writer in v_writers:
+                    v_writer(v_row, v_line + p_startRow)
 
                 # Apply rows grouping, if any
                 if p_rowsGrouping is not None:
@@ -1423,6 +1288,9 @@ def AddTable(
 
     v_lastLine = v_line + p_startRow
 
+    for v_cell in v_endRowCells:
+        v_cell.value = v_cell.value.replace("#end_row#", str(v_lastLine))
+
     # Apply conditional formatting, if any
     if p_conditionalFormatting is not None:
         v_startLetter = openpyxl.utils.get_column_letter(p_startColumn)
@@ -1430,20 +1298,9 @@ def AddTable(
             len(v_headerList) + p_startColumn - 1
         )
 
-        v_formula = p_conditionalFormatting.formula.replace(
-            "#row#", str(p_startRow + 1)
-        )
-
-        v_match = re.search(v_pattern, v_formula)
-
-        while v_match is not None:
-            v_start = v_match.start()
-            v_end = v_match.end()
-            v_matchColumn = openpyxl.utils.get_column_letter(
-                p_startColumn + v_headerList.index(v_formula[v_start + 8 : v_end - 1])
-            )  # Discard starting #column_ and ending # in match
-            v_formula = v_formula[:v_start] + v_matchColumn + v_formula[v_end:]
-            v_match = re.search(v_pattern, v_formula)
+        v_formula = CompileFormula(
+            p_conditionalFormatting.formula, v_headerList, p_startColumn
+        ).Render(p_row=p_startRow + 1)
 
         v_rule = openpyxl.formatting.rule.Rule(
             type="expression",
@@ -1472,22 +1329,11 @@ def AddTable(
             elif v_headerSummary.index > 0:
                 v_index = v_lastLine + v_headerSummary.index
 
-            v_value = (
-                v_headerSummary.function.replace("#column#", v_letter)
-                .replace("#start_row#", str(p_startRow + 1))
-                .replace("#end_row#", str(v_lastLine))
-            )
-
-            v_match = re.search(v_pattern, v_value)
-
-            while v_match is not None:
-                v_start = v_match.start()
-                v_end = v_match.end()
-                v_matchColumn = openpyxl.utils.get_column_letter(
-                    p_startColumn + v_headerList.index(v_value[v_start + 8 : v_end - 1])
-                )  # Discard starting #column_ and ending # in match
-                v_value = v_value[:v_start] + v_matchColumn + v_value[v_end:]
-                v_match = re.search(v_pattern, v_value)
+            v_value = CompileFormula(
+                v_headerSummary.function.replace("#column#", v_letter),
+                v_headerList,
+                p_startColumn,
+            ).Render(p_startRow=p_startRow + 1, p_endRow=v_lastLine)
 
             v_cell = p_workSheet["{0}{1}".format(v_letter, v_index)]
             v_cell.value = v_value
@@ -1537,3 +1383,794 @@ def AddTable(
         v_table.headerRowCount = 0
 
     p_workSheet.add_table(v_table)
+
+
+def NumberFormat(p_type):
+    """Get the number format used by cells of a given Data or Summary type.
+
+        Args:
+            p_type (str): a Spartacus.Report.Data or Spartacus.Report.Summary type, e.g. 'float' or 'float_formula'.
+
+        Returns:
+            str: the number format, or None if cells of this type keep the default format.
+    """
+
+    return {
+        "int": "0",
+        "float": "#,##0.00",
+        "float4": "#,##0.0000",
+        "accounting": r'_ * #,##0.00_ ;_ * \\-#,##0.00_ ;_ * "-"??_ ;_ @_ ',
+        "percent": "0.00%",
+        "date": "DD/MM/YYYY",
+    }.get(p_type.replace("_formula", ""))
+
+
+def ValueConverter(p_data, p_headerList, p_startRow, p_startColumn, p_lastLine=None):
+    """Compile the function that converts values fetched from the database into cell values of a given table column.
+
+        Args:
+            p_data (Spartacus.Report.Data): the column data formatting. Its valueMapping is checked first in non-formula columns.
+            p_headerList (tuple): the table columns, in the same order they appear in the worksheet.
+            p_startRow (int): the row number where the table header is.
+            p_startColumn (int): the column number where the table starts.
+            p_lastLine (int): the last data line number of the table. Defaults to None.
+                Notes:
+                    If None, #end_row# is kept in formulas, so it can be replaced once the last data line is known.
+
+        Returns:
+            function: receives the fetched value and the worksheet row number, and returns the cell value.
+                Notes:
+                    If a non-formula value could not be converted, it's returned as is.
+                    Formulas are compiled by Spartacus.Report.CompileFormula, and their parts around #row# are kept while consecutive rows bring the same formula, so each row is rendered by a single join.
+    """
+
+    if p_data.type.endswith("_formula"):
+        v_formula = [None, None]  # last fetched formula and its parts around #row#
+
+        def Convert(p_value, p_row):
+            if p_value != v_formula[0]:
+                v_formula[0] = p_value
+                v_formula[1] = CompileFormula(
+                    p_value, p_headerList, p_startColumn
+                ).Parts(p_startRow=p_startRow + 1, p_endRow=p_lastLine)
+
+            return str(p_row).join(v_formula[1])
+
+        return Convert
+
+    v_valueMapping = p_data.valueMapping
+
+    if p_data.type == "int":
+        Cast = int
+    elif p_data.type in ["float", "float4", "accounting", "percent"]:
+        Cast = float
+    elif p_data.type == "bool":
+
+        def Cast(p_value):
+            return (
+                bool(p_value)
+                if p_value is not None and str(p_value).strip() != ""
+                else ""
+            )
+
+    else:
+        Cast = None
+
+    def Convert(p_value, p_row):
+        if v_valueMapping:
+            v_key = str(p_value)
+
+            if v_key in v_valueMapping:
+                return v_valueMapping[v_key]
+
+        if Cast is None:
+            return p_value
+
+        try:
+            return Cast(p_value)
+        except (Exception, TypeError, ValueError):
+            return p_value
+
+    return Convert
+
+
+def CellWriter(p_workSheet, p_data, p_key, p_column, p_converter, p_endRowCells):
+    """Compile the function that writes data cells of a given table column.
+
+        Args:
+            p_workSheet (openpyxl.worksheet.worksheet.Worksheet): the worksheet where the table is inserted.
+            p_data (Spartacus.Report.Data): the column data formatting.
+            p_key (str): name of the column in the fetched data rows.
+            p_column (int): the worksheet column number.
+            p_converter (function): the column value converter, as returned by Spartacus.Report.ValueConverter.
+            p_endRowCells (list): where formula cells still containing #end_row# are appended.
+
+        Returns:
+            function: receives the data row and the worksheet row number, and writes the corresponding cell.
+                Notes:
+                    Just the first written cell receives border, font, fill, alignment and number format. Next cells copy its style, instead of looking up the same style objects in the workbook again.
+    """
+
+    v_numberFormat = NumberFormat(p_data.type)
+    v_isFormula = p_data.type.endswith("_formula")
+    v_style = []
+
+    def Style(p_cell):
+        if len(v_style) > 0:
+            p_cell._style = copy.copy(v_style[0])
+        else:
+            if p_data.border is not None:
+                p_cell.border = p_data.border
+
+            if p_data.font is not None:
+                p_cell.font = p_data.font
+
+            if p_data.fill is not None:
+                p_cell.fill = p_data.fill
+
+            if p_data.alignment is not None:
+                p_cell.alignment = p_data.alignment
+
+            if v_numberFormat is not None:
+                p_cell.number_format = v_numberFormat
+
+            v_style.append(copy.copy(p_cell._style))
+
+    def Write(p_row, p_rowNumber):
+        v_cell = p_workSheet.cell(row=p_rowNumber, column=p_column)
+        v_value = p_converter(p_row[p_key], p_rowNumber)
+
+        # openpyxl sets a date format when a date is written, so style is applied after the value just if its number format overrides it
+        if v_numberFormat is None:
+            Style(v_cell)
+            v_cell.value = v_value
+        else:
+            v_cell.value = v_value
+            Style(v_cell)
+
+        if v_isFormula and "#end_row#" in v_value:
+            p_endRowCells.append(v_cell)
+
+    return Write
+
+
+@functools.lru_cache(maxsize=1024)
+def CompileFormula(p_formula, p_headerList, p_startColumn):
+    """Get the Spartacus.Report.FormulaTemplate of a given formula.
+
+        Args:
+            p_formula (str): the formula containing the wildcards.
+            p_headerList (tuple): the table columns, in the same order they appear in the worksheet.
+            p_startColumn (int): the column number where the table starts.
+
+        Returns:
+            Spartacus.Report.FormulaTemplate: the parsed formula.
+                Notes:
+                    Templates are cached, so tables sharing the same header dict and start column parse each formula just once.
+    """
+
+    return FormulaTemplate(p_formula, p_headerList, p_startColumn)
+
+
+def AddNamedStyle(
+    p_workBook,
+    p_name,
+    p_border=None,
+    p_font=None,
+    p_fill=None,
+    p_alignment=None,
+    p_numberFormat=None,
+):
+    """Register a named style in a given workbook, so it may be shared by many cells.
+
+        Args:
+            p_workBook (openpyxl.workbook.workbook.Workbook): the workbook where the style will be registered.
+            p_name (str): the style name.
+            p_border (openpyxl.styles.borders.Border): the style border. Defaults to None.
+            p_font (openpyxl.styles.Font): the style font. Defaults to None.
+            p_fill (openpyxl.styles.PatternFill): the style fill. Defaults to None.
+            p_alignment (openpyxl.styles.Alignment): the style alignment. Defaults to None.
+            p_numberFormat (str): the style number format. Defaults to None.
+
+        Returns:
+            str: the style name, to be assigned to cells.
+    """
+
+    if p_name not in p_workBook.named_styles:
+        v_style = openpyxl.styles.NamedStyle(name=p_name)
+
+        if p_border is not None:
+            v_style.border = p_border
+
+        if p_font is not None:
+            v_style.font = p_font
+
+        if p_fill is not None:
+            v_style.fill = p_fill
+
+        if p_alignment is not None:
+            v_style.alignment = p_alignment
+
+        if p_numberFormat is not None:
+            v_style.number_format = p_numberFormat
+
+        p_workBook.add_named_style(v_style)
+
+    return p_name
+
+
+def AppendRow(p_workSheet, p_row):
+    """Append a row to a given write-only worksheet, keeping track of how many rows were written to it.
+
+        Args:
+            p_workSheet (openpyxl.worksheet.write_only.WriteOnlyWorksheet): the worksheet where the row will be appended.
+            p_row (list): the row values or openpyxl.cell.WriteOnlyCell instances.
+
+        Notes:
+            Use this function instead of p_workSheet.append() for rows written before Spartacus.Report.AddTableWriteOnly calls, as openpyxl 2.6 or newer doesn't count appended rows.
+    """
+
+    v_maxRow = p_workSheet._max_row
+
+    p_workSheet.append(p_row)
+
+    if p_workSheet._max_row == v_maxRow:
+        p_workSheet._max_row = v_maxRow + 1
+
+
+def AddTableWriteOnly(
+    p_workSheet=None,
+    p_headerDict=None,
+    p_startColumn=1,
+    p_startRow=1,
+    p_headerHeight=40,
+    p_data=None,
+    p_database=None,
+    p_query=None,
+    p_mainTable=False,
+    p_conditionalFormatting=None,
+    p_tableStyleInfo=None,
+    p_withFilters=True,
+    p_rowsGrouping=None,
+    p_blockSize=1000,
+    p_lock=None,
+):
+    """Insert a table in a given write-only worksheet, appending rows as they are fetched.
+
+        Args:
+            p_workSheet (openpyxl.worksheet.write_only.WriteOnlyWorksheet): the worksheet where the table will be inserted, created by a workbook opened with write_only=True. Defaults to None.
+            p_lock (threading.Lock): a lock held while writing into the workbook. Defaults to None.
+                Notes:
+                    Worksheets of the same workbook share its styles, so tables of different worksheets may be filled by concurrent threads only if they share the same lock. It's released while rows are fetched from p_database.
+            Other arguments are the same as in Spartacus.Report.AddTable.
+
+        Notes:
+            Rows of a write-only worksheet can be appended just once and in order, so:
+                The table, including summaries placed before its header, must start after the last row already appended to p_workSheet with Spartacus.Report.AppendRow.
+                If p_mainTable, the table must be the first content of p_workSheet, as column widths and freeze panes are written with the first row.
+            Cells share one named style per header, column and summary, instead of holding style objects each.
+            If p_database is provided, and there are formula columns or summaries placed before the header using #end_row#, the number of rows is counted before the table is written, so #end_row# can be replaced in them.
+            Write-only worksheets of openpyxl older than 2.6 can't hold tables, so in that case an auto-filter is applied to the table range instead, and p_tableStyleInfo is ignored.
+
+        Yields:
+            int: Every 1000 lines inserted into the table, yields actual line number.
+
+        Raises:
+            Spartacus.Report.Exception: custom exceptions occurred in this script.
+    """
+
+    if not isinstance(p_workSheet, WriteOnlyWorksheet):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_workSheet" must be of type "openpyxl.worksheet.write_only.WriteOnlyWorksheet".'
+        )
+
+    if not isinstance(p_headerDict, collections.OrderedDict):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_headerDict" must be of type "collections.OrderedDict".'
+        )
+
+    if not isinstance(p_startColumn, int):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_startColumn" must be of type "int".'
+        )
+
+    if p_startColumn < 1:
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_startColumn" must be a positive integer.'
+        )
+
+    if not isinstance(p_startRow, int):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_startRow" must be of type "int".'
+        )
+
+    if p_startRow < 1:
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_startRow" must be a positive integer.'
+        )
+
+    if (
+        p_headerHeight is not None
+        and not isinstance(p_headerHeight, int)
+        and not isinstance(p_headerHeight, float)
+    ):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_headerHeight" must be None or of type "int" or "float".'
+        )
+
+    if p_data is not None and not isinstance(p_data, Spartacus.Database.DataTable):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_data" must be of type "Spartacus.Database.DataTable".'
+        )
+
+    if p_database is not None and not isinstance(
+        p_database, Spartacus.Database.Generic
+    ):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_database" must be of type "Spartacus.Database.Generic".'
+        )
+
+    if p_data is None and p_database is None:
+        raise Spartacus.Report.Exception(
+            "Either p_data or p_database must be provided."
+        )
+
+    if p_data is not None and p_database is not None:
+        raise Spartacus.Report.Exception(
+            "Just one between p_data or p_database should be provided."
+        )
+
+    if p_query is not None and not isinstance(p_query, str):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_query" must be of type "str".'
+        )
+
+    if not isinstance(p_mainTable, bool):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_mainTable" must be of type "bool".'
+        )
+
+    if p_conditionalFormatting is not None and not isinstance(
+        p_conditionalFormatting, ConditionalFormatting
+    ):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_conditionalFormatting" must be None or of type "Spartacus.Report.ConditionalFormatting".'
+        )
+
+    if p_tableStyleInfo is not None and not isinstance(
+        p_tableStyleInfo, openpyxl.worksheet.table.TableStyleInfo
+    ):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_tableStyleInfo" must be None or of type "openpyxl.worksheet.table.TableStyleInfo".'
+        )
+
+    if p_withFilters is not None and not isinstance(p_withFilters, bool):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_withFilters" must be None or of type "bool".'
+        )
+
+    if p_rowsGrouping is not None and not isinstance(p_rowsGrouping, RowsGrouping):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_rowsGrouping" must be None of of type "Spartacus.Report.RowsGrouping".'
+        )
+
+    if not isinstance(p_blockSize, (int, Spartacus.Database.AdaptiveBlockSize)):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_blockSize" must be of type "int" or "Spartacus.Database.AdaptiveBlockSize".'
+        )
+
+    if p_lock is not None and not (
+        hasattr(p_lock, "__enter__") and hasattr(p_lock, "__exit__")
+    ):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_lock" must be None or a lock, like "threading.Lock".'
+        )
+
+    v_headerList = tuple(p_headerDict.keys())
+
+    v_firstRow = p_startRow
+
+    # #end_row# must be known before the last data row in formula columns and in summaries placed before the header
+    v_countRows = False
+
+    for v_header in p_headerDict.values():
+        if v_header.data.type.endswith("_formula"):
+            v_countRows = True
+
+        for v_headerSummary in v_header.summaryList:
+            if v_headerSummary.index < 0:
+                v_firstRow = min(v_firstRow, p_startRow + v_headerSummary.index)
+
+                if "#end_row#" in v_headerSummary.function:
+                    v_countRows = True
+
+    if v_firstRow <= p_workSheet._max_row:
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": The table must start after row {0}, the last one already written to "p_workSheet".'.format(
+                p_workSheet._max_row
+            )
+        )
+
+    if p_mainTable and p_workSheet._max_row > 0:
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.AddTableWriteOnly": Parameter "p_mainTable" requires the table to be the first content of "p_workSheet".'
+        )
+
+    if p_lock is None:
+        p_lock = threading.Lock()
+
+    if p_database is not None:
+        if v_countRows:
+            v_rowCount = p_database.ExecuteScalar('''
+                SELECT count(*)
+                FROM (
+                    {p_query}
+                ) x
+            '''.format(
+                p_query=p_query
+            ))
+        else:
+            v_rowCount = 0
+
+        p_database.Open()
+    else:
+        v_rowCount = len(p_data.Rows)
+
+    v_lastLine = v_rowCount + p_startRow
+
+    v_converters = [
+        ValueConverter(
+            p_data=p_headerDict[v_headerList[i]].data,
+            p_headerList=v_headerList,
+            p_startRow=p_startRow,
+            p_startColumn=p_startColumn,
+            p_lastLine=v_lastLine,
+        )
+        for i in range(len(v_headerList))
+    ]
+
+    v_workBook = p_workSheet.parent
+
+    v_name = "Table_{0}_{1}".format(
+        p_workSheet.title.replace(" ", ""), len(p_workSheet._tables) + 1
+    )  # excel doesn't accept same displayName in more than one table.
+    v_name = "".join(
+        [c for c in v_name if c.isalnum()]
+    )  # Excel doesn't accept non-alphanumeric characters.
+
+    def SummaryRow(p_summaries, p_lastLine):
+        v_row = [None] * (p_startColumn - 1 + len(v_headerList))
+
+        for i, (v_headerSummary, v_style) in p_summaries.items():
+            v_letter = openpyxl.utils.get_column_letter(i + p_startColumn)
+            v_cell = openpyxl.cell.WriteOnlyCell(
+                p_workSheet,
+                CompileFormula(
+                    v_headerSummary.function.replace("#column#", v_letter),
+                    v_headerList,
+                    p_startColumn,
+                ).Render(p_startRow=p_startRow + 1, p_endRow=p_lastLine),
+            )
+            v_cell.style = v_style
+            v_row[p_startColumn - 1 + i] = v_cell
+
+        return v_row
+
+    with p_lock:
+        # Format Header
+        if p_headerHeight is not None:
+            p_workSheet.row_dimensions[p_startRow].height = p_headerHeight
+
+        v_headerRow = [None] * (p_startColumn - 1)
+        v_dataStyles = []
+
+        for i in range(len(v_headerList)):
+            v_header = p_headerDict[v_headerList[i]]
+            v_letter = openpyxl.utils.get_column_letter(i + p_startColumn)
+
+            if p_mainTable:
+                p_workSheet.column_dimensions[v_letter].width = v_header.width
+                p_workSheet.column_dimensions[v_letter].hidden = v_header.hidden
+
+            v_cell = openpyxl.cell.WriteOnlyCell(p_workSheet, v_header.name)
+            v_cell.style = AddNamedStyle(
+                p_workBook=v_workBook,
+                p_name="{0}_Header_{1}".format(v_name, i + 1),
+                p_border=v_header.border,
+                p_font=v_header.font,
+                p_fill=v_header.fill,
+                p_alignment=v_header.alignment,
+            )
+
+            if v_header.comment is not None:
+                v_cell.comment = v_header.comment
+
+            v_headerRow.append(v_cell)
+
+            v_dataStyles.append(
+                AddNamedStyle(
+                    p_workBook=v_workBook,
+                    p_name="{0}_Data_{1}".format(v_name, i + 1),
+                    p_border=v_header.data.border,
+                    p_font=v_header.data.font,
+                    p_fill=v_header.data.fill,
+                    p_alignment=v_header.data.alignment,
+                    p_numberFormat=NumberFormat(v_header.data.type),
+                )
+            )
+
+        if p_mainTable:
+            p_workSheet.freeze_panes = "A{0}".format(p_startRow + 1)
+
+        # Build Summary, keyed by worksheet row if placed before the header, or by offset to the last data row otherwise
+        v_summaryRowsBefore = {}
+        v_summaryRowsAfter = {}
+
+        for i in range(len(v_headerList)):
+            v_headerSummaryList = p_headerDict[v_headerList[i]].summaryList
+
+            for j in range(len(v_headerSummaryList)):
+                v_headerSummary = v_headerSummaryList[j]
+
+                v_style = AddNamedStyle(
+                    p_workBook=v_workBook,
+                    p_name="{0}_Summary_{1}_{2}".format(v_name, i + 1, j + 1),
+                    p_border=v_headerSummary.border,
+                    p_font=v_headerSummary.font,
+                    p_fill=v_headerSummary.fill,
+                    p_numberFormat=NumberFormat(v_headerSummary.type),
+                )
+
+                if v_headerSummary.index < 0:
+                    v_index = p_startRow + v_headerSummary.index
+                    v_summaryRows = v_summaryRowsBefore.setdefault(v_index, {})
+                else:
+                    v_index = v_headerSummary.index
+                    v_summaryRows = v_summaryRowsAfter.setdefault(v_index, {})
+
+                v_summaryRows[i] = (v_headerSummary, v_style)
+
+        # Summaries placed before the header, then the header itself
+        for v_index in range(p_workSheet._max_row + 1, p_startRow):
+            if v_index in v_summaryRowsBefore:
+                AppendRow(
+                    p_workSheet, SummaryRow(v_summaryRowsBefore[v_index], v_lastLine)
+                )
+            else:
+                AppendRow(p_workSheet, [])
+
+        AppendRow(p_workSheet, v_headerRow)
+
+    v_line = 0
+    v_hasmorerecords = True
+    while v_hasmorerecords:
+        v_fetch = time.time()
+        v_data = (
+            p_database.QueryBlock(p_query, p_database.BlockSize(p_blockSize))
+            if p_database is not None
+            else p_data
+        )
+
+        if p_database is not None and isinstance(
+            p_blockSize, Spartacus.Database.AdaptiveBlockSize
+        ):
+            p_blockSize.Observe(v_data, time.time() - v_fetch)
+
+        if p_database is None and p_data is not None:
+            v_hasmorerecords = False
+
+        if len(v_data.Rows) > 0:
+            # Fill content
+            for v_row in v_data.Rows:
+                v_line += 1
+
+                with p_lock:
+                    v_cells = [None] * (p_startColumn - 1)
+
+                    for i in range(len(v_headerList)):
+                        v_cell = openpyxl.cell.WriteOnlyCell(
+                            p_workSheet,
+                            v_converters[i](
+                                v_row[v_headerList[i]], p_startRow + v_line
+                            ),
+                        )
+                        v_cell.style = v_dataStyles[i]
+                        v_cells.append(v_cell)
+
+                    # Apply rows grouping, if any
+                    if p_rowsGrouping is not None:
+                        v_rowLevel = v_row[p_rowsGrouping.column]
+                        v_rowDimensions = p_workSheet.row_dimensions[
+                            p_startRow + v_line
+                        ]
+                        v_rowDimensions.outlineLevel = v_rowLevel
+                        v_rowDimensions.hidden = (
+                            v_rowLevel != p_rowsGrouping.collapsedLevel
+                        )
+                        v_rowDimensions.collapsed = (
+                            v_rowLevel == p_rowsGrouping.collapsedLevel
+                        )
+
+                    AppendRow(p_workSheet, v_cells)
+
+                    if p_rowsGrouping is not None:
+                        del p_workSheet.row_dimensions[p_startRow + v_line]
+
+                if p_database is not None:
+                    yield v_line
+                elif p_data is not None:
+                    if v_line % 1000 == 0:
+                        yield v_line
+
+            if p_database is not None:
+                if p_database.v_start:
+                    v_hasmorerecords = False
+                else:
+                    v_hasmorerecords = True
+        else:
+            v_hasmorerecords = False
+
+    if p_database is not None:
+        p_database.Close()
+
+    v_lastLine = v_line + p_startRow
+
+    with p_lock:
+        # Summaries placed after the last data row
+        for v_index in sorted(v_summaryRowsAfter.keys()):
+            while p_workSheet._max_row < v_lastLine + v_index - 1:
+                AppendRow(p_workSheet, [])
+
+            AppendRow(p_workSheet, SummaryRow(v_summaryRowsAfter[v_index], v_lastLine))
+
+        # Apply conditional formatting, if any
+        if p_conditionalFormatting is not None:
+            v_startLetter = openpyxl.utils.get_column_letter(p_startColumn)
+            v_finalLetter = openpyxl.utils.get_column_letter(
+                len(v_headerList) + p_startColumn - 1
+            )
+
+            v_formula = CompileFormula(
+                p_conditionalFormatting.formula, v_headerList, p_startColumn
+            ).Render(p_row=p_startRow + 1)
+
+            v_rule = openpyxl.formatting.rule.Rule(
+                type="expression",
+                formula=[v_formula],
+                dxf=p_conditionalFormatting.differentialStyle,
+            )
+
+            p_workSheet.conditional_formatting.add(
+                "{0}{1}:{2}{3}".format(
+                    v_startLetter, p_startRow + 1, v_finalLetter, v_lastLine
+                ),
+                v_rule,
+            )
+
+        v_ref = "{0}{1}:{2}{3}".format(
+            openpyxl.utils.get_column_letter(p_startColumn),
+            p_startRow,
+            openpyxl.utils.get_column_letter(p_startColumn + len(v_headerList) - 1),
+            v_lastLine,
+        )
+
+        # Write-only worksheets of openpyxl older than 2.6 don't write tables, so just apply filters
+        if not hasattr(p_workSheet, "tables"):
+            if p_withFilters:
+                p_workSheet.auto_filter.ref = v_ref
+
+            return
+
+        # Create a new table and add it to worksheet
+        v_table = openpyxl.worksheet.table.Table(displayName=v_name, ref=v_ref)
+
+        if p_tableStyleInfo is not None:
+            v_table.tableStyleInfo = p_tableStyleInfo
+
+        if not p_withFilters:
+            v_table.headerRowCount = 0
+
+        # Header cells can't be read back from a write-only worksheet, so name table columns here
+        v_table._initialise_columns()
+
+        for i in range(len(v_headerList)):
+            v_table.tableColumns[i].name = p_headerDict[v_headerList[i]].name
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            p_workSheet.add_table(v_table)
+
+
+def BuildWorkbook(p_sheetList=None, p_fileName=None, p_maxWorkers=None):
+    """Build a workbook, filling its worksheets concurrently, and save it.
+
+        Args:
+            p_sheetList (list): Spartacus.Report.Sheet instances, in the order they appear in the workbook. Defaults to None.
+            p_fileName (str): the path where the workbook will be saved. Defaults to None.
+            p_maxWorkers (int): maximum number of worksheets filled at the same time. Defaults to None.
+                Notes:
+                    If None, all worksheets are filled at the same time.
+
+        Notes:
+            Each worksheet is filled in its own thread, writing its tables in order with Spartacus.Report.AddTableWriteOnly into a write-only workbook, which streams every worksheet to its own temporary file until the workbook is saved.
+            Tables fetching from a p_database use their own connection, obtained with p_database.Clone(), so the same Spartacus.Database.Generic instance may be used by tables of many worksheets.
+            Queries run concurrently, but rows are written one worksheet at a time, as worksheets share the workbook styles. So the build time is bounded by the slowest query when fetching takes longer than writing.
+
+        Raises:
+            Spartacus.Report.Exception: custom exceptions occurred in this script, or errors of every worksheet that could not be filled.
+    """
+
+    if not isinstance(p_sheetList, list):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.BuildWorkbook": Parameter "p_sheetList" must be of type "list".'
+        )
+
+    for v_sheet in p_sheetList:
+        if not isinstance(v_sheet, Sheet):
+            raise Spartacus.Report.Exception(
+                'Error during execution of method "Static.BuildWorkbook": Parameter "p_sheetList" must contain just instances of type "Spartacus.Report.Sheet".'
+            )
+
+    if not isinstance(p_fileName, str):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.BuildWorkbook": Parameter "p_fileName" must be of type "str".'
+        )
+
+    if p_maxWorkers is not None and (
+        not isinstance(p_maxWorkers, int) or p_maxWorkers < 1
+    ):
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.BuildWorkbook": Parameter "p_maxWorkers" must be None or a positive integer.'
+        )
+
+    v_workBook = openpyxl.Workbook(write_only=True)
+    v_lock = threading.Lock()
+
+    # Worksheets are created in order here, as threads may finish in any order
+    v_workSheets = [v_workBook.create_sheet(v_sheet.title) for v_sheet in p_sheetList]
+
+    def Fill(p_workSheet, p_sheet):
+        for v_table in p_sheet.tableList:
+            v_arguments = dict(v_table)
+
+            if v_arguments.get("p_database") is not None:
+                v_arguments["p_database"] = v_arguments["p_database"].Clone()
+
+            try:
+                for v_line in AddTableWriteOnly(
+                    p_workSheet=p_workSheet, p_lock=v_lock, **v_arguments
+                ):
+                    pass
+            finally:
+                if v_arguments.get("p_database") is not None:
+                    try:
+                        v_arguments["p_database"].Close()
+                    except builtins.Exception:
+                        pass
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=p_maxWorkers or max(len(p_sheetList), 1)
+    ) as v_executor:
+        v_futures = [
+            v_executor.submit(Fill, v_workSheets[i], p_sheetList[i])
+            for i in range(len(p_sheetList))
+        ]
+
+    v_errors = []
+
+    for i in range(len(p_sheetList)):
+        v_error = v_futures[i].exception()
+
+        if v_error is not None:
+            v_errors.append(
+                'Worksheet "{0}": {1}'.format(p_sheetList[i].title, str(v_error))
+            )
+
+    if len(v_errors) > 0:
+        raise Spartacus.Report.Exception(
+            'Error during execution of method "Static.BuildWorkbook":\n{0}'.format(
+                "\n".join(v_errors)
+            )
+        )
+
+    v_workBook.save(p_fileName)
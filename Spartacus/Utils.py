@@ -23,6 +23,7 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import builtins
 import pyscrypt
 import pyaes
 import base64
@@ -364,6 +365,41 @@ class DataFileWriter(object):
         except Exception as exc:
             raise Spartacus.Utils.Exception(str(exc))
 
+    def WriteCopy(self, p_database, p_sql, p_sheetname=None, p_blocksize=10000):
+        try:
+            if not self.v_open:
+                raise Spartacus.Utils.Exception("You need to call Open() first.")
+            if (
+                self.v_extension == "csv"
+                and self.v_lineterminator == "\n"
+                and hasattr(p_database, "CopyOut")
+            ):
+                p_database.CopyOut(p_sql, self.v_file, self.v_delimiter, False)
+            else:
+                v_keep = None
+                try:
+                    if p_database.v_con is None:
+                        p_database.Open()
+                        v_keep = False
+                    else:
+                        v_keep = True
+                    p_database.v_start = True
+                    v_hasmorerecords = True
+                    while v_hasmorerecords:
+                        v_table = p_database.QueryBlock(
+                            p_sql, p_blocksize, p_simple=True
+                        )
+                        v_hasmorerecords = not p_database.v_start
+                        if len(v_table.Rows) > 0:
+                            self.Write(v_table, p_sheetname)
+                finally:
+                    if not v_keep:
+                        p_database.Close()
+        except Spartacus.Utils.Exception as exc:
+            raise exc
+        except builtins.Exception as exc:
+            raise Spartacus.Utils.Exception(str(exc))
+
     def Flush(self):
         try:
             if not self.v_open:
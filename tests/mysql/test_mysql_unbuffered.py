@@ -0,0 +1,140 @@
+import unittest
+import unittest.mock
+import pymysql
+import Spartacus.Database
+
+
+class Result(object):
+    def __init__(self):
+        self.unbuffered_active = True
+
+
+class Cursor(object):
+    def __init__(self, p_connection, p_unbuffered):
+        self.v_connection = p_connection
+        self.v_unbuffered = p_unbuffered
+        self.v_rows = []
+        self.description = None
+        self._result = None
+
+    def execute(self, p_sql):
+        self.v_connection.v_statements.append(p_sql)
+        if p_sql == "select connection_id()":
+            self.v_rows = [(42,)]
+            self.description = [("connection_id()",)]
+        elif p_sql.startswith("select"):
+            self.v_rows = [(k,) for k in range(0, 5)]
+            self.description = [("id",)]
+        else:
+            self.v_rows = []
+            self.description = None
+        if self.v_unbuffered:
+            self._result = Result()
+        return len(self.v_rows)
+
+    def fetchone(self):
+        return self.fetchmany(1)[0] if len(self.v_rows) > 0 else None
+
+    def fetchmany(self, p_size):
+        v_rows = self.v_rows[:p_size]
+        self.v_rows = self.v_rows[p_size:]
+        if self._result is not None and len(v_rows) < p_size:
+            self._result.unbuffered_active = False
+        return v_rows
+
+    def fetchall(self):
+        return self.fetchmany(len(self.v_rows) + 1)
+
+    def close(self):
+        self.v_connection.v_closed.append(self)
+
+
+class Connection(object):
+    def __init__(self):
+        self.open = True
+        self.v_statements = []
+        self.v_closed = []
+
+    def cursor(self, p_class=None):
+        return Cursor(self, p_class is pymysql.cursors.SSCursor)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.open = False
+
+
+class TestMySQLUnbuffered(unittest.TestCase):
+    v_class = Spartacus.Database.MySQL
+
+    def setUp(self):
+        self.v_connections = []
+
+        def Connect(**kwargs):
+            v_connection = Connection()
+            self.v_connections.append(v_connection)
+            return v_connection
+
+        v_patch = unittest.mock.patch.object(pymysql, "connect", Connect)
+        v_patch.start()
+        self.addCleanup(v_patch.stop)
+        self.v_database = self.v_class(
+            "127.0.0.1", 3306, "spartacus", "spartacus", "spartacus", p_unbuffered=True
+        )
+
+    def test_last_block_clears_cursor(self):
+        self.v_database.Open()
+        v_sizes = []
+        v_hasmorerecords = True
+        while v_hasmorerecords:
+            v_table = self.v_database.QueryBlock("select id from t", 2)
+            v_sizes.append(len(v_table.Rows))
+            if len(v_sizes) < 3:
+                self.assertIsNotNone(self.v_database.v_sscur)
+            v_hasmorerecords = not self.v_database.v_start
+        self.assertListEqual(v_sizes, [2, 2, 1])
+        self.assertIsNone(self.v_database.v_sscur)
+        self.assertEqual(len(self.v_connections), 1)
+        self.v_database.Close()
+
+    def test_abandoned_stream_is_killed(self):
+        self.v_database.Open()
+        self.v_database.QueryBlock("select id from t", 2)
+        v_sscur = self.v_database.v_sscur
+        self.assertIsNotNone(v_sscur)
+        self.assertFalse(self.v_database.v_start)
+        self.assertEqual(self.v_database.ExecuteScalar("select connection_id()"), 42)
+        self.assertIsNone(self.v_database.v_sscur)
+        self.assertTrue(self.v_database.v_start)
+        self.assertIn(v_sscur, self.v_connections[0].v_closed)
+        self.assertListEqual(self.v_connections[1].v_statements, ["kill query 42"])
+        self.v_database.QueryBlock("select id from t", 2)
+        self.v_database.Execute("delete from t")
+        self.assertIsNone(self.v_database.v_sscur)
+        self.v_database.QueryBlock("select id from t", 2)
+        self.v_database.Close()
+        self.assertIsNone(self.v_database.v_sscur)
+        self.assertEqual(len(self.v_connections), 4)
+
+    def test_cancel_and_clone(self):
+        self.v_database.Open()
+        self.v_database.QueryBlock("select id from t", 2)
+        v_clone = self.v_database.Clone()
+        self.assertIsNone(v_clone.v_sscur)
+        self.assertIsNone(v_clone.v_con)
+        self.assertIsNotNone(self.v_database.v_sscur)
+        self.v_database.Cancel()
+        self.assertIsNone(self.v_database.v_sscur)
+        self.assertIsNone(self.v_database.v_con)
+
+
+class TestMariaDBUnbuffered(TestMySQLUnbuffered):
+    v_class = Spartacus.Database.MariaDB
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,12 @@
 import unittest
+import asyncio
 import datetime
 import decimal
+import io
+import os
+import psycopg2.extensions
 import Spartacus.Database
+import Spartacus.Utils
 
 
 class TestPostgreSQL11(unittest.TestCase):
@@ -236,6 +241,20 @@ class TestPostgreSQL11(unittest.TestCase):
         self.assertEqual(v_result.Rows[8][0], "d009")
         self.assertEqual(v_result.Rows[8][1], "Customer Service")
 
+    def test_query_compact(self):
+        v_result = self.v_database.Query(
+            "select * from departments order by dept_no", p_compact=True
+        )
+        self.assertListEqual(v_result.Columns, ["dept_no", "dept_name"])
+        self.assertEqual(len(v_result.Rows), 9)
+        self.assertIsInstance(v_result.Rows[0], Spartacus.Database.DataRow)
+        self.assertEqual(v_result.Rows[0]["dept_no"], "d001")
+        self.assertEqual(v_result.Rows[0][1], "Marketing")
+        v_result = self.v_database.Query(
+            "select date '2020-01-02' as d", False, False, True
+        )
+        self.assertEqual(v_result.Rows[0]["d"], "2020-01-02")
+
     def test_query_types(self):
         v_result = self.v_database.Query(
             """
@@ -284,6 +303,17 @@ class TestPostgreSQL11(unittest.TestCase):
         self.assertEqual(v_result.Rows[0]["grade"], "9.8")
         self.assertIsInstance(v_result.Rows[0]["grade"], str)
 
+    def test_query_alltypesstr_arrays(self):
+        self.v_database.Open()
+        v_result = self.v_database.Query(
+            "select array[1, 2] as a, '[1, 2]'::json as j, '{\"k\": 1}'::jsonb as b",
+            p_alltypesstr=True,
+        )
+        self.v_database.Close()
+        self.assertEqual(v_result.Rows[0]["a"], "{1, 2}")
+        self.assertEqual(v_result.Rows[0]["j"], "{1, 2}")
+        self.assertEqual(v_result.Rows[0]["b"], "{'k': 1}")
+
     def test_queryblock_connection_not_open(self):
         with self.assertRaises(Spartacus.Database.Exception):
             v_result = self.v_database.QueryBlock(
@@ -350,6 +380,223 @@ class TestPostgreSQL11(unittest.TestCase):
             "delete from employees where emp_no in (500000, 500001)"
         )
 
+    def test_insertblock_copy(self):
+        v_table = Spartacus.Database.DataTable()
+        v_table.AddColumn("dept_no")
+        v_table.AddColumn("dept_name")
+        v_table.AddRow(["d010", "Tab\tNew\nLine\\"])
+        v_table.AddRow(["d011", None])
+        self.v_database.Execute("alter table departments alter dept_name drop not null")
+        self.v_database.InsertBlock(v_table, "departments", p_copy=True)
+        v_result = self.v_database.Query(
+            "select * from departments where dept_no in ('d010', 'd011') order by 1"
+        )
+        self.v_database.Execute(
+            "delete from departments where dept_no in ('d010', 'd011')"
+        )
+        self.v_database.Execute("alter table departments alter dept_name set not null")
+        self.assertEqual(len(v_result.Rows), 2)
+        self.assertEqual(v_result.Rows[0]["dept_name"], "Tab\tNew\nLine\\")
+        self.assertIsNone(v_result.Rows[1]["dept_name"])
+
+    def test_querycopy(self):
+        v_blocks = list(
+            self.v_database.QueryCopy(
+                "select * from departments order by dept_no", p_blocksize=4
+            )
+        )
+        self.assertEqual(len(v_blocks), 3)
+        self.assertListEqual(v_blocks[0].Columns, ["dept_no", "dept_name"])
+        self.assertEqual(len(v_blocks[0].Rows), 4)
+        self.assertEqual(len(v_blocks[2].Rows), 1)
+        self.assertEqual(v_blocks[0].Rows[0]["dept_no"], "d001")
+        self.assertEqual(v_blocks[0].Rows[0]["dept_name"], "Marketing")
+        self.assertEqual(v_blocks[2].Rows[0]["dept_name"], "Customer Service")
+        v_result = list(
+            self.v_database.QueryCopy("select null::text as a, E'x\\ty' as b")
+        )
+        self.assertIsNone(v_result[0].Rows[0]["a"])
+        self.assertEqual(v_result[0].Rows[0]["b"], "x\ty")
+
+    def test_querycopy_types(self):
+        v_sql = "select 1 as i, 2.5::numeric as n, date '2020-01-02' as d, true as b, array[1, 2] as a, '{\"k\": 1}'::json as j, null::int as z, E'x\\ty' as t"
+        self.v_database.Open(p_json_as_string=True)
+        try:
+            for v_alltypesstr in [False, True]:
+                v_table = self.v_database.QueryBlock(v_sql, 10, v_alltypesstr, True)
+                v_blocks = list(
+                    self.v_database.QueryCopy(v_sql, 10, v_alltypesstr, True)
+                )
+                self.assertEqual(len(v_blocks), 1)
+                self.assertListEqual(v_blocks[0].Columns, v_table.Columns)
+                self.assertListEqual(v_blocks[0].Rows, v_table.Rows)
+        finally:
+            self.v_database.Close()
+        self.assertListEqual(
+            v_blocks[0].Rows[0],
+            ["1", "2.5", "2020-01-02", "True", "{1, 2}", '{"k": 1}', "", "x\ty"],
+        )
+        v_row = list(self.v_database.QueryCopy(v_sql))[0].Rows[0]
+        self.assertEqual(v_row["i"], 1)
+        self.assertEqual(v_row["n"], decimal.Decimal("2.5"))
+        self.assertEqual(v_row["d"], datetime.date(2020, 1, 2))
+        self.assertIs(v_row["b"], True)
+        self.assertListEqual(v_row["a"], [1, 2])
+        self.assertDictEqual(v_row["j"], {"k": 1})
+        self.assertIsNone(v_row["z"])
+
+    def test_querycopy_error(self):
+        with self.assertRaises(Spartacus.Database.Exception):
+            for v_block in self.v_database.QueryCopy(
+                "select case when g < 100000 then g else 1 / (g - g) end as g from generate_series(1, 200000) g",
+                p_blocksize=10000,
+            ):
+                pass
+        self.assertEqual(self.v_database.ExecuteScalar("select 1"), 1)
+
+    def test_copyout(self):
+        v_file = io.StringIO()
+        self.v_database.CopyOut(
+            "select * from departments where dept_no in ('d001', 'd002') order by 1",
+            v_file,
+            ";",
+        )
+        self.assertEqual(
+            v_file.getvalue(), "dept_no;dept_name\nd001;Marketing\nd002;Finance\n"
+        )
+
+    def test_writecopy(self):
+        v_filename = "test_writecopy.csv"
+        v_writer = Spartacus.Utils.DataFileWriter(v_filename, ["dept_no", "dept_name"])
+        v_writer.Open()
+        v_writer.WriteCopy(
+            self.v_database,
+            "select * from departments where dept_no in ('d001', 'd002') order by 1",
+        )
+        v_writer.Flush()
+        with open(v_filename) as v_file:
+            v_content = v_file.read()
+        os.remove(v_filename)
+        self.assertEqual(
+            v_content, "dept_no;dept_name\nd001;Marketing\nd002;Finance\n"
+        )
+
+    def test_types_cache(self):
+        self.v_database.InvalidateTypes()
+        self.v_database.Open()
+        v_types = self.v_database.v_types
+        self.v_database.Close()
+        self.v_database.Open()
+        v_cached = self.v_database.v_types
+        self.v_database.Execute("create type test_mood as enum ('happy', 'sad')")
+        v_fields = self.v_database.GetFields("select 'happy'::test_mood as mood")
+        self.v_database.Execute("drop type test_mood")
+        self.v_database.Close()
+        self.assertIs(v_types, v_cached)
+        self.assertEqual(v_fields[0].v_dbtype, "test_mood")
+
+    def test_asyncquery(self):
+        async def Run():
+            v_scalars = await asyncio.gather(
+                self.v_database.Clone().AsyncExecuteScalar(
+                    "select dept_name from departments where dept_no = 'd001'"
+                ),
+                self.v_database.Clone().AsyncExecuteScalar(
+                    "select dept_name from departments where dept_no = 'd002'"
+                ),
+            )
+            v_table = await self.v_database.AsyncQuery(
+                "select * from departments order by dept_no"
+            )
+            v_sizes = []
+            async for v_block in self.v_database.AsyncQueryBlocks(
+                "select * from departments order by dept_no", 4
+            ):
+                v_sizes.append(len(v_block.Rows))
+            return v_scalars, v_table, v_sizes
+
+        v_scalars, v_table, v_sizes = asyncio.run(Run())
+        self.assertListEqual(v_scalars, ["Marketing", "Finance"])
+        self.assertEqual(len(v_table.Rows), 9)
+        self.assertEqual(v_table.Rows[0]["dept_name"], "Marketing")
+        self.assertListEqual(v_sizes, [4, 4, 1])
+
+    def test_asyncquery_blocks(self):
+        async def Run():
+            v_database = self.v_database.Clone()
+            await v_database.AsyncOpen()
+            try:
+                v_table = await v_database.AsyncQuery(
+                    "select * from departments order by dept_no", p_compact=True
+                )
+                await v_database.AsyncExecute("begin")
+                await v_database.AsyncExecute(
+                    "insert into departments values ('d010', 'Spartacus')"
+                )
+                v_count = 0
+                async for v_block in v_database.AsyncQueryBlocks(
+                    "select * from departments", 4, p_compact=True
+                ):
+                    v_count = v_count + len(v_block.Rows)
+                v_status = v_database.v_con.get_transaction_status()
+                await v_database.AsyncExecute("rollback")
+                v_blocks = v_database.AsyncQueryBlocks("select * from departments", 4)
+                await v_blocks.__anext__()
+                v_scalar = await asyncio.wait_for(
+                    v_database.AsyncExecuteScalar("select count(*) from departments"),
+                    5,
+                )
+                await v_blocks.aclose()
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.wait_for(
+                        v_database.AsyncExecute("select pg_sleep(10)"), 0.2
+                    )
+                v_sleep = await v_database.AsyncExecuteScalar("select 1")
+            finally:
+                v_database.Close()
+            return v_table, v_count, v_status, v_scalar, v_sleep
+
+        v_table, v_count, v_status, v_scalar, v_sleep = asyncio.run(Run())
+        self.assertIsInstance(v_table.Rows[0], Spartacus.Database.DataRow)
+        self.assertEqual(v_table.Rows[0]["dept_name"], "Marketing")
+        self.assertEqual(v_count, 10)
+        self.assertEqual(v_status, psycopg2.extensions.TRANSACTION_STATUS_INTRANS)
+        self.assertEqual(v_scalar, 9)
+        self.assertEqual(v_sleep, 1)
+
+    def test_stream(self):
+        self.v_database.Open()
+        v_first = self.v_database.Stream(
+            "select * from departments order by dept_no", 4
+        )
+        v_second = self.v_database.Stream(
+            "select * from departments order by dept_no desc", 4
+        )
+        v_block1 = next(v_first)
+        v_block2 = next(v_second)
+        v_first.close()
+        v_second.close()
+        v_cursors = self.v_database.ExecuteScalar("select count(*) from pg_cursors")
+        self.v_database.Close()
+        v_sizes = [
+            len(v_block.Rows)
+            for v_block in self.v_database.Stream(
+                "select * from departments order by dept_no", 4
+            )
+        ]
+        self.assertEqual(v_block1.Rows[0]["dept_no"], "d001")
+        self.assertEqual(v_block2.Rows[0]["dept_no"], "d009")
+        self.assertEqual(v_cursors, 0)
+        self.assertListEqual(v_sizes, [4, 4, 1])
+
+    def test_alltypesstr_converters(self):
+        v_sql = "select 1 as i, null::text as t, array[1, 2] as a, true as b"
+        v_query = self.v_database.Query(v_sql, p_alltypesstr=True)
+        v_stream = next(self.v_database.Stream(v_sql, 10, p_alltypesstr=True))
+        v_expected = ["1", "", "{1, 2}", "True"]
+        self.assertListEqual(list(v_query.Rows[0]), v_expected)
+        self.assertListEqual(list(v_stream.Rows[0].values()), v_expected)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -3,6 +3,7 @@ import datetime
 import os
 import os.path
 import Spartacus.Database
+import Spartacus.Utils
 
 
 class TestSQLite(unittest.TestCase):
@@ -256,6 +257,29 @@ class TestSQLite(unittest.TestCase):
         self.assertEqual(v_result.Rows[8][0], "d009")
         self.assertEqual(v_result.Rows[8][1], "Customer Service")
 
+    def test_query_compact(self):
+        v_result = self.v_database.Query(
+            "select * from departments order by dept_no", p_compact=True
+        )
+        self.assertIsInstance(v_result, Spartacus.Database.DataTable)
+        self.assertListEqual(v_result.Columns, ["dept_no", "dept_name"])
+        self.assertEqual(len(v_result.Rows), 9)
+        self.assertIsInstance(v_result.Rows[0], Spartacus.Database.DataRow)
+        self.assertIs(v_result.Rows[0].v_index, v_result.Rows[8].v_index)
+        self.assertEqual(v_result.Rows[0]["dept_no"], "d001")
+        self.assertEqual(v_result.Rows[0][1], "Marketing")
+        self.assertListEqual(list(v_result.Rows[1]), ["d002", "Finance"])
+        self.assertListEqual(v_result.Rows[1].keys(), ["dept_no", "dept_name"])
+        self.assertIsNone(v_result.Rows[1].get("dept_manager"))
+        self.assertTrue(v_result.Rows[1] == ("d002", "Finance"))
+        self.assertFalse(v_result.Rows[1] == None)
+        self.assertNotEqual(v_result.Rows[1], 2)
+        v_result.Rows[2]["dept_name"] = "People"
+        self.assertEqual(v_result.Rows[2]["dept_name"], "People")
+        v_result = v_result.Select("dept_no", "d008")
+        self.assertEqual(len(v_result.Rows), 1)
+        self.assertEqual(v_result.Rows[0]["dept_name"], "Research")
+
     def test_query_types(self):
         v_result = self.v_database.Query(
             """
@@ -370,6 +394,441 @@ class TestSQLite(unittest.TestCase):
             "delete from employees where emp_no in (500000, 500001)"
         )
 
+    def test_insertblock_masks(self):
+        v_table = Spartacus.Database.DataTable(p_simple=True)
+        v_table.AddColumn("dept_no")
+        v_table.AddColumn("dept_name")
+        v_table.AddRow(["d010", "spartacus"])
+        v_table.AddRow(["d011", "it's python"])
+        v_fields = [
+            Spartacus.Database.DataField("dept_no"),
+            Spartacus.Database.DataField("dept_name", p_mask="upper(#)"),
+        ]
+        self.v_database.Open()
+        self.v_database.Execute("begin")
+        self.v_database.InsertBlock(v_table, "departments", v_fields)
+        v_result = self.v_database.Query(
+            "select * from departments where dept_no in ('d010', 'd011') order by 1"
+        )
+        self.v_database.Rollback()
+        v_count = self.v_database.ExecuteScalar(
+            "select count(*) from departments where dept_no in ('d010', 'd011')"
+        )
+        self.v_database.Close()
+        self.assertEqual(len(v_result.Rows), 2)
+        self.assertEqual(v_result.Rows[0]["dept_name"], "SPARTACUS")
+        self.assertEqual(v_result.Rows[1]["dept_name"], "IT'S PYTHON")
+        self.assertEqual(v_count, 0)
+
+    def test_mogrifytemplate(self):
+        v_table = self.v_database.Query("select * from departments order by dept_no")
+        v_table.AddRow(["d010", "it's {python}"])
+        v_table.AddRow(["d011", None])
+        v_table.AddRow([12, "d012"])
+        v_fields = [
+            Spartacus.Database.DataField("dept_no"),
+            Spartacus.Database.DataField("dept_name", p_mask="upper(#)"),
+        ]
+        v_render = self.v_database.MogrifyTemplate(v_fields, v_table)
+        for r in v_table.Rows:
+            self.assertEqual(v_render(r), self.v_database.Mogrify(r, v_fields))
+        self.assertEqual(v_render(v_table.Rows[9]), "('d010',upper('it''s {python}'))")
+        self.assertEqual(v_render(v_table.Rows[10]), "('d011',upper(null))")
+        with self.assertRaises(Spartacus.Database.Exception):
+            v_render({"dept_no": "d013"})
+        v_empty = self.v_database.MogrifyTemplate([], v_table)
+        self.assertEqual(v_empty({}), self.v_database.Mogrify({}, []))
+        with self.assertRaises(Spartacus.Database.Exception):
+            v_empty(v_table.Rows[0])
+
+    def test_writecopy(self):
+        v_filename = "test_writecopy.csv"
+        v_writer = Spartacus.Utils.DataFileWriter(v_filename, ["dept_no", "dept_name"])
+        v_writer.Open()
+        v_writer.WriteCopy(
+            self.v_database,
+            "select * from departments where dept_no in ('d001', 'd002') order by 1",
+            p_blocksize=1,
+        )
+        v_writer.Flush()
+        with open(v_filename) as v_file:
+            v_content = v_file.read()
+        os.remove(v_filename)
+        self.assertEqual(
+            v_content, "dept_no;dept_name\nd001;Marketing\nd002;Finance\n"
+        )
+
+    def test_transferpipeline(self):
+        v_filename = "test_target.db"
+        v_target = Spartacus.Database.SQLite(v_filename)
+        v_target.Execute("create table departments (dept_no text, dept_name text)")
+        v_return = self.v_database.TransferPipeline(
+            "select * from departments", v_target, "departments", 2, p_writers=2
+        )
+        v_count = v_target.ExecuteScalar("select count(*) from departments")
+        os.remove(v_filename)
+        self.assertIsNone(v_return.v_log)
+        self.assertFalse(v_return.v_hasmorerecords)
+        self.assertEqual(v_return.v_numrecords, 9)
+        self.assertEqual(v_count, 9)
+        self.assertGreater(v_return.v_rowspersecond, 0)
+
+    def test_transferpipeline_error(self):
+        v_return = self.v_database.TransferPipeline(
+            "select * from departments",
+            Spartacus.Database.Memory(),
+            "departments",
+            2,
+            p_writers=2,
+        )
+        self.assertIsNotNone(v_return.v_log)
+        self.assertEqual(v_return.v_numrecords, 0)
+
+    def test_transferparallel(self):
+        v_filename = "test_target.db"
+        v_target = Spartacus.Database.SQLite(v_filename)
+        v_target.Execute("create table departments (dept_no text, dept_name text)")
+        v_return = self.v_database.TransferParallel(
+            "select * from departments",
+            v_target,
+            "departments",
+            "dept_no",
+            p_ranges=[(None, "d004"), ("d004", None), (None, None)],
+            p_blocksize=2,
+        )
+        v_count = v_target.ExecuteScalar("select count(*) from departments")
+        with self.assertRaises(Spartacus.Database.Exception):
+            self.v_database.TransferParallel(
+                "select * from departments", v_target, "departments", "dept_no"
+            )
+        os.remove(v_filename)
+        self.assertIsNone(v_return.v_log)
+        self.assertEqual(v_return.v_numrecords, 9)
+        self.assertEqual(v_count, 9)
+        self.assertListEqual([p.v_numrecords for p in v_return.v_partitions], [3, 6, 0])
+        v_return = self.v_database.TransferParallel(
+            "select * from departments",
+            Spartacus.Database.Memory(),
+            "departments",
+            "dept_no",
+            p_ranges=[(None, None)],
+        )
+        self.assertIsNotNone(v_return.v_log)
+
+    def test_connectionpool(self):
+        v_pool = Spartacus.Database.ConnectionPool(self.v_database, 1, 2)
+        v_count = v_pool.ExecuteScalar("select count(*) from departments")
+        v_table = v_pool.Query("select * from departments order by dept_no")
+        v_con1 = v_pool.Checkout()
+        v_con2 = v_pool.Checkout()
+        with self.assertRaises(Spartacus.Database.Exception):
+            v_pool.Checkout(0.1)
+        v_pool.Checkin(v_con1)
+        v_pool.Checkin(v_con2)
+        v_size = v_pool.v_size
+        v_pool.Close()
+        self.assertEqual(v_count, 9)
+        self.assertEqual(len(v_table.Rows), 9)
+        self.assertEqual(v_size, 2)
+        self.assertEqual(v_pool.v_size, 0)
+        with self.assertRaises(Spartacus.Database.Exception):
+            v_pool.Checkout()
+
+    def test_connectionpool_autocommit_disabled(self):
+        v_pool = Spartacus.Database.ConnectionPool(
+            self.v_database, 1, 2, p_autocommit=False
+        )
+        v_pool.Execute(
+            "insert into departments (dept_no, dept_name) values ('d000', 'Spartacus')"
+        )
+        with self.assertRaises(Spartacus.Database.Exception):
+            v_pool.Execute("insert into unknown_table values (1)")
+        v_pool.Close()
+        v_result = self.v_database.ExecuteScalar(
+            "select dept_name from departments where dept_no = 'd000'"
+        )
+        self.v_database.Execute("delete from departments where dept_no = 'd000'")
+        self.assertEqual(v_result, "Spartacus")
+
+    def test_fanout(self):
+        v_fanout = Spartacus.Database.FanOut(
+            {"first": self.v_database, "second": self.v_database}
+        )
+        v_table = v_fanout.Query(
+            "select * from departments order by dept_no", p_merge=True
+        )
+        v_results = Spartacus.Database.FanOut(
+            [self.v_database, Spartacus.Database.Memory()]
+        ).Query("select count(*) as total from departments")
+        self.assertEqual(len(v_table.Rows), 18)
+        self.assertEqual(v_table.Rows[9]["dept_no"], "d001")
+        self.assertListEqual(list(v_results.keys()), [0, 1])
+        self.assertEqual(v_results[0].Rows[0]["total"], 9)
+        self.assertIsInstance(v_results[1], Spartacus.Database.Exception)
+
+    def test_stream(self):
+        self.v_database.Open()
+        v_first = self.v_database.Stream(
+            "select * from departments order by dept_no", 4
+        )
+        v_second = self.v_database.Stream(
+            "select * from departments order by dept_no desc", 4
+        )
+        v_block1 = next(v_first)
+        v_block2 = next(v_second)
+        v_first.close()
+        v_sizes = [
+            len(v_block.Rows)
+            for v_block in self.v_database.Stream(
+                "select * from departments order by dept_no", 4
+            )
+        ]
+        v_second.close()
+        self.v_database.Close()
+        self.assertEqual(v_block1.Rows[0]["dept_no"], "d001")
+        self.assertEqual(v_block2.Rows[0]["dept_no"], "d009")
+        self.assertListEqual(v_sizes, [4, 4, 1])
+
+    def test_stream_without_arraysize(self):
+        class Cursor(object):
+            def __init__(self, p_cur):
+                self.v_cur = p_cur
+                self.description = None
+
+            def execute(self, p_sql):
+                self.v_cur.execute(p_sql)
+                self.description = self.v_cur.description
+
+            def fetchmany(self, p_size):
+                return self.v_cur.fetchmany(p_size)
+
+            def fetchall(self):
+                return self.v_cur.fetchall()
+
+            def close(self):
+                self.v_cur.close()
+
+        class Database(Spartacus.Database.SQLite):
+            def NewCursor(self):
+                return Cursor(self.v_con.cursor())
+
+        v_sizes = [
+            len(v_block.Rows)
+            for v_block in Database(self.v_filename).Stream(
+                "select * from departments order by dept_no", 4
+            )
+        ]
+        self.assertListEqual(v_sizes, [4, 4, 1])
+
+    def test_adaptiveblocksize(self):
+        v_growing = Spartacus.Database.AdaptiveBlockSize(
+            p_initial=2, p_minimum=1, p_targetbytes=None, p_targetseconds=None
+        )
+        v_shrinking = Spartacus.Database.AdaptiveBlockSize(
+            p_initial=4, p_minimum=1, p_targetbytes=1, p_targetseconds=None
+        )
+        v_grown = [
+            len(v_block.Rows)
+            for v_block in self.v_database.Stream(
+                "select * from departments", v_growing
+            )
+        ]
+        v_shrunk = [
+            len(v_block.Rows)
+            for v_block in self.v_database.Stream(
+                "select * from departments", v_shrinking
+            )
+        ]
+        self.assertListEqual(v_grown, [2, 4, 3])
+        self.assertListEqual(v_shrunk, [4, 2, 1, 1, 1])
+        self.assertEqual(v_shrinking.Size(), 1)
+
+    def test_compare_unordered(self):
+        v_table_a = self.v_database.Query("select * from departments order by dept_no")
+        v_table_b = self.v_database.Query(
+            """
+            select dept_no,
+                   case when dept_no = 'd002' then 'Accounting' else dept_name end as dept_name
+            from departments
+            where dept_no <> 'd006'
+            union all
+            select 'd100', 'Spartacus'
+            order by dept_name desc
+        """
+        )
+        v_result = v_table_a.Compare(v_table_b, ["dept_no"], "status", "diff")
+        self.assertListEqual(
+            v_result.Columns, ["dept_no", "dept_name", "status", "diff"]
+        )
+        self.assertEqual(len(v_result.Rows), 3)
+        self.assertEqual(v_result.Rows[0]["dept_no"], "d002")
+        self.assertEqual(v_result.Rows[0]["dept_name"], "Finance --> Accounting")
+        self.assertEqual(v_result.Rows[0]["status"], "U")
+        self.assertEqual(v_result.Rows[0]["diff"], "dept_name")
+        self.assertEqual(v_result.Rows[1]["dept_no"], "d006")
+        self.assertEqual(v_result.Rows[1]["status"], "D")
+        self.assertEqual(v_result.Rows[2]["dept_no"], "d100")
+        self.assertEqual(v_result.Rows[2]["status"], "I")
+        v_result = v_table_a.Compare(
+            v_table_b, ["dept_no"], "status", "diff", p_keepequal=True
+        )
+        self.assertEqual(len(v_result.Rows), 10)
+        self.assertEqual(v_result.Rows[0]["status"], "E")
+
+    def test_compare_streaming(self):
+        self.v_database.Open()
+        v_database2 = Spartacus.Database.SQLite(self.v_filename)
+        v_database2.Open()
+        v_blocks = list(
+            self.v_database.Compare(
+                "select * from departments order by dept_no",
+                v_database2,
+                """
+                select dept_no,
+                       case when dept_no = 'd002' then 'Accounting' else dept_name end as dept_name
+                from departments
+                where dept_no <> 'd006'
+                union all
+                select 'd100', 'Spartacus'
+                order by dept_no
+            """,
+                ["dept_no"],
+                "status",
+                "diff",
+                p_blocksize=2,
+                p_keepequal=True,
+            )
+        )
+        v_database2.Close()
+        self.v_database.Close()
+        self.assertEqual(len(v_blocks), 5)
+        v_rows = [r for v_block in v_blocks for r in v_block.Rows]
+        self.assertEqual(len(v_rows), 10)
+        self.assertListEqual(
+            v_blocks[0].Columns, ["dept_no", "dept_name", "status", "diff"]
+        )
+        self.assertEqual(v_rows[1]["dept_no"], "d002")
+        self.assertEqual(v_rows[1]["dept_name"], "'Finance' --> 'Accounting'")
+        self.assertEqual(v_rows[1]["status"], "U")
+        self.assertEqual(v_rows[1]["diff"], "dept_name")
+        self.assertEqual(v_rows[5]["dept_no"], "d006")
+        self.assertEqual(v_rows[5]["status"], "D")
+        self.assertEqual(v_rows[9]["dept_no"], "d100")
+        self.assertEqual(v_rows[9]["status"], "I")
+        self.assertEqual(len([r for r in v_rows if r["status"] == "E"]), 7)
+
+    def test_compare_null_keys(self):
+        v_sql1 = """
+            select 1 as k1, null as k2, 'a' as v
+            union all select 1, 5, 'b'
+            union all select 2, 1, 'c'
+            order by k1, k2 nulls last
+        """
+        v_sql2 = """
+            select 1 as k1, 5 as k2, 'b' as v
+            union all select 1, 7, 'e'
+            union all select 2, 1, 'c'
+            union all select 2, null, 'd'
+            order by k1, k2 nulls last
+        """
+        v_result = self.v_database.Query(v_sql1).Compare(
+            self.v_database.Query(v_sql2),
+            ["k1", "k2"],
+            "status",
+            "diff",
+            p_ordered=True,
+        )
+        self.assertListEqual(
+            [(r["k1"], r["k2"], r["status"]) for r in v_result.Rows],
+            [(1, 7, "I"), (1, None, "D"), (2, None, "I")],
+        )
+        self.v_database.Open()
+        v_database2 = Spartacus.Database.SQLite(self.v_filename)
+        v_database2.Open()
+        v_rows = [
+            r
+            for v_block in self.v_database.Compare(
+                v_sql1, v_database2, v_sql2, ["k1", "k2"], "status", "diff"
+            )
+            for r in v_block.Rows
+        ]
+        v_database2.Close()
+        self.v_database.Close()
+        self.assertListEqual(
+            [(r["k1"], r["k2"], r["status"]) for r in v_rows],
+            [(1, 7, "I"), (1, None, "D"), (2, None, "I")],
+        )
+
+    def test_distinct(self):
+        v_table = self.v_database.Query(
+            """
+            select substr(dept_no, 1, 3) as prefix,
+                   dept_name
+            from departments
+            order by dept_no
+        """
+        )
+        v_result = v_table.Distinct(["prefix"])
+        self.assertEqual(len(v_result.Rows), 1)
+        self.assertEqual(v_result.Rows[0]["dept_name"], "Marketing")
+        v_result = v_table.Distinct(["prefix"], p_keep="last", p_countcolname="count")
+        self.assertListEqual(v_result.Columns, ["prefix", "dept_name", "count"])
+        self.assertEqual(len(v_result.Rows), 1)
+        self.assertEqual(v_result.Rows[0]["dept_name"], "Customer Service")
+        self.assertEqual(v_result.Rows[0]["count"], 9)
+        v_result = v_table.Distinct(["prefix", "dept_name"])
+        self.assertEqual(len(v_result.Rows), 9)
+        with self.assertRaises(Spartacus.Database.Exception):
+            v_table.Distinct(["prefix"], p_keep="middle")
+
+    def test_select_index(self):
+        v_table = self.v_database.Query("select * from departments order by dept_no")
+        v_table.CreateIndex("dept_no")
+        self.assertTrue(v_table.CheckIndexes())
+        v_result = v_table.Select("dept_no", "d005")
+        self.assertEqual(len(v_result.Rows), 1)
+        self.assertEqual(v_result.Rows[0]["dept_name"], "Development")
+        v_table.AddRow(["d005", "Development II"])
+        self.assertTrue(v_table.CheckIndexes())
+        v_result = v_table.Select("dept_no", "d005")
+        self.assertEqual(len(v_result.Rows), 2)
+        self.assertEqual(v_result.Rows[1]["dept_name"], "Development II")
+        self.assertEqual(len(v_table.Select("dept_no", "d100").Rows), 0)
+        v_table.Rows.pop()
+        self.assertFalse(v_table.CheckIndexes())
+        v_result = v_table.Select("dept_no", "d005")
+        self.assertEqual(len(v_result.Rows), 1)
+        with self.assertRaises(Spartacus.Database.Exception):
+            v_table.CreateIndex("dept_manager")
+
+    def test_select_index_mutation(self):
+        v_table = self.v_database.Query("select * from departments order by dept_no")
+        v_table.CreateIndex("dept_no")
+        v_table.Rows[0]["dept_no"] = "d099"
+        v_table.CreateIndex("dept_no")
+        self.assertEqual(len(v_table.Select("dept_no", "d099").Rows), 1)
+        self.assertEqual(len(v_table.Select("dept_no", "d001").Rows), 0)
+        v_table.Rows[1]["dept_no"] = "d098"
+        v_table.DropIndex("dept_no")
+        self.assertFalse(v_table.CheckIndexes())
+        self.assertEqual(len(v_table.Select("dept_no", "d098").Rows), 1)
+        self.assertEqual(len(v_table.Select("dept_no", "d002").Rows), 0)
+
+    def test_addrows(self):
+        v_table = self.v_database.Query("select * from departments order by dept_no")
+        v_table.CreateIndex("dept_no")
+        v_table.AddRows([("d010", "Spartacus"), ("d011", None)])
+        v_simple = Spartacus.Database.DataTable(None, True, True)
+        v_simple.Columns = ["dept_no", "count"]
+        v_simple.AddRows([("d001", 1), ("d002", None)])
+        self.assertEqual(len(v_table.Rows), 11)
+        self.assertEqual(v_table.Rows[9]["dept_name"], "Spartacus")
+        self.assertTrue(v_table.CheckIndexes())
+        self.assertEqual(len(v_table.Select("dept_no", "d011").Rows), 1)
+        self.assertListEqual(v_simple.Rows, [["d001", "1"], ["d002", ""]])
+        with self.assertRaises(Spartacus.Database.Exception):
+            v_table.AddRows([("d012",)])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,188 @@
+import collections
+import openpyxl
+import os
+
+import Spartacus
+import Spartacus.Database
+import Spartacus.Report
+
+try:
+
+    v_reportFile = "employees_parallel.xlsx"
+    v_databaseFile = "employees_parallel.db"
+
+    if os.path.exists(v_databaseFile):
+        os.remove(v_databaseFile)
+
+    v_database = Spartacus.Database.SQLite(v_databaseFile)
+    v_database.Execute(
+        """
+        create table employees (
+            emp_no integer not null,
+            first_name text not null,
+            last_name text not null,
+            gender text not null,
+            hire_date text not null
+        )
+    """
+    )
+    v_database.Execute(
+        """
+        insert into employees
+        with recursive numbers(n) as (
+            select 1
+            union all
+            select n + 1 from numbers where n < 2500
+        )
+        select 10000 + n,
+               'First ' || n,
+               'Last ' || n,
+               case when n % 2 = 0 then 'F' else 'M' end,
+               date('1990-01-01', '+' || n || ' days')
+        from numbers
+    """
+    )
+    v_query = """
+        select emp_no,
+               first_name,
+               last_name,
+               hire_date,
+               emp_no * 2.5 as salary
+        from employees
+        where gender = '{0}'
+        order by emp_no
+    """
+
+    v_headerFont = openpyxl.styles.Font(bold=True)
+
+    v_headerFill = openpyxl.styles.PatternFill("solid", fgColor="DBE5F1")
+
+    v_headerAlignment = openpyxl.styles.Alignment(
+        horizontal="center", vertical="center", wrapText=True
+    )
+
+    v_numberAlignment = openpyxl.styles.Alignment(
+        horizontal="right", vertical="center", wrapText=True
+    )
+
+    v_textAlignment = openpyxl.styles.Alignment(
+        horizontal="left", vertical="center", wrapText=True
+    )
+
+    v_dateAlignment = openpyxl.styles.Alignment(
+        horizontal="center", vertical="center", wrapText=True
+    )
+
+    v_headerDict = collections.OrderedDict()
+
+    v_headerDict["emp_no"] = Spartacus.Report.Field(
+        p_name="Number",
+        p_width=15,
+        p_font=v_headerFont,
+        p_fill=v_headerFill,
+        p_alignment=v_headerAlignment,
+        p_data=Spartacus.Report.Data(p_type="int", p_alignment=v_numberAlignment),
+    )
+
+    v_headerDict["first_name"] = Spartacus.Report.Field(
+        p_name="First Name",
+        p_width=25,
+        p_font=v_headerFont,
+        p_fill=v_headerFill,
+        p_alignment=v_headerAlignment,
+        p_data=Spartacus.Report.Data(p_type="str", p_alignment=v_textAlignment),
+    )
+
+    v_headerDict["last_name"] = Spartacus.Report.Field(
+        p_name="Last Name",
+        p_width=25,
+        p_font=v_headerFont,
+        p_fill=v_headerFill,
+        p_alignment=v_headerAlignment,
+        p_data=Spartacus.Report.Data(p_type="str", p_alignment=v_textAlignment),
+    )
+
+    v_headerDict["hire_date"] = Spartacus.Report.Field(
+        p_name="Hire Date",
+        p_width=15,
+        p_font=v_headerFont,
+        p_fill=v_headerFill,
+        p_alignment=v_headerAlignment,
+        p_data=Spartacus.Report.Data(p_type="date", p_alignment=v_dateAlignment),
+    )
+
+    v_headerDict["salary"] = Spartacus.Report.Field(
+        p_name="Salary",
+        p_width=20,
+        p_font=v_headerFont,
+        p_fill=v_headerFill,
+        p_alignment=v_headerAlignment,
+        p_data=Spartacus.Report.Data(
+            p_type="float", p_alignment=v_numberAlignment
+        ),
+        p_summaryList=[
+            Spartacus.Report.Summary(
+                p_function="=SUM(#column##start_row#:#column##end_row#)",
+                p_index=-1,
+                p_type="float",
+                p_font=v_headerFont,
+            )
+        ],
+    )
+
+    # Each worksheet queries through its own connection, cloned from v_database
+    Spartacus.Report.BuildWorkbook(
+        p_sheetList=[
+            Spartacus.Report.Sheet(
+                p_title=v_title,
+                p_tableList=[
+                    {
+                        "p_headerDict": v_headerDict,
+                        "p_startRow": 3,
+                        "p_database": v_database,
+                        "p_query": v_query.format(v_gender),
+                        "p_mainTable": True,
+                    }
+                ],
+            )
+            for v_title, v_gender in [("Female", "F"), ("Male", "M")]
+        ],
+        p_fileName=v_reportFile,
+    )
+
+    # Read the report back: each worksheet has its summary in row 2, header in row 3 and data from row 4
+    v_workBook = openpyxl.load_workbook(v_reportFile)
+    assert v_workBook.sheetnames == ["Female", "Male"]
+
+    for v_title, v_firstNumber in [("Female", 2), ("Male", 1)]:
+        v_workSheet = v_workBook[v_title]
+        v_lastLine = 1250 + 3
+
+        assert v_workSheet["A3"].value == "Number"
+        assert v_workSheet["E3"].value == "Salary"
+        assert v_workSheet["A4"].value == 10000 + v_firstNumber
+        assert v_workSheet["B4"].value == "First {0}".format(v_firstNumber)
+        assert v_workSheet["E4"].value == (10000 + v_firstNumber) * 2.5
+        assert v_workSheet["A{0}".format(v_lastLine)].value == 12498 + v_firstNumber
+        assert v_workSheet["A{0}".format(v_lastLine + 1)].value is None
+        assert v_workSheet["E2"].value == "=SUM(E4:E{0})".format(v_lastLine)
+
+        # openpyxl older than 2.6 writes an auto-filter instead of a table
+        if hasattr(v_workSheet, "tables"):
+            v_table = v_workSheet.tables["Table{0}1".format(v_title)]
+            assert v_table.ref == "A3:E{0}".format(v_lastLine)
+        else:
+            assert len(v_workSheet._tables) == 0
+            assert v_workSheet.auto_filter.ref == "A3:E{0}".format(v_lastLine)
+
+        print("{0}: {1} lines checked".format(v_title, v_lastLine - 3))
+
+except Spartacus.Database.Exception as exc:
+    print(str(exc))
+    raise
+except Spartacus.Report.Exception as exc:
+    print(str(exc))
+    raise
+except Exception as exc:
+    print(str(exc))
+    raise
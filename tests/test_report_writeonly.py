@@ -0,0 +1,356 @@
+import collections
+import openpyxl
+import os
+import re
+
+import Spartacus
+import Spartacus.Database
+import Spartacus.Report
+
+try:
+
+    v_reportName = "List of Employees"
+    v_sheetName = "Employees"
+    v_reportFile = "employees_writeonly.xlsx"
+    v_databaseFile = "employees_writeonly.db"
+
+    if os.path.exists(v_databaseFile):
+        os.remove(v_databaseFile)
+
+    v_database = Spartacus.Database.SQLite(v_databaseFile)
+    v_database.Execute(
+        """
+        create table employees (
+            emp_no integer not null,
+            birth_date text not null,
+            first_name text not null,
+            last_name text not null,
+            gender text not null,
+            hire_date text not null
+        )
+    """
+    )
+    v_database.Execute(
+        """
+        insert into employees
+        with recursive numbers(n) as (
+            select 1
+            union all
+            select n + 1 from numbers where n < 2500
+        )
+        select 10000 + n,
+               date('1960-01-01', '+' || n || ' days'),
+               'First ' || n,
+               'Last ' || n,
+               case when n % 2 = 0 then 'F' else 'M' end,
+               date('1990-01-01', '+' || n || ' days')
+        from numbers
+    """
+    )
+    v_query = """
+        select emp_no,
+               birth_date,
+               first_name,
+               last_name,
+               gender,
+               hire_date,
+               emp_no % 5 as num_dependents,
+               emp_no * 2.5 as salary,
+               '=#column_salary##row# / (#column_num_dependents##row# + 1)' as formula_salary_per_capita
+        from employees
+    """
+
+    v_totalRows = int(v_database.ExecuteScalar("select count(*) from employees"))
+
+    v_workBook = openpyxl.Workbook(write_only=True)
+
+    v_workSheet = v_workBook.create_sheet(v_sheetName)
+    v_workSheet.sheet_view.showGridLines = False
+
+    v_headerFont = openpyxl.styles.Font(bold=True)
+
+    v_headerFill = openpyxl.styles.PatternFill("solid", fgColor="DBE5F1")
+
+    v_headerAlignment = openpyxl.styles.Alignment(
+        horizontal="center", vertical="center", wrapText=True
+    )
+
+    v_numberAlignment = openpyxl.styles.Alignment(
+        horizontal="right", vertical="center", wrapText=True
+    )
+
+    v_textAlignment = openpyxl.styles.Alignment(
+        horizontal="left", vertical="center", wrapText=True
+    )
+
+    v_dateAlignment = openpyxl.styles.Alignment(
+        horizontal="center", vertical="center", wrapText=True
+    )
+
+    v_headerDict = collections.OrderedDict()
+
+    v_headerDict["emp_no"] = Spartacus.Report.Field(
+        p_name="Employee Number",
+        p_width=15,
+        p_comment=None,
+        p_border=None,
+        p_font=v_headerFont,
+        p_fill=v_headerFill,
+        p_alignment=v_headerAlignment,
+        p_data=Spartacus.Report.Data(
+            p_type="int",
+            p_border=None,
+            p_font=None,
+            p_fill=None,
+            p_alignment=v_numberAlignment,
+        ),
+        p_summaryList=[],
+    )
+
+    v_headerDict["first_name"] = Spartacus.Report.Field(
+        p_name="First Name",
+        p_width=30,
+        p_comment=None,
+        p_border=None,
+        p_font=v_headerFont,
+        p_fill=v_headerFill,
+        p_alignment=v_headerAlignment,
+        p_data=Spartacus.Report.Data(
+            p_type="str",
+            p_border=None,
+            p_font=None,
+            p_fill=None,
+            p_alignment=v_textAlignment,
+        ),
+        p_summaryList=[],
+    )
+
+    v_headerDict["last_name"] = Spartacus.Report.Field(
+        p_name="Last Name",
+        p_width=30,
+        p_comment=None,
+        p_border=None,
+        p_font=v_headerFont,
+        p_fill=v_headerFill,
+        p_alignment=v_headerAlignment,
+        p_data=Spartacus.Report.Data(
+            p_type="str",
+            p_border=None,
+            p_font=None,
+            p_fill=None,
+            p_alignment=v_textAlignment,
+        ),
+        p_summaryList=[],
+    )
+
+    v_headerDict["gender"] = Spartacus.Report.Field(
+        p_name="Gender",
+        p_width=8,
+        p_comment=None,
+        p_border=None,
+        p_font=v_headerFont,
+        p_fill=v_headerFill,
+        p_alignment=v_headerAlignment,
+        p_data=Spartacus.Report.Data(
+            p_type="str",
+            p_border=None,
+            p_font=None,
+            p_fill=None,
+            p_alignment=v_textAlignment,
+        ),
+        p_summaryList=[],
+    )
+
+    v_headerDict["birth_date"] = Spartacus.Report.Field(
+        p_name="Birth Date",
+        p_width=15,
+        p_comment=None,
+        p_border=None,
+        p_font=v_headerFont,
+        p_fill=v_headerFill,
+        p_alignment=v_headerAlignment,
+        p_data=Spartacus.Report.Data(
+            p_type="date",
+            p_border=None,
+            p_font=None,
+            p_fill=None,
+            p_alignment=v_dateAlignment,
+        ),
+        p_summaryList=[],
+    )
+
+    v_headerDict["hire_date"] = Spartacus.Report.Field(
+        p_name="Hire Date",
+        p_width=15,
+        p_comment=None,
+        p_border=None,
+        p_font=v_headerFont,
+        p_fill=v_headerFill,
+        p_alignment=v_headerAlignment,
+        p_data=Spartacus.Report.Data(
+            p_type="date",
+            p_border=None,
+            p_font=None,
+            p_fill=None,
+            p_alignment=v_dateAlignment,
+        ),
+        p_summaryList=[],
+    )
+
+    v_headerDict["num_dependents"] = Spartacus.Report.Field(
+        p_name="Num. Dependents",
+        p_width=20,
+        p_comment=None,
+        p_border=None,
+        p_font=v_headerFont,
+        p_fill=v_headerFill,
+        p_alignment=v_headerAlignment,
+        p_data=Spartacus.Report.Data(
+            p_type="int",
+            p_border=None,
+            p_font=None,
+            p_fill=None,
+            p_alignment=v_numberAlignment,
+        ),
+        p_summaryList=[
+            Spartacus.Report.Summary(
+                p_type="int",
+                p_border=None,
+                p_font=None,
+                p_fill=None,
+                p_function="=SUM(#column##start_row#:#column##end_row#)",
+                p_index=-2,
+            ),
+            Spartacus.Report.Summary(
+                p_type="int",
+                p_border=None,
+                p_font=None,
+                p_fill=None,
+                p_function="=SUBTOTAL(9, #column##start_row#:#column##end_row#)",
+                p_index=-1,
+            ),
+        ],
+    )
+
+    v_headerDict["salary"] = Spartacus.Report.Field(
+        p_name="Salary",
+        p_width=20,
+        p_comment=None,
+        p_border=None,
+        p_font=v_headerFont,
+        p_fill=v_headerFill,
+        p_alignment=v_headerAlignment,
+        p_data=Spartacus.Report.Data(
+            p_type="float",
+            p_border=None,
+            p_font=None,
+            p_fill=None,
+            p_alignment=v_numberAlignment,
+        ),
+        p_summaryList=[
+            Spartacus.Report.Summary(
+                p_type="float",
+                p_border=None,
+                p_font=None,
+                p_fill=None,
+                p_function="=SUM(#column##start_row#:#column##end_row#)",
+                p_index=-2,
+            ),
+            Spartacus.Report.Summary(
+                p_type="float",
+                p_border=None,
+                p_font=None,
+                p_fill=None,
+                p_function="=SUBTOTAL(9, #column##start_row#:#column##end_row#)",
+                p_index=-1,
+            ),
+        ],
+    )
+
+    v_headerDict["formula_salary_per_capita"] = Spartacus.Report.Field(
+        p_name="Salary Per Capita",
+        p_width=30,
+        p_comment=None,
+        p_border=None,
+        p_font=v_headerFont,
+        p_fill=v_headerFill,
+        p_alignment=v_headerAlignment,
+        p_data=Spartacus.Report.Data(
+            p_type="float_formula",
+            p_border=None,
+            p_font=None,
+            p_fill=None,
+            p_alignment=v_numberAlignment,
+        ),
+        p_summaryList=[],
+    )
+
+    v_startPerc = 0.0
+    v_endPerc = 100.0
+    v_inc = 0.0
+    try:
+        v_inc = (v_endPerc - v_startPerc) / v_totalRows
+    except ZeroDivisionError:
+        v_inc = v_endPerc - v_startPerc
+        pass
+    v_progress = float(v_startPerc - v_inc)
+
+    for v_line in Spartacus.Report.AddTableWriteOnly(
+        p_workSheet=v_workSheet,
+        p_headerDict=v_headerDict,
+        p_startColumn=1,
+        p_startRow=3,
+        p_headerHeight=40,
+        p_database=v_database,
+        p_query=v_query,
+        p_mainTable=True,
+    ):
+        if v_line % 1000 == 0:
+            v_progress += v_inc * 1000
+            print(
+                "{0}: Rendering line {1} of {2} - {3}%".format(
+                    v_reportName, v_line, v_totalRows, v_progress
+                )
+            )
+
+    v_workBook.save(v_reportFile)
+
+    # Read the report back: header in row 3, data from row 4, summaries in rows 1 and 2
+    v_lastLine = v_totalRows + 3
+    v_ref = "A3:I{0}".format(v_lastLine)
+    v_workSheet = openpyxl.load_workbook(v_reportFile)[v_sheetName]
+
+    assert v_workSheet["A3"].value == "Employee Number"
+    assert v_workSheet["I3"].value == "Salary Per Capita"
+    assert v_workSheet["A4"].value == 10001
+    assert v_workSheet["B4"].value == "First 1"
+    assert v_workSheet["E4"].value == "1960-01-02"
+    assert v_workSheet["G4"].value == 1
+    assert v_workSheet["H4"].value == 25002.5
+    assert v_workSheet["I4"].value == "=H4 / (G4 + 1)"
+    assert v_workSheet["A{0}".format(v_lastLine)].value == 10000 + v_totalRows
+    assert v_workSheet["I{0}".format(v_lastLine)].value == "=H{0} / (G{0} + 1)".format(
+        v_lastLine
+    )
+    assert v_workSheet["A{0}".format(v_lastLine + 1)].value is None
+    assert v_workSheet["G1"].value == "=SUM(G4:G{0})".format(v_lastLine)
+    assert v_workSheet["H2"].value == "=SUBTOTAL(9, H4:H{0})".format(v_lastLine)
+
+    # openpyxl older than 2.6 writes an auto-filter instead of a table
+    if hasattr(v_workSheet, "tables"):
+        assert v_workSheet.tables["TableEmployees1"].ref == v_ref
+    else:
+        assert len(v_workSheet._tables) == 0
+        assert v_workSheet.auto_filter.ref == v_ref
+
+    print("{0}: {1} lines checked".format(v_reportName, v_totalRows))
+
+except Spartacus.Database.Exception as exc:
+    print(str(exc))
+    raise
+except Spartacus.Report.Exception as exc:
+    print(str(exc))
+    raise
+except Exception as exc:
+    print(str(exc))
+    raise